@@ -0,0 +1,247 @@
+"""
+Continuous microphone capture for GrokVIS.
+One input stream stays open for the whole session and feeds a ring buffer.
+Consumers each keep their own read position in the buffer: the wake word
+detector reads frame by frame, and command capture picks up from the frame
+after the wake word, so no device is reopened between the two.
+"""
+import logging
+import threading
+import time
+import numpy as np
+import sounddevice as sd
+import speech_recognition as sr
+
+
+class AudioRingBuffer:
+    """Fixed-size ring of int16 samples addressed by absolute sample position.
+
+    There is one writer, the PortAudio callback, and it never blocks. It
+    first publishes how far it is about to overwrite (_reserved), then copies
+    the samples in, then publishes the write position, and readers are woken
+    only if the lock is free. Readers copy without the lock and then check
+    _reserved: if the writer started overwriting any of the copied samples,
+    even with the write still in progress, the copy is discarded and retried.
+    """
+
+    # Longest a reader sleeps between checks if it missed a wakeup
+    POLL_SECONDS = 0.01
+
+    def __init__(self, capacity):
+        """
+        Parameters:
+            capacity (int): Number of samples kept; older samples are overwritten.
+        """
+        self.capacity = capacity
+        self.dropped = 0
+        self._data = np.zeros(capacity, dtype=np.int16)
+        self._written = 0
+        # End of the region the writer has started overwriting; reaches _written once the write completes
+        self._reserved = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    @property
+    def position(self):
+        """Absolute position one past the newest sample."""
+        return self._written
+
+    def write(self, samples):
+        """Append samples, overwriting the oldest ones once the ring is full; never blocks.
+
+        Samples are copied straight into the preallocated ring; no arrays are
+        allocated, so this is safe to call on every PortAudio callback.
+        """
+        total = len(samples)
+        if total > self.capacity:
+            samples = samples[total - self.capacity:]
+        count = len(samples)
+        start = (self._written + total - count) % self.capacity
+        first = min(count, self.capacity - start)
+        # Announce the overwrite before touching the ring, so readers copying these slots can tell
+        self._reserved = self._written + total
+        self._data[start:start + first] = samples[:first]
+        if first < count:
+            self._data[:count - first] = samples[first:]
+        # Publish only once the samples are in place
+        self._written = self._reserved
+        if self._condition.acquire(blocking=False):
+            try:
+                self._condition.notify_all()
+            finally:
+                self._condition.release()
+
+    def read(self, position, count, timeout=None):
+        """
+        Return (samples, next position) for count samples starting at position.
+
+        Allocates a new array per call; frame loops should use read_into().
+        Returns (None, position) on timeout or once the buffer is closed.
+        """
+        samples = np.empty(count, dtype=np.int16)
+        next_position = self.read_into(samples, position, timeout)
+        if next_position is None:
+            return None, position
+        return samples, next_position
+
+    def read_into(self, out, position, timeout=None):
+        """
+        Fill out with the len(out) samples starting at position; return the next position.
+
+        Blocks until the samples have been written. A reader that fell more than
+        capacity samples behind skips ahead to the oldest sample still held.
+        Returns None on timeout or once the buffer is closed.
+        """
+        count = len(out)
+        if self._written < position + count:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            with self._condition:
+                while self._written < position + count and not self._closed:
+                    remaining = self.POLL_SECONDS if deadline is None else min(self.POLL_SECONDS, deadline - time.monotonic())
+                    if remaining <= 0:
+                        return None
+                    self._condition.wait(remaining)
+            if self._written < position + count:
+                return None
+        while True:
+            oldest = self._reserved - self.capacity
+            if position < oldest:
+                self.dropped += oldest - position
+                logging.warning(f"Audio reader fell behind; skipped {oldest - position} samples")
+                position = oldest
+            start = position % self.capacity
+            first = min(count, self.capacity - start)
+            out[:first] = self._data[start:start + first]
+            if first < count:
+                out[first:] = self._data[:count - first]
+            # Valid unless the writer started overwriting these samples before or during the copy
+            if position >= self._reserved - self.capacity:
+                return position + count
+
+    def close(self):
+        """Wake every blocked reader; further reads return None."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+class MicrophoneCapture:
+    """A single long-lived input stream writing into an AudioRingBuffer."""
+
+    def __init__(self, sample_rate, blocksize, seconds=30):
+        """
+        Parameters:
+            sample_rate (int): Capture rate in Hz; Porcupine expects 16000.
+            blocksize (int): Samples delivered per PortAudio callback.
+            seconds (float, optional): Length of audio history held in the ring buffer.
+        """
+        self.sample_rate = sample_rate
+        self.blocksize = blocksize
+        self.overflows = 0
+        self.callbacks = 0
+        self.callback_seconds = 0.0
+        self.max_callback_seconds = 0.0
+        self.buffer = AudioRingBuffer(int(sample_rate * seconds))
+        self._stream = None
+
+    def _callback(self, indata, _frames, _time, status):
+        """Copy each block into the ring buffer; nothing else runs on the PortAudio thread."""
+        started = time.perf_counter()
+        if status.input_overflow:
+            self.overflows += 1
+        # indata is already int16 mono; the column is a view, so the only copy is into the ring
+        self.buffer.write(indata[:, 0])
+        elapsed = time.perf_counter() - started
+        self.callbacks += 1
+        self.callback_seconds += elapsed
+        self.max_callback_seconds = max(self.max_callback_seconds, elapsed)
+
+    def start(self):
+        """Open and start the input stream."""
+        self._stream = sd.InputStream(
+            callback=self._callback,
+            channels=1,
+            samplerate=self.sample_rate,
+            blocksize=self.blocksize,
+            dtype=np.int16,
+        )
+        self._stream.start()
+        return self
+
+    def stop(self):
+        """Stop the input stream and release any blocked readers."""
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+        self.buffer.close()
+
+    def stats(self):
+        """Return overflow and callback timing counters; times in milliseconds."""
+        return {
+            "callbacks": self.callbacks,
+            "overflows": self.overflows,
+            "dropped_samples": self.buffer.dropped,
+            "mean_callback_ms": self.callback_seconds * 1000 / self.callbacks if self.callbacks else None,
+            "max_callback_ms": self.max_callback_seconds * 1000,
+            "block_ms": self.blocksize * 1000 / self.sample_rate,
+        }
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class _RingBufferStream:
+    """File-like reader over the ring buffer, shaped like a PyAudio input stream."""
+
+    def __init__(self, buffer, position):
+        self.buffer = buffer
+        self.position = position
+        self._chunk = np.empty(0, dtype=np.int16)
+
+    def read(self, size):
+        """Return the next size samples as little-endian int16 bytes."""
+        if len(self._chunk) != size:
+            self._chunk = np.empty(size, dtype=np.int16)
+        position = self.buffer.read_into(self._chunk, self.position)
+        if position is None:
+            return b""
+        self.position = position
+        return self._chunk.astype("<i2", copy=False).tobytes()
+
+
+class CaptureSource(sr.AudioSource):
+    """speech_recognition audio source reading from a MicrophoneCapture ring buffer.
+
+    Lets Recognizer.listen() consume the frames that follow a given position
+    instead of opening a new sr.Microphone.
+    """
+
+    def __init__(self, capture, position, chunk=1024):
+        """
+        Parameters:
+            capture (MicrophoneCapture): The running capture pipeline.
+            position (int): Ring buffer position of the first sample to read.
+            chunk (int, optional): Samples per read, as sr.Microphone's CHUNK.
+        """
+        self.capture = capture
+        self.SAMPLE_RATE = capture.sample_rate
+        self.SAMPLE_WIDTH = 2
+        self.CHUNK = chunk
+        self.stream = None
+        self._position = position
+
+    @property
+    def position(self):
+        """Ring buffer position of the next unread sample."""
+        return self.stream.position if self.stream is not None else self._position
+
+    def __enter__(self):
+        self.stream = _RingBufferStream(self.capture.buffer, self._position)
+        return self
+
+    def __exit__(self, *exc):
+        self._position = self.stream.position
+        self.stream = None
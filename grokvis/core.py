@@ -5,6 +5,7 @@ Contains initialization, model loading, and main execution loop.
 import logging
 import os
 import threading
+import time
 import sqlite3
 import speech_recognition as sr
 import pynvml
@@ -12,6 +13,8 @@ import spacy
 import numpy as np  # Not currently used but kept for potential future use
 from concurrent.futures import ThreadPoolExecutor
 from sentence_transformers import SentenceTransformer
+from grokvis.embedding_cache import EmbeddingCache
+from grokvis.memory_writer import connect as connect_memory_db
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
 
@@ -40,12 +43,20 @@ def _import_grokvis_modules():
 
 
 # Global variables
+MEMORY_MODEL_NAME = "all-MiniLM-L6-v2"
+MEMORY_DB_PATH = "grokvis_memory.db"
+METRICS_LOG_PATH = "grokvis_metrics.log"
 memory_model = None
+embedding_cache = None
 nlp = None
 conn = None
+# Held around every use of conn; the command worker, the scheduler and the dashboard all share it
+conn_lock = threading.RLock()
 executor = None
 scheduler = None
 persona = "Default"  # Default persona
+# Timings and counters; kept at INFO in their own file while the error log stays at ERROR
+metrics_logger = logging.getLogger("grokvis.metrics")
 
 
 def setup_logging():
@@ -56,18 +67,25 @@ def setup_logging():
         format="%(asctime)s - %(levelname)s - %(message)s",
         encoding="utf-8",  # Ensure UTF-8 encoding for Windows compatibility
     )
+    if not metrics_logger.handlers:
+        handler = logging.FileHandler(METRICS_LOG_PATH, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(asctime)s - %(message)s"))
+        metrics_logger.addHandler(handler)
+        metrics_logger.setLevel(logging.INFO)
+        metrics_logger.propagate = False
 
 
 def initialize_components():
     """Initialize core components of GrokVIS."""
-    global memory_model, nlp, conn, executor, scheduler
+    global memory_model, embedding_cache, nlp, conn, executor, scheduler
 
     # Load core components
     try:
-        memory_model = SentenceTransformer("all-MiniLM-L6-v2")
+        memory_model = SentenceTransformer(MEMORY_MODEL_NAME)
+        embedding_cache = EmbeddingCache(memory_model, MEMORY_MODEL_NAME)
         nlp = spacy.load("en_core_web_sm")
         pynvml.nvmlInit()
-        conn = sqlite3.connect("grokvis_memory.db")
+        conn = connect_memory_db(MEMORY_DB_PATH)
         executor = ThreadPoolExecutor(max_workers=2)
 
         # APScheduler setup
@@ -89,13 +107,14 @@ def greet_user():
         "Hello! What persona would you like to use? You can choose Alfred, Beatrice, or any other available persona."
     )
 
-    recognizer = sr.Recognizer()
+    from grokvis.recognizer import capture_utterance
+
     with sr.Microphone() as source:
         print("Listening for your response...")
-        audio = recognizer.listen(source)
+        audio, session = capture_utterance(source)
 
     try:
-        response = recognizer.recognize_google(audio)
+        response = session.result(audio)
         print(f"You said: {response}")
 
         global persona
@@ -116,17 +135,61 @@ def greet_user():
         persona = "Default"
 
 
+def warmup_speech(tts_loader, started):
+    """Finish the TTS warmup stage: wait for the model, then pre-render fixed phrases.
+
+    Parameters:
+        tts_loader (threading.Thread): Thread returned by preload_tts().
+        started (float): time.perf_counter() value when the stage began.
+    """
+    from grokvis.tts_manager import prerender
+    from grokvis.shared import STATIC_PHRASES, alfred_quips, beatrice_quips, jarvis_quips
+
+    try:
+        tts_loader.join()
+        model_ready = time.perf_counter() - started
+        # Greetings and status lines come first; they are spoken soonest
+        rendered = prerender(STATIC_PHRASES + alfred_quips + beatrice_quips + jarvis_quips)
+        metrics_logger.info(
+            f"TTS warmup took {time.perf_counter() - started:.2f}s "
+            f"(model ready after {model_ready:.2f}s, {rendered} phrases synthesized)"
+        )
+    except Exception as e:
+        logging.error(f"TTS Warmup Error: {e}")
+
+
 def grokvis_run():
     """Run the main GROK-VIS loop with wake word detection."""
     setup_logging()
+
+    # Warmup stage: the TTS and speech recognition models load while the other components initialize
+    from grokvis.tts_manager import preload_tts
+    from grokvis.recognizer import get_recognizer
+    warmup_started = time.perf_counter()
+    tts_loader = preload_tts()
+    threading.Thread(target=get_recognizer, name="asr-loader", daemon=True).start()
     initialize_components()
 
+    # Embed the intent examples (or load them from disk) before the first command needs them
+    from grokvis.intent_classifier import get_classifier
+    threading.Thread(target=get_classifier, name="intent-loader", daemon=True).start()
+
     # Import modules after initialization to avoid circular imports
     train_voice_model, wake_word_listener, _, speak, app, get_hardware_manager, _ = (
         _import_grokvis_modules()
     )
 
     try:
+        # Make sure the memory schema exists before anything reads or writes it
+        from grokvis.memory import initialize_memory_db, schedule_memory_compaction
+        initialize_memory_db()
+        schedule_memory_compaction()
+
+        # Pre-render the fixed phrases in the background; cached ones are skipped
+        threading.Thread(
+            target=warmup_speech, args=(tts_loader, warmup_started), daemon=True
+        ).start()
+
         # Greet user
         greet_user()
 
@@ -157,12 +220,32 @@ def grokvis_run():
         speak("Sorry, something went wrong with the main loop.")
     finally:
         # Cleanup
+        try:
+            # Flush queued memory writes before the database is closed
+            from grokvis.memory import close_memory_writer
+            close_memory_writer()
+        except Exception as e:
+            logging.error(f"Memory Flush Error: {e}")
+        try:
+            from grokvis.tts_manager import close_speech_queue, close_output_stream, get_tts_metrics, get_audio_cache
+            close_speech_queue()
+            metrics_logger.info(f"TTS metrics: {get_tts_metrics()}")
+            metrics_logger.info(f"Audio cache stats: {get_audio_cache().stats()}")
+            close_output_stream()
+        except Exception as e:
+            logging.error(f"Audio Output Cleanup Error: {e}")
         if executor:
             executor.shutdown()
         if scheduler:
             scheduler.shutdown()
         if conn:
-            conn.close()
+            with conn_lock:
+                conn.close()
+        if embedding_cache:
+            from grokvis.intent_classifier import get_classifier_stats
+            metrics_logger.info(f"Intent classifier stats: {get_classifier_stats()}")
+            metrics_logger.info(f"Embedding cache stats: {embedding_cache.stats()}")
+            embedding_cache.close()
         pynvml.nvmlShutdown()
 
 
@@ -0,0 +1,139 @@
+"""
+Embedding cache for GrokVIS.
+Wraps the SentenceTransformer encoder with an in-RAM LRU and an on-disk
+SQLite store keyed by a hash of the normalized text, so repeated commands
+never run the model forward pass twice.
+"""
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+import numpy as np
+
+
+def normalize_text(text):
+    """Lowercase and collapse whitespace so trivial variations share a key."""
+    return re.sub(r"\s+", " ", text.strip().lower())
+
+
+class EmbeddingCache:
+    """LRU plus on-disk cache around an encoder's encode() method."""
+
+    def __init__(self, model, model_name, path="embedding_cache.db", max_entries=4096):
+        """
+        Parameters:
+            model: Object with an encode(text or list of texts) method.
+            model_name (str): Name mixed into every key so switching models never reuses vectors.
+            path (str, optional): SQLite file for the persistent tier, or None for RAM only.
+            max_entries (int, optional): Number of vectors kept in the RAM tier.
+        """
+        self.model = model
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            try:
+                self._db = sqlite3.connect(path, check_same_thread=False)
+                self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)")
+                self._db.commit()
+            except Exception as e:
+                logging.error(f"Embedding Cache Error: {e}")
+                self._db = None
+
+    def key(self, text):
+        """Return the cache key for a piece of text."""
+        return hashlib.sha1(f"{self.model_name}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+    def encode(self, text):
+        """Return the embedding for one text."""
+        return self.encode_many([text])[0]
+
+    def encode_many(self, texts):
+        """Return embeddings for a list of texts, encoding all misses in one batch."""
+        keys = [self.key(text) for text in texts]
+        vectors = [None] * len(texts)
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    vectors[i] = vector
+                    self.hits += 1
+            missing = [i for i, vector in enumerate(vectors) if vector is None]
+            if missing and self._db is not None:
+                found = self._load([keys[i] for i in missing])
+                for i in missing:
+                    if keys[i] in found:
+                        vectors[i] = found[keys[i]]
+                        self._remember(keys[i], vectors[i])
+                        self.disk_hits += 1
+                missing = [i for i in missing if vectors[i] is None]
+
+        if missing:
+            # Several copies of the same text in one batch only need one forward pass
+            unique = list(dict.fromkeys(keys[i] for i in missing))
+            first = {}
+            for i in missing:
+                first.setdefault(keys[i], texts[i])
+            encoded = np.asarray(self.model.encode([first[key] for key in unique]), dtype=np.float32)
+            fresh = dict(zip(unique, encoded))
+            with self._lock:
+                self.misses += len(unique)
+                for key, vector in fresh.items():
+                    self._remember(key, vector)
+                self._save(fresh)
+            for i in missing:
+                vectors[i] = fresh[keys[i]]
+        return np.stack(vectors)
+
+    def stats(self):
+        """Return hit/miss counters for logging or the dashboard."""
+        total = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.disk_hits) / total if total else 0.0,
+            "entries": len(self._memory),
+        }
+
+    def _remember(self, key, vector):
+        """Insert into the RAM tier, evicting the least recently used vector."""
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _load(self, keys):
+        """Fetch vectors for the given keys from the disk tier."""
+        try:
+            placeholders = ",".join("?" * len(keys))
+            rows = self._db.execute(f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", keys)
+            return {key: np.frombuffer(blob, dtype=np.float32) for key, blob in rows}
+        except Exception as e:
+            logging.error(f"Embedding Cache Read Error: {e}")
+            return {}
+
+    def _save(self, vectors):
+        """Write freshly encoded vectors to the disk tier."""
+        if self._db is None:
+            return
+        try:
+            self._db.executemany("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                                 [(key, vector.tobytes()) for key, vector in vectors.items()])
+            self._db.commit()
+        except Exception as e:
+            logging.error(f"Embedding Cache Write Error: {e}")
+
+    def close(self):
+        """Close the disk tier."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
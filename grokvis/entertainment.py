@@ -8,11 +8,14 @@ import random
 import time
 import json
 import os
+import re
 from datetime import datetime
 
 # Import from core module
 from grokvis.speech import speak
+from grokvis.tts_manager import speak_many
 from grokvis.core import executor
+from grokvis.intent_router import register_intent
 
 def tell_joke():
     """Tell a random joke from the JokeAPI."""
@@ -152,9 +155,7 @@ def play_trivia(category=None):
 
             speak(f"Here's your trivia question: {question}")
             time.sleep(1)
-            speak("Here are your options:")
-            for i, option in enumerate(options, 1):
-                speak(f"{i}. {option}")
+            speak_many(["Here are your options:"] + [f"{i}. {option}" for i, option in enumerate(options, 1)])
             time.sleep(1)
             speak(f"The correct answer is: {correct_answer}")
         else:
@@ -164,9 +165,8 @@ def play_trivia(category=None):
                 "options": ["Paris", "London", "Berlin", "Madrid"],
                 "correct": "Paris",
             }
-            speak(f"Here's a trivia question: {fallback['question']}")
-            for i, option in enumerate(fallback["options"], 1):
-                speak(f"{i}. {option}")
+            speak_many([f"Here's a trivia question: {fallback['question']}"]
+                       + [f"{i}. {option}" for i, option in enumerate(fallback["options"], 1)])
             time.sleep(1)
             speak(f"The correct answer is: {fallback['correct']}")
     except Exception as e:
@@ -278,3 +278,17 @@ def tell_riddle():
     except Exception as e:
         logging.error(f"Riddle API Error: {e}")
         speak("Sorry, my riddle box is empty right now!")
+
+
+def _movie_location_slots(command):
+    """Return the location of a movie listings command."""
+    # A whole word, so the "in" of "playing" is not taken for it
+    found = re.search(r"\bin\s+(.+)", command)
+    return {"location": found.group(1).strip() if found else "nearby"}
+
+# Intents routed here by commands.process_command
+register_intent("tell_joke", ["tell me a joke", "joke"], tell_joke)
+register_intent("play_music", [["play some", "music"]], play_music,
+                lambda command: {"genre": command.split("play some")[1].split("music")[0].strip()})
+register_intent("movie_listings", ["what movies are playing"], get_movie_listings, _movie_location_slots)
+register_intent("random_fact", ["random fact", "give me a fact"], share_random_fact)
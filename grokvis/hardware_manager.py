@@ -3,6 +3,7 @@ Detects available hardware (NVIDIA, Intel, AMD) and configures the application a
 """
 
 import os
+import json
 import logging
 import platform
 import subprocess
@@ -11,6 +12,20 @@ from typing import Dict, Optional, Tuple, List
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Results written by tests/benchmark_tts_models.py
+TTS_BENCHMARK_PATH = os.path.join("models", "voice", "tts_benchmark.json")
+
+# Candidate TTS models, preferred first when they keep up with real time
+TTS_MODEL_PREFERENCE = [
+    "tts_models/en/ljspeech/glow-tts",
+    "tts_models/en/ljspeech/tacotron2-DDC",
+    "tts_models/en/ljspeech/vits",
+]
+
+# A benchmarked model is only chosen if it synthesizes at least this much faster
+# than real time, leaving headroom for recognition and the rest of the assistant
+TTS_TARGET_RTF = 0.5
+
 class HardwareManager:
     """Manages hardware detection and configuration for optimal performance."""
 
@@ -292,12 +307,17 @@ class HardwareManager:
             'gpu': False
         }
 
+        # Measured results for this machine take precedence over the heuristics below
+        benchmarked = self.get_benchmarked_tts_model(gpu=device != 'cpu')
+        if benchmarked:
+            config['model_name'] = benchmarked
+
         # Adjust based on detected hardware
         if device == 'cuda':
             # NVIDIA GPU available
             config['gpu'] = True
             # For high-end GPUs, we could use more complex models
-            if self.hardware_info['gpu']['vram'] and self.hardware_info['gpu']['vram'] > 6:
+            if not benchmarked and self.hardware_info['gpu']['vram'] and self.hardware_info['gpu']['vram'] > 6:
                 config['model_name'] = "tts_models/en/ljspeech/glow-tts"
 
         elif device == 'mps':
@@ -314,6 +334,101 @@ class HardwareManager:
 
         return config
 
+    def get_tts_candidates(self) -> List[Dict]:
+        """
+        Get every TTS configuration worth benchmarking on this machine.
+
+        Returns:
+            List[Dict]: One configuration per candidate model and usable device
+        """
+        devices = [False]
+        if self.get_optimal_device() != 'cpu':
+            devices.append(True)
+        return [{'model_name': model_name, 'progress_bar': False, 'gpu': gpu}
+                for gpu in devices for model_name in TTS_MODEL_PREFERENCE]
+
+    def get_fingerprint(self) -> Dict:
+        """Get the hardware identity that benchmark results are tied to."""
+        gpu = self.hardware_info['gpu']['model']
+        # Older pynvml versions report the device name as bytes
+        if isinstance(gpu, bytes):
+            gpu = gpu.decode('utf-8', 'replace')
+        return {
+            'cpu': self.hardware_info['cpu']['model'],
+            'threads': self.hardware_info['cpu']['threads'],
+            'gpu': gpu,
+        }
+
+    def load_tts_benchmark(self, path: str = TTS_BENCHMARK_PATH) -> Optional[Dict]:
+        """
+        Load TTS benchmark results recorded on this machine.
+
+        Returns:
+            Optional[Dict]: The results, or None if missing, unreadable or from other hardware
+        """
+        try:
+            with open(path, 'r') as f:
+                results = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read TTS benchmark results from {path}: {e}")
+            return None
+
+        if results.get('hardware') != self.get_fingerprint():
+            logger.info("TTS benchmark results are from different hardware; ignoring them")
+            return None
+        return results
+
+    def get_benchmarked_tts_model(self, gpu: bool, path: str = TTS_BENCHMARK_PATH) -> Optional[str]:
+        """
+        Choose a TTS model from recorded benchmark results.
+
+        Parameters:
+            gpu (bool): Whether synthesis will run on the GPU.
+            path (str, optional): Benchmark results file.
+
+        Returns:
+            Optional[str]: The most preferred model that met TTS_TARGET_RTF, the fastest
+                measured model if none did, or None without usable results
+        """
+        results = self.load_tts_benchmark(path)
+        if not results:
+            return None
+
+        measured = {entry['model_name']: entry['real_time_factor'] for entry in results.get('results', [])
+                    if entry.get('gpu') == gpu and entry.get('real_time_factor') is not None}
+        if not measured:
+            return None
+
+        for model_name in TTS_MODEL_PREFERENCE:
+            if measured.get(model_name, float('inf')) <= TTS_TARGET_RTF:
+                return model_name
+        return min(measured, key=measured.get)
+
+    def get_tts_tiers(self) -> List[Tuple[str, Dict]]:
+        """
+        Get the TTS engine tiers to try, best quality first.
+
+        The "quality" tier is the configuration from get_tts_config(). The "fast"
+        tier is a small end-to-end VITS model that needs no separate vocoder and
+        keeps up with real time on CPU-only hosts, at some cost in voice quality.
+
+        Returns:
+            List[Tuple[str, Dict]]: (tier name, TTS configuration) pairs
+        """
+        quality = self.get_tts_config()
+        fast = {
+            'model_name': "tts_models/en/ljspeech/vits",
+            'progress_bar': False,
+            'gpu': quality['gpu']
+        }
+
+        tiers = [("quality", quality)]
+        if fast['model_name'] != quality['model_name']:
+            tiers.append(("fast", fast))
+        return tiers
+
     def get_summary(self) -> str:
         """Get a human-readable summary of detected hardware."""
         cpu_info = self.hardware_info['cpu']
@@ -3,11 +3,13 @@ Home automation functionality for GrokVIS.
 Handles controlling smart devices and PC wake-on-LAN.
 """
 import logging
+import re
 import wakeonlan
 import socket
 
 # Import from core module
 from grokvis.speech import speak
+from grokvis.intent_router import register_intent
 
 def wake_pc(mac_address="YOUR_PC_MAC"):
     """Wake a PC using Wake-on-LAN."""
@@ -54,4 +56,32 @@ def check_device_status(device):
     except Exception as e:
         logging.error(f"Device Status Check Error: {e}")
         speak(f"Sorry, I couldn't check the status of {device}.")
-        return False
\ No newline at end of file
+        return False
+
+def set_temperature(temp):
+    """Set the thermostat temperature."""
+    speak(f"Setting temperature to {temp} degrees.")
+    # This would connect to a smart thermostat API in a real implementation
+
+def set_scene(scene):
+    """Activate a lighting scene."""
+    speak(f"Setting scene to {scene}.")
+    # This would activate a predefined scene in a real implementation
+
+def _device_action_slots(command):
+    """Return the device and action of a turn on/turn off/dim command."""
+    action = "turn on" if "turn on" in command else "turn off" if "turn off" in command else "dim"
+    # Extract the device name from the command
+    return {"device": command.split(action)[1].strip(), "action": action.split()[0]}
+
+# Intents routed here by commands.process_command
+register_intent("wake_pc", ["turn on my pc", "wake my pc"], wake_pc)
+register_intent("control_device", ["turn on", "turn off", "dim"], control_device, _device_action_slots)
+register_intent("check_device", [["check", "status"], ["check", "online"]], check_device_status,
+                lambda command: {"device": command.split("check")[1].replace("status", "").replace("online", "").strip()})
+register_intent("set_temperature", ["set temperature to"], set_temperature,
+                lambda command: {"temp": int(re.search(r'\d+', command.split("set temperature to")[1].strip()).group())})
+register_intent("set_scene", ["set scene"], set_scene,
+                lambda command: {"scene": command.split("set scene")[1].strip()})
+register_intent("device_status", [["is my", "on"]], check_device_status,
+                lambda command: {"device": command.split("is my")[1].split("on")[0].strip()})
@@ -0,0 +1,255 @@
+"""
+Embedding-based intent classification for GrokVIS.
+Paraphrased commands ("make me laugh", "is it going to rain in Paris")
+contain none of the trigger phrases the intent router looks for. This
+classifier catches them using the sentence embedding model that memory recall
+already loads: example utterances for each intent are embedded once, kept
+in one pre-normalized matrix (cached on disk next to the other models), and
+a command is classified with a single matrix-vector product against it.
+
+It is only consulted when the router finds no match, and only answers when
+the best intent is both similar enough and clearly ahead of the runner-up.
+"""
+import collections
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import numpy as np
+
+from grokvis.memory_index import normalize
+
+PROTOTYPES_PATH = "models/intents/prototypes.npz"
+# Cosine similarity the best example must reach; set GROKVIS_INTENT_THRESHOLD to tune
+THRESHOLD = float(os.environ.get("GROKVIS_INTENT_THRESHOLD", "0.6"))
+# Lead the best intent needs over the next one, so ambiguous commands get the default reply
+MARGIN = 0.05
+
+# Example phrasings per router intent. Only intents whose slot extractors
+# work on free phrasing are listed, and nothing that shuts down, restarts
+# or forgets, since a wrong guess there costs more than a quip. Extractors
+# still decline paraphrases missing a value, such as weather with no city.
+EXAMPLES = {
+    "tell_joke": [
+        "make me laugh",
+        "say something funny",
+        "do you know any good one-liners",
+        "cheer me up with something funny",
+        "got anything hilarious for me",
+    ],
+    "random_fact": [
+        "tell me something interesting",
+        "teach me something i don't know",
+        "share some trivia",
+        "surprise me with a fun fact",
+        "what's something cool i probably don't know",
+    ],
+    "news_headlines": [
+        "what's happening in the world",
+        "catch me up on current events",
+        "any top stories today",
+        "read me the latest headlines",
+        "what's going on today",
+    ],
+    "weather": [
+        "is it going to rain in london",
+        "how hot is it outside in paris",
+        "do i need an umbrella in seattle",
+        "what's it like outside in berlin",
+        "is it cold in chicago",
+    ],
+    "show_notes": [
+        "read me my notes",
+        "what did i write down",
+        "list everything i've noted",
+        "what's in my notebook",
+        "go through my saved notes",
+    ],
+    "show_shopping_list": [
+        "what do i need to buy",
+        "read me the grocery list",
+        "what's on my list for the store",
+        "what groceries do i need",
+        "list what i have to pick up at the shop",
+    ],
+    "start_stopwatch": [
+        "begin timing me",
+        "start counting the time",
+        "clock how long this takes",
+        "start timing now",
+    ],
+    "stop_stopwatch": [
+        "stop timing me",
+        "how long was that",
+        "stop counting the time",
+        "end the timing",
+    ],
+    "take_screenshot": [
+        "grab a picture of my screen",
+        "save what's on the screen",
+        "snap the display",
+        "capture what i'm looking at",
+    ],
+    "system_status": [
+        "how is my pc doing",
+        "how much memory is in use",
+        "what's the cpu usage",
+        "is my machine running hot",
+        "check how busy the computer is",
+    ],
+    "check_for_updates": [
+        "is there a newer version of you",
+        "are you up to date",
+        "upgrade yourself",
+        "get the latest version",
+    ],
+    "volume": [
+        "make it louder",
+        "turn it down a bit",
+        "speak up",
+        "a bit louder please",
+        "can you be quieter",
+    ],
+    "remember_conversation": [
+        "keep this chat for later",
+        "save what we just talked about",
+        "don't forget this discussion",
+        "store this exchange",
+    ],
+}
+
+
+class IntentClassifier:
+    """Nearest-example intent classifier over a pre-normalized prototype matrix."""
+
+    def __init__(self, encode, examples, path=None, model_name="", threshold=THRESHOLD, margin=MARGIN):
+        """
+        Parameters:
+            encode (callable): list of texts -> matrix of embeddings, such as EmbeddingCache.encode_many.
+            examples (dict[str, list[str]]): Example utterances per intent name.
+            path (str, optional): .npz file caching the prototype matrix; rebuilt when the
+                model name or the examples change.
+            model_name (str, optional): Embedding model name, part of the cache key.
+            threshold (float, optional): Lowest cosine similarity accepted for the best intent.
+            margin (float, optional): Lowest lead of the best intent over the runner-up.
+        """
+        self.encode = encode
+        self.threshold = threshold
+        self.margin = margin
+        self.labels = [name for name, texts in examples.items() if texts]
+        texts = [text for name in self.labels for text in examples[name]]
+        counts = [len(examples[name]) for name in self.labels]
+        # Rows are grouped by intent; reduceat takes each group's best score
+        self._starts = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(np.intp)
+        self._latencies = collections.deque(maxlen=1000)
+        self.queries = 0
+        self.matches = 0
+        key = hashlib.sha1(json.dumps([model_name, self.labels, texts]).encode("utf-8")).hexdigest()
+        self.matrix = self._load(path, key, len(texts))
+        if self.matrix is None:
+            self.matrix = normalize(encode(texts))
+            self._save(path, key)
+
+    @staticmethod
+    def _load(path, key, rows):
+        """Return the cached matrix if it was built from the same model and examples."""
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as saved:
+                if str(saved["key"]) == key and len(saved["matrix"]) == rows:
+                    return saved["matrix"]
+        except Exception as e:
+            logging.error(f"Intent Prototype Load Error: {e}")
+        return None
+
+    def _save(self, path, key):
+        """Write the matrix and its key, replacing the file atomically."""
+        if not path:
+            return
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            temp_path = f"{path}.tmp"
+            with open(temp_path, "wb") as f:
+                np.savez(f, matrix=self.matrix, key=key)
+            os.replace(temp_path, path)
+        except Exception as e:
+            logging.error(f"Intent Prototype Save Error: {e}")
+
+    def scores(self, command):
+        """Return each intent's best cosine similarity to command, in label order."""
+        query = normalize(self.encode([command]))[0]
+        return np.maximum.reduceat(self.matrix @ query, self._starts)
+
+    def classify(self, command):
+        """Return (intent name, score), with None as the name when no intent is confident enough."""
+        start = time.perf_counter()
+        scores = self.scores(command)
+        best = int(np.argmax(scores))
+        runner_up = np.partition(scores, -2)[-2] if len(scores) > 1 else -1.0
+        confident = bool(scores[best] >= self.threshold and scores[best] - runner_up >= self.margin)
+        self._latencies.append(time.perf_counter() - start)
+        self.queries += 1
+        self.matches += confident
+        return (self.labels[best] if confident else None), float(scores[best])
+
+    def stats(self):
+        """Return query counters and latency over the recent classifications."""
+        latencies = np.asarray(self._latencies) * 1000
+        return {
+            "queries": self.queries,
+            "matches": self.matches,
+            "mean_ms": float(latencies.mean()) if len(latencies) else None,
+            "p99_ms": float(np.percentile(latencies, 99)) if len(latencies) else None,
+        }
+
+
+_classifier = None
+_classifier_lock = threading.Lock()
+
+
+def get_classifier():
+    """Return the shared classifier, embedding the examples on first use; None before the model loads."""
+    global _classifier
+    with _classifier_lock:
+        if _classifier is None:
+            import grokvis.core as core
+            if core.embedding_cache is None:
+                return None
+            try:
+                _classifier = IntentClassifier(core.embedding_cache.encode_many, EXAMPLES,
+                                               PROTOTYPES_PATH, core.MEMORY_MODEL_NAME)
+            except Exception as e:
+                logging.error(f"Intent Classifier Error: {e}")
+                return None
+        return _classifier
+
+
+def classify_command(command):
+    """
+    Return (intent, slots) for a command the keyword router missed, or (None, None).
+
+    The intent is looked up in the shared router, so its handler and slot
+    extractor are the same ones a trigger phrase would have used.
+    """
+    from grokvis.intent_router import get_router
+    classifier = get_classifier()
+    if classifier is None:
+        return None, None
+    name, _score = classifier.classify(command)
+    intent = get_router().intents.get(name)
+    if intent is None:
+        return None, None
+    try:
+        slots = intent.extract(command)
+    except Exception:
+        # Extractors are written for the trigger phrasing; a paraphrase they cannot parse is declined
+        slots = None
+    return (intent, slots) if slots is not None else (None, None)
+
+
+def get_classifier_stats():
+    """Return the shared classifier's counters, or None before it is built."""
+    return _classifier.stats() if _classifier is not None else None
@@ -0,0 +1,171 @@
+"""
+Intent routing for GrokVIS.
+Feature modules register their commands declaratively: trigger phrases,
+a slot extractor that pulls the handler's arguments out of the utterance,
+and an optional priority. All trigger phrases compile into one
+Aho-Corasick automaton, so routing scans the utterance once no matter how
+many intents are registered, and only the intents whose phrases were
+actually found are considered.
+
+When several intents match, the winner is decided by rank rather than by
+registration order: higher priority first, then the trigger that starts
+earliest in the utterance, then the more specific trigger (more matched
+characters). "start a timer for five minutes" therefore goes to the timer,
+not to "start" an application.
+"""
+import threading
+
+
+class Intent:
+    """One routable command."""
+
+    def __init__(self, name, triggers, handler, slots=None, priority=0, order=0, with_turn=False):
+        """
+        Parameters:
+            name (str): Unique intent name.
+            triggers (list[list[str]]): Alternatives; each is a list of phrases that must all occur.
+            handler (callable): Called with the slots as keyword arguments.
+            slots (callable, optional): command -> dict of handler arguments, or None to decline
+                the command so the next-ranked intent is tried.
+            priority (int, optional): Higher wins before position and specificity are compared.
+            order (int): Registration order, the final tie-break.
+            with_turn (bool, optional): Also pass the command's conversation turn as turn=, for
+                handlers that store memories belonging to it.
+        """
+        self.name = name
+        self.triggers = [tuple(phrase.lower() for phrase in trigger) for trigger in triggers]
+        self.handler = handler
+        self.slots = slots
+        self.priority = priority
+        self.order = order
+        self.with_turn = with_turn
+
+    def extract(self, command):
+        """Return the handler's keyword arguments, or None if this intent declines the command."""
+        return self.slots(command) if self.slots is not None else {}
+
+
+class PhraseMatcher:
+    """Aho-Corasick automaton finding every phrase that starts at a word boundary."""
+
+    def __init__(self, phrases):
+        """
+        Parameters:
+            phrases (iterable[str]): Lowercase phrases to find.
+        """
+        self.phrases = list(dict.fromkeys(phrases))
+        # Node 0 is the root; each node has goto edges, a failure link and the phrases ending there
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        for index, phrase in enumerate(self.phrases):
+            node = 0
+            for char in phrase:
+                if char not in self._goto[node]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                    self._goto[node][char] = len(self._goto) - 1
+                node = self._goto[node][char]
+            self._output[node].append(index)
+        # Breadth-first, so every failure link points at an already finished node
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def find(self, text):
+        """Return {phrase: position of its first occurrence} for phrases found in text.
+
+        A phrase only counts where it starts a word, so "start" is not found in
+        "restart", but it may end mid-word, so "joke" is found in "jokes".
+        """
+        found = {}
+        node = 0
+        for end, char in enumerate(text):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            for index in self._output[node]:
+                phrase = self.phrases[index]
+                if phrase in found:
+                    continue
+                start = end - len(phrase) + 1
+                if start == 0 or not text[start - 1].isalnum():
+                    found[phrase] = start
+        return found
+
+
+class IntentRouter:
+    """Registry of intents, compiled into one phrase matcher on first use."""
+
+    def __init__(self):
+        self.intents = {}
+        self._matcher = None
+        self._by_phrase = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, triggers, handler, slots=None, priority=0, with_turn=False):
+        """
+        Add an intent; see Intent for the parameters.
+
+        Triggers may be given as plain strings for single-phrase alternatives.
+        """
+        triggers = [[trigger] if isinstance(trigger, str) else trigger for trigger in triggers]
+        with self._lock:
+            self.intents[name] = Intent(name, triggers, handler, slots, priority,
+                                       order=len(self.intents), with_turn=with_turn)
+            self._matcher = None
+
+    def _compile(self):
+        """Build the matcher and the phrase -> (intent, trigger) index."""
+        by_phrase = {}
+        for intent in self.intents.values():
+            for trigger in intent.triggers:
+                for phrase in trigger:
+                    by_phrase.setdefault(phrase, []).append((intent, trigger))
+        self._by_phrase = by_phrase
+        self._matcher = PhraseMatcher(by_phrase)
+        return self._matcher
+
+    def candidates(self, command):
+        """Return the intents whose triggers all occur in command, best first."""
+        with self._lock:
+            matcher = self._matcher or self._compile()
+            by_phrase = self._by_phrase
+        found = matcher.find(command.lower())
+        best = {}
+        for phrase in found:
+            for intent, trigger in by_phrase[phrase]:
+                if not all(p in found for p in trigger):
+                    continue
+                rank = (-intent.priority, found[trigger[0]], -sum(len(p) for p in trigger), intent.order)
+                if intent.name not in best or rank < best[intent.name][0]:
+                    best[intent.name] = (rank, intent)
+        return [intent for _, intent in sorted(best.values(), key=lambda item: item[0])]
+
+    def route(self, command):
+        """Return (intent, slots) for the best intent that accepts command, or (None, None)."""
+        for intent in self.candidates(command):
+            slots = intent.extract(command)
+            if slots is not None:
+                return intent, slots
+        return None, None
+
+
+_router = IntentRouter()
+
+
+def get_router():
+    """Return the shared router that feature modules register their intents with."""
+    return _router
+
+
+def register_intent(name, triggers, handler, slots=None, priority=0, with_turn=False):
+    """Register an intent with the shared router; see IntentRouter.register()."""
+    _router.register(name, triggers, handler, slots, priority, with_turn)
@@ -12,6 +12,8 @@ from datetime import datetime
 
 # Import from core module
 from grokvis.speech import speak
+from grokvis.tts_manager import speak_many, PRIORITY_CHATTER
+from grokvis.intent_router import register_intent
 
 def get_wikipedia_summary(topic, sentences=2):
     """Get a summary of a topic from Wikipedia."""
@@ -58,14 +60,15 @@ def get_news_headlines(country='us', category='general', count=5):
             speak("Sorry, I couldn't fetch any news headlines right now.")
             return
         
-        speak(f"Here are the top {min(count, len(news_data['articles']))} headlines:")
+        lines = [f"Here are the top {min(count, len(news_data['articles']))} headlines:"]
         
         for i, article in enumerate(news_data['articles'][:count]):
             headline = article['title']
             source = article['source']['name']
-            speak(f"{i+1}. From {source}: {headline}")
+            lines.append(f"{i+1}. From {source}: {headline}")
             
-        speak("Would you like me to read any of these articles in full?")
+        lines.append("Would you like me to read any of these articles in full?")
+        speak_many(lines, priority=PRIORITY_CHATTER)
     except Exception as e:
         logging.error(f"News API Error: {e}")
         speak("Sorry, I couldn't fetch the news headlines.")
@@ -158,4 +161,14 @@ def translate_text(text, target_language):
             speak("Sorry, I couldn't translate that text.")
     except Exception as e:
         logging.error(f"Translation API Error: {e}")
-        speak("Sorry, I had trouble with the translation service.")
\ No newline at end of file
+        speak("Sorry, I had trouble with the translation service.")
+
+# Intents routed here by commands.process_command
+register_intent("wikipedia_summary", ["tell me about"], get_wikipedia_summary,
+                lambda command: {"topic": command.split("tell me about")[1].strip()})
+register_intent("news_headlines", ["what's in the news", "news headlines"], get_news_headlines)
+register_intent("define_word", ["define"], get_word_definition,
+                lambda command: {"word": command.split("define")[1].strip()})
+register_intent("translate", [["translate", "to"]], translate_text,
+                lambda command: {"text": command.split("translate")[1].split("to")[0].strip(),
+                                 "target_language": command.split("to")[1].strip()})
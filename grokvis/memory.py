@@ -2,49 +2,278 @@
 Memory management functionality for GrokVIS.
 Handles storing and retrieving memories from the database.
 """
-import datetime
 import logging
-import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
+import os
+import threading
+import uuid
+from collections import deque
 
 # Import from core module
-from grokvis.core import memory_model, conn
+from grokvis.core import embedding_cache, conn, conn_lock, scheduler, metrics_logger, MEMORY_DB_PATH
 from grokvis.speech import speak
+from grokvis.intent_router import register_intent
+from grokvis.memory_index import load_index, embedding_format, migrate_embeddings
+from grokvis.memory_index import create_fts, lexical_candidates
+from grokvis.memory_writer import MemoryWriter
+from grokvis.memory_compaction import create_archive, enable_incremental_vacuum, archive_rows, expire_rows
+from grokvis.memory_compaction import delete_rows, incremental_vacuum, cutoff, turn_ids, add_missing_columns
+from grokvis.memory_compaction import create_compaction_state, compacted_through, mark_compacted, exact_duplicates
 
-def store_memory(command, response):
-    """Store a command and response in the memory database."""
+# Embedding indexes over the hot (memory) and archive (memory_archive) partitions, loaded on first use
+_index = None
+_archive_index = None
+_index_lock = threading.Lock()
+# Writer inserts that arrive while the hot index is loading; None when it is not loading
+_pending_inserts = None
+_pending_lock = threading.Lock()
+_writer = None
+_writer_lock = threading.Lock()
+
+# Keyword matches re-ranked below this similarity fall back to a full semantic search
+LEXICAL_MIN_SCORE = 0.5
+
+# Hot-partition matches below this similarity also search the archive
+ARCHIVE_MIN_SCORE = 0.6
+
+# Retention policy: memories move to the archive after HOT_DAYS and are
+# deleted after RETENTION_DAYS (0 keeps archived memories forever)
+HOT_DAYS = int(os.environ.get("GROKVIS_MEMORY_HOT_DAYS", "30"))
+RETENTION_DAYS = int(os.environ.get("GROKVIS_MEMORY_RETENTION_DAYS", "365"))
+
+# Newer memories are compared with older ones at least this similar; an older
+# one is merged into the newer only if the command and response are identical
+DUPLICATE_THRESHOLD = 0.97
+
+# Identifies this run of GrokVIS; stored memories are tagged with it and their turn number
+SESSION_ID = uuid.uuid4().hex
+
+# Recent turns of the current conversation, newest last
+CONVERSATION_TURNS = 20
+_conversation = deque(maxlen=CONVERSATION_TURNS)
+_turn_lock = threading.Lock()
+_last_turn = 0
+
+# Commands that act on the conversation rather than being part of it
+CONVERSATION_CONTROLS = ("forget what i just said", "remember this conversation")
+
+def get_memory_index():
+    """Return the hot-partition embedding index, loading it from the database once.
+
+    Rows the writer commits during the load may be missed by its SELECT, so
+    they are buffered by _index_inserted and added before the index is used.
+    """
+    global _index, _pending_inserts
+    with _index_lock:
+        if _index is None:
+            with _pending_lock:
+                _pending_inserts = []
+            with conn_lock:
+                index = load_index(conn)
+            with _pending_lock:
+                # add() skips ids the SELECT already picked up
+                for ids, embeddings in _pending_inserts:
+                    index.add(ids, embeddings)
+                _pending_inserts = None
+                _index = index
+        return _index
+
+def get_archive_index():
+    """Return the archive-partition embedding index, loading it on first use."""
+    global _archive_index
+    with _index_lock:
+        if _archive_index is None:
+            with conn_lock:
+                _archive_index = load_index(conn, table="memory_archive")
+        return _archive_index
+
+def _index_inserted(ids, embeddings):
+    """Add rows committed by the memory writer to the index, or buffer them while it loads."""
+    with _pending_lock:
+        if _pending_inserts is not None:
+            _pending_inserts.append((ids, embeddings))
+            return
+        index = _index
+    if index is not None:
+        index.add(ids, embeddings)
+
+def get_memory_writer():
+    """Return the background memory writer, starting it on first use."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = MemoryWriter(MEMORY_DB_PATH, embedding_cache, on_insert=_index_inserted,
+                                   embedding_format=embedding_format())
+        return _writer
+
+def close_memory_writer():
+    """Flush queued memories and stop the writer; called on shutdown."""
+    global _writer
+    with _writer_lock:
+        if _writer is not None:
+            _writer.close()
+            metrics_logger.info(f"Memory writer stored {_writer.written} memories in {_writer.batches} batches")
+            _writer = None
+
+def record_turn(command, response="Processed."):
+    """Add a command to the current conversation and return its turn number."""
+    global _last_turn
+    with _turn_lock:
+        _last_turn += 1
+        _conversation.append({"turn": _last_turn, "command": command, "response": response, "stored": False})
+        return _last_turn
+
+def store_memory(command, response, turn=None):
+    """
+    Queue a command and response for storage.
+
+    Parameters:
+        command (str): The text to remember.
+        response (str): What was replied.
+        turn (int, optional): Conversation turn the memory belongs to, as returned by record_turn().
+            Memories stored outside a turn, such as by scheduled jobs, are left untagged so
+            forgetting a turn never removes them.
+    """
     try:
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
-        embedding = memory_model.encode(command + " " + response).tobytes()
-        conn.execute("INSERT INTO memory (timestamp, command, response, embedding) VALUES (?, ?, ?, ?)",
-                     (timestamp, command, response, embedding))
-        conn.commit()
+        if turn is not None:
+            with _turn_lock:
+                for entry in _conversation:
+                    if entry["turn"] == turn:
+                        entry["stored"] = True
+        get_memory_writer().submit(command, response, session_id=SESSION_ID, turn=turn)
     except Exception as e:
         logging.error(f"Memory Storage Error: {e}")
         speak("Sorry, I couldn't store that memory.")
 
+def remember_conversation(turns=None):
+    """Store the last turns of the conversation that are not stored yet; returns how many."""
+    with _turn_lock:
+        entries = list(_conversation)[-turns:] if turns else list(_conversation)
+        pending = [entry for entry in entries if not entry["stored"]]
+        for entry in pending:
+            entry["stored"] = True
+    writer = get_memory_writer()
+    for entry in pending:
+        writer.submit(entry["command"], entry["response"], session_id=SESSION_ID, turn=entry["turn"])
+    return len(pending)
+
+def forget_last_turn():
+    """Remove the previous turn from the conversation, the database and the index.
+
+    Returns the forgotten command, or None if there is nothing to forget.
+    """
+    with _turn_lock:
+        if not _conversation:
+            return None
+        entry = _conversation.pop()
+    try:
+        if _writer is not None:
+            # The turn may still be waiting in the write queue
+            _writer.flush()
+        with conn_lock:
+            ids = turn_ids(conn, SESSION_ID, [entry["turn"]])
+            if ids:
+                delete_rows(conn, ids)
+        if ids:
+            if _index is not None:
+                _index.remove(ids)
+    except Exception as e:
+        logging.error(f"Memory Forget Error: {e}")
+    return entry["command"]
+
 def recall_memory(query, top_k=1):
     """Recall the most similar past command and response."""
     try:
-        query_emb = memory_model.encode(query)
-        cursor = conn.execute("SELECT command, response, embedding FROM memory")
-        results = []
-        for cmd, resp, emb_blob in cursor:
-            emb = np.frombuffer(emb_blob, dtype=np.float32)
-            similarity = cosine_similarity([query_emb], [emb])[0][0]
-            results.append((similarity, cmd, resp))
-        results.sort(reverse=True)
-        return [(cmd, resp) for _, cmd, resp in results[:top_k]]
+        if _writer is not None:
+            # Memories stored a moment ago may still be queued
+            _writer.flush()
+        query_emb = embedding_cache.encode(query)
+        index = get_memory_index()
+        # Cheap BM25 keyword candidates first, re-ranked by embedding similarity
+        with conn_lock:
+            candidates = lexical_candidates(conn, query)
+        hits = index.search_ids(query_emb, candidates, top_k)
+        if not hits or hits[0][0] < LEXICAL_MIN_SCORE:
+            hits = index.search(query_emb, top_k)
+        # Only reach into the archive when recent memories have no good match
+        if not hits or hits[0][0] < ARCHIVE_MIN_SCORE:
+            hits = sorted(hits + get_archive_index().search(query_emb, top_k), reverse=True)[:top_k]
+        if not hits:
+            return []
+        ids = [row_id for _, row_id in hits]
+        placeholders = ",".join("?" * len(ids))
+        by_id = {}
+        with conn_lock:
+            for table in ("memory", "memory_archive"):
+                rows = conn.execute(f"SELECT id, command, response FROM {table} WHERE id IN ({placeholders})", ids)
+                by_id.update((row_id, (cmd, resp)) for row_id, cmd, resp in rows)
+        return [by_id[row_id] for row_id in ids if row_id in by_id]
     except Exception as e:
         logging.error(f"Memory Recall Error: {e}")
         speak("Sorry, I couldn't recall that memory.")
         return []
 
-def handle_memory(command):
-    """Handle memory-related commands."""
+def compact_memory():
+    """Merge repeated memories, archive old ones, apply retention and vacuum.
+
+    Runs as a scheduled APScheduler job; see schedule_memory_compaction.
+    """
+    global _archive_index
+    try:
+        if _writer is not None:
+            _writer.flush()
+        index = get_memory_index()
+
+        # Only memories stored since the last compaction are checked for duplicates
+        with conn_lock:
+            since = compacted_through(conn)
+            newest = conn.execute("SELECT COALESCE(MAX(id), 0) FROM memory").fetchone()[0]
+        # Each step takes the connection lock on its own, never while holding _index_lock
+        pairs = index.near_duplicates(since, DUPLICATE_THRESHOLD)
+        with conn_lock:
+            duplicates = exact_duplicates(conn, pairs)
+            if duplicates:
+                delete_rows(conn, duplicates)
+            mark_compacted(conn, max(since, newest))
+        if duplicates:
+            index.remove(duplicates)
+
+        with conn_lock:
+            archived = archive_rows(conn, cutoff(HOT_DAYS))
+        if archived:
+            index.remove(archived)
+            with _index_lock:
+                # Reloaded from the archive table on the next archive search
+                _archive_index = None
+
+        with conn_lock:
+            expired = expire_rows(conn, cutoff(RETENTION_DAYS)) if RETENTION_DAYS else []
+        if expired and _archive_index is not None:
+            _archive_index.remove(expired)
+
+        with conn_lock:
+            # One-time rebuild of a database created before incremental vacuum was used
+            rebuilt = enable_incremental_vacuum(conn)
+        if rebuilt is not None:
+            metrics_logger.info(f"Memory database switched to incremental vacuum in {rebuilt:.1f}s")
+        with conn_lock:
+            incremental_vacuum(conn)
+        metrics_logger.info(f"Memory compaction: {len(duplicates)} duplicates merged, {len(archived)} archived, "
+                            f"{len(expired)} expired")
+    except Exception as e:
+        logging.error(f"Memory Compaction Error: {e}")
+
+def schedule_memory_compaction(hours=24):
+    """Register the compaction job on the APScheduler."""
+    try:
+        scheduler.add_job(compact_memory, "interval", hours=hours, id="memory_compaction", replace_existing=True)
+    except Exception as e:
+        logging.error(f"Memory Compaction Scheduling Error: {e}")
+
+def handle_memory(command, turn=None):
+    """Handle memory-related commands; turn is the conversation turn of the command."""
     if "remember" in command:
         parts = command.split("remember")[-1].strip()
-        store_memory(parts, "Noted.")
+        store_memory(parts, "Noted.", turn=turn)
         speak(f"Got it, I'll remember: {parts}.")
     elif "what did i" in command or "recall" in command:
         query = command.split("about")[-1].strip() if "about" in command else command
@@ -58,16 +287,57 @@ def handle_memory(command):
 def initialize_memory_db():
     """Initialize the memory database if it doesn't exist."""
     try:
-        conn.execute('''
-        CREATE TABLE IF NOT EXISTS memory (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            timestamp TEXT,
-            command TEXT,
-            response TEXT,
-            embedding BLOB
-        )
-        ''')
-        conn.commit()
+        with conn_lock:
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS memory (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp TEXT,
+                command TEXT,
+                response TEXT,
+                embedding BLOB,
+                embedding_format TEXT,
+                session_id TEXT,
+                turn INTEGER
+            )
+            ''')
+            # Older databases lack the newer columns; a NULL format stands for a
+            # float32 row, and rows without a session predate conversation tracking
+            add_missing_columns(conn, "memory", {"embedding_format": "TEXT", "session_id": "TEXT", "turn": "INTEGER"})
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_memory_timestamp ON memory (timestamp)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_memory_session ON memory (session_id, turn, timestamp)")
+            conn.commit()
+            create_archive(conn)
+            create_compaction_state(conn)
+            create_fts(conn)
+
+            fmt = embedding_format()
+            for table in ("memory", "memory_archive"):
+                stale = conn.execute(f"SELECT COUNT(*) FROM {table} WHERE COALESCE(embedding_format, 'float32') != ?",
+                                     (fmt,)).fetchone()[0]
+                if stale:
+                    logging.info(f"Migrating {stale} {table} embeddings to {fmt}")
+                    migrate_embeddings(conn, fmt, table=table)
     except Exception as e:
         logging.error(f"Memory DB Initialization Error: {e}")
-        speak("Sorry, I couldn't initialize the memory database.")
\ No newline at end of file
+        speak("Sorry, I couldn't initialize the memory database.")
+
+
+def forget_last_turn_command():
+    """Drop the last recorded turn and say whether there was one."""
+    if forget_last_turn() is not None:
+        speak("I've forgotten your last statement.")
+    else:
+        speak("There's nothing to forget.")
+
+
+def remember_conversation_command():
+    """Store the current conversation and say whether anything was new."""
+    stored = remember_conversation()
+    speak("I'll remember our current conversation." if stored else "There's nothing new to remember.")
+
+
+# Intents routed here by commands.process_command
+register_intent("forget_last_turn", ["forget what i just said"], forget_last_turn_command)
+register_intent("remember_conversation", ["remember this conversation"], remember_conversation_command)
+register_intent("memory", ["remember", "recall", "what did i"], handle_memory, lambda command: {"command": command},
+                with_turn=True)
@@ -0,0 +1,144 @@
+"""
+Memory retention and compaction for GrokVIS.
+Splits the memory database into a hot partition (the memory table) and an
+archive partition (memory_archive), expires rows past the retention
+window, drops repeated memories and returns freed pages to the
+filesystem with incremental vacuum.
+"""
+import datetime
+import logging
+import time
+
+# Timestamps are stored as "%Y-%m-%d %H:%M", which sorts chronologically as text
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M"
+
+
+def cutoff(days, now=None):
+    """Return the timestamp string for the given number of days ago."""
+    now = now or datetime.datetime.now()
+    return (now - datetime.timedelta(days=days)).strftime(TIMESTAMP_FORMAT)
+
+
+def create_archive(conn):
+    """Create the archive partition with the same columns as the memory table."""
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS memory_archive (
+        id INTEGER PRIMARY KEY,
+        timestamp TEXT,
+        command TEXT,
+        response TEXT,
+        embedding BLOB,
+        embedding_format TEXT,
+        session_id TEXT,
+        turn INTEGER
+    )
+    ''')
+    add_missing_columns(conn, "memory_archive", {"session_id": "TEXT", "turn": "INTEGER"})
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_memory_archive_timestamp ON memory_archive (timestamp)")
+    conn.commit()
+
+
+def add_missing_columns(conn, table, columns):
+    """Add any of the given {name: type} columns that an older table lacks."""
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    for name, column_type in columns.items():
+        if name not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {column_type}")
+
+
+def enable_incremental_vacuum(conn):
+    """Switch the database to incremental auto-vacuum; return the seconds it took, or None if it was on already.
+
+    On a database that already has tables the mode only takes effect after a
+    full VACUUM, which rewrites the whole file under an exclusive lock, so
+    this is run once from the compaction job rather than at startup.
+    Afterwards compaction can free pages in small steps.
+    """
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+        return None
+    started = time.perf_counter()
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    conn.execute("VACUUM")
+    return time.perf_counter() - started
+
+
+def archive_rows(conn, before):
+    """Move memory rows older than the cutoff into the archive; returns their ids."""
+    with conn:
+        ids = [row_id for row_id, in conn.execute("SELECT id FROM memory WHERE timestamp < ?", (before,))]
+        if ids:
+            conn.execute("INSERT OR REPLACE INTO memory_archive (id, timestamp, command, response, embedding, "
+                         "embedding_format, session_id, turn) SELECT id, timestamp, command, response, embedding, "
+                         "embedding_format, session_id, turn FROM memory WHERE timestamp < ?", (before,))
+            conn.execute("DELETE FROM memory WHERE timestamp < ?", (before,))
+    return ids
+
+
+def expire_rows(conn, before):
+    """Delete archived rows older than the retention cutoff; returns their ids."""
+    with conn:
+        ids = [row_id for row_id, in conn.execute("SELECT id FROM memory_archive WHERE timestamp < ?", (before,))]
+        if ids:
+            conn.execute("DELETE FROM memory_archive WHERE timestamp < ?", (before,))
+    return ids
+
+
+def turn_ids(conn, session_id, turns):
+    """Return ids of memory rows stored for the given turns of a session."""
+    placeholders = ",".join("?" * len(turns))
+    rows = conn.execute(f"SELECT id FROM memory WHERE session_id = ? AND turn IN ({placeholders})",
+                        [session_id, *turns])
+    return [row_id for row_id, in rows]
+
+
+def create_compaction_state(conn):
+    """Create the table holding the newest memory id already checked for duplicates.
+
+    A database that predates it starts from its current newest row, which
+    earlier compactions already checked.
+    """
+    with conn:
+        conn.execute("CREATE TABLE IF NOT EXISTS memory_compaction (last_id INTEGER NOT NULL)")
+        conn.execute("INSERT INTO memory_compaction (last_id) SELECT COALESCE(MAX(id), 0) FROM memory "
+                     "WHERE NOT EXISTS (SELECT 1 FROM memory_compaction)")
+
+
+def compacted_through(conn):
+    """Return the newest memory id already checked for duplicates."""
+    return conn.execute("SELECT last_id FROM memory_compaction").fetchone()[0]
+
+
+def mark_compacted(conn, last_id):
+    """Record that memories up to last_id have been checked for duplicates."""
+    with conn:
+        conn.execute("UPDATE memory_compaction SET last_id = ?", (last_id,))
+
+
+def exact_duplicates(conn, pairs):
+    """Return the older id of each (older, newer) pair whose command and response match exactly.
+
+    Similar embeddings alone are not enough: "call mom at 5" and "call mom
+    at 6" are different memories.
+    """
+    ids = sorted({row_id for pair in pairs for row_id in pair})
+    if not ids:
+        return []
+    placeholders = ",".join("?" * len(ids))
+    texts = {row_id: (command, response) for row_id, command, response in
+             conn.execute(f"SELECT id, command, response FROM memory WHERE id IN ({placeholders})", ids)}
+    return sorted({older for older, newer in pairs
+                   if older in texts and newer in texts and texts[older] == texts[newer]})
+
+
+def delete_rows(conn, ids, table="memory"):
+    """Delete rows by id from one partition."""
+    with conn:
+        conn.executemany(f"DELETE FROM {table} WHERE id = ?", [(row_id,) for row_id in ids])
+
+
+def incremental_vacuum(conn, pages=2000):
+    """Release up to the given number of free pages back to the filesystem."""
+    try:
+        conn.execute(f"PRAGMA incremental_vacuum({int(pages)})").fetchall()
+    except Exception as e:
+        logging.error(f"Incremental Vacuum Error: {e}")
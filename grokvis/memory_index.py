@@ -0,0 +1,570 @@
+"""
+In-memory embedding index for GrokVIS memory recall.
+Keeps every stored embedding in one contiguous, pre-normalized matrix so a
+recall is a single matrix-vector product instead of a per-row scan. The
+matrix can be held as float32, float16 or per-vector-scaled int8, matching
+the format the embeddings are stored in on disk. An FTS5 mirror of the
+memory text supplies BM25 keyword candidates for cheap re-ranking.
+"""
+import logging
+import os
+import re
+import threading
+import numpy as np
+
+# Supported storage formats for embeddings, on disk and in the index
+EMBEDDING_FORMATS = ("float32", "float16", "int8")
+
+# Rows scored per block when the matrix has to be widened to float32
+SCORE_CHUNK = 8192
+
+
+def normalize(vectors):
+    """Return L2-normalized float32 copies of one or more vectors."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def quantize(vectors, fmt):
+    """Quantize normalized vectors; returns (codes, per-row scales or None)."""
+    if fmt == "float32":
+        return vectors.astype(np.float32, copy=False), None
+    if fmt == "float16":
+        return vectors.astype(np.float16), None
+    if fmt == "int8":
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.round(vectors / scales[:, None]).astype(np.int8)
+        return codes, scales.astype(np.float32)
+    raise ValueError(f"Unknown embedding format: {fmt}")
+
+
+def encode_embedding(vector, fmt="float32"):
+    """Serialize one embedding to a BLOB in the given format.
+
+    float32 keeps the raw model output so existing rows stay readable by
+    older code; float16 and int8 store the normalized vector, and int8
+    prefixes the codes with a float32 scale.
+    """
+    vector = np.asarray(vector, dtype=np.float32).reshape(1, -1)
+    if fmt == "float32":
+        return vector.tobytes()
+    codes, scales = quantize(normalize(vector), fmt)
+    if fmt == "int8":
+        return scales.tobytes() + codes.tobytes()
+    return codes.tobytes()
+
+
+def decode_embeddings(blobs, fmt="float32"):
+    """Decode equally sized BLOBs of one format into a float32 matrix."""
+    fmt = fmt or "float32"
+    data = b"".join(blobs)
+    if fmt == "float32":
+        return np.frombuffer(data, dtype=np.float32).reshape(len(blobs), -1)
+    if fmt == "float16":
+        return np.frombuffer(data, dtype=np.float16).reshape(len(blobs), -1).astype(np.float32)
+    if fmt == "int8":
+        raw = np.frombuffer(data, dtype=np.uint8).reshape(len(blobs), -1)
+        scales = raw[:, :4].copy().view(np.float32)
+        return raw[:, 4:].view(np.int8).astype(np.float32) * scales
+    raise ValueError(f"Unknown embedding format: {fmt}")
+
+
+class MemoryIndex:
+    """Exact cosine-similarity index over memory embeddings."""
+
+    def __init__(self, dim=None, capacity=1024, storage="float32"):
+        """Create an empty index; the dimension is fixed by the first add."""
+        if storage not in EMBEDDING_FORMATS:
+            raise ValueError(f"Unknown embedding format: {storage}")
+        self.dim = dim
+        self.storage = storage
+        self._capacity = capacity
+        self._matrix = None
+        self._scales = None
+        self._ids = np.empty(capacity, dtype=np.int64)
+        self._positions = {}
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, row_id):
+        return row_id in self._positions
+
+    def _reserve(self, extra):
+        """Grow the backing arrays geometrically so appends stay amortized O(1)."""
+        needed = self._size + extra
+        if self._matrix is not None and needed <= self._capacity:
+            return
+        capacity = max(self._capacity, 1)
+        while capacity < needed:
+            capacity *= 2
+        matrix = np.empty((capacity, self.dim), dtype=np.dtype(self.storage))
+        ids = np.empty(capacity, dtype=np.int64)
+        scales = np.empty(capacity, dtype=np.float32) if self.storage == "int8" else None
+        if self._matrix is not None:
+            matrix[:self._size] = self._matrix[:self._size]
+            ids[:self._size] = self._ids[:self._size]
+            if scales is not None:
+                scales[:self._size] = self._scales[:self._size]
+        self._matrix, self._ids, self._scales, self._capacity = matrix, ids, scales, capacity
+
+    def add(self, ids, vectors):
+        """Append rows for the given database ids, skipping ids already indexed."""
+        vectors = normalize(np.atleast_2d(vectors))
+        ids = np.atleast_1d(np.asarray(ids, dtype=np.int64))
+        if len(ids) != len(vectors):
+            raise ValueError("ids and vectors must have the same length")
+        if not len(ids):
+            return
+        with self._lock:
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Expected {self.dim}-dim embeddings, got {vectors.shape[1]}")
+            new = np.fromiter((row_id not in self._positions for row_id in ids.tolist()), dtype=bool, count=len(ids))
+            if not new.all():
+                ids, vectors = ids[new], vectors[new]
+            if len(ids):
+                self._append(ids, vectors)
+
+    def _append(self, ids, vectors):
+        """Copy normalized rows into the backing arrays; the lock is held."""
+        self._reserve(len(ids))
+        end = self._size + len(ids)
+        codes, scales = quantize(vectors, self.storage)
+        self._matrix[self._size:end] = codes
+        if scales is not None:
+            self._scales[self._size:end] = scales
+        self._ids[self._size:end] = ids
+        self._positions.update(zip(ids.tolist(), range(self._size, end)))
+        self._size = end
+
+    def remove(self, ids):
+        """Drop rows by database id in O(1) each; returns how many were removed."""
+        removed = 0
+        with self._lock:
+            for row_id in ids:
+                pos = self._positions.pop(int(row_id), None)
+                if pos is None:
+                    continue
+                self._discard(pos)
+                last = self._size - 1
+                if pos != last:
+                    # Fill the hole with the last row so the matrix stays contiguous
+                    self._move(last, pos)
+                    self._positions[int(self._ids[pos])] = pos
+                self._size = last
+                removed += 1
+        return removed
+
+    def _discard(self, pos):
+        """Hook called with the position of a row about to be removed; the lock is held."""
+
+    def _move(self, src, dst):
+        """Copy the row at position src over position dst; the lock is held."""
+        self._matrix[dst] = self._matrix[src]
+        self._ids[dst] = self._ids[src]
+        if self._scales is not None:
+            self._scales[dst] = self._scales[src]
+
+    def near_duplicates(self, since_id, threshold=0.97, top_k=8):
+        """Return (older id, newer id) pairs at least threshold similar, for rows added after since_id.
+
+        Each newer row is searched against the index for its top_k neighbours,
+        so the cost grows with the rows added since since_id, not with all pairs.
+        """
+        with self._lock:
+            rows = np.flatnonzero(self._ids[:self._size] > since_id)
+            ids = self._ids[rows].tolist()
+            vectors = self._rows(rows)
+        pairs = []
+        for row_id, vector in zip(ids, vectors):
+            for score, other in self.search(vector, top_k):
+                if other < row_id and score >= threshold:
+                    pairs.append((other, row_id))
+        return pairs
+
+    def _rows(self, rows):
+        """Return the selected rows widened to float32."""
+        matrix = self._matrix[rows].astype(np.float32, copy=False)
+        if self._scales is not None:
+            matrix = matrix * self._scales[rows][:, None]
+        return matrix
+
+    def _scores(self, query, rows=None):
+        """Score a normalized query against all rows, or a selection of row positions.
+
+        Quantized matrices are scored block by block so only SCORE_CHUNK rows
+        are ever widened to float32 at a time.
+        """
+        count = self._size if rows is None else len(rows)
+        if self.storage == "float32":
+            matrix = self._matrix[:self._size] if rows is None else self._matrix[rows]
+            return matrix @ query
+        scores = np.empty(count, dtype=np.float32)
+        for start in range(0, count, SCORE_CHUNK):
+            block = slice(start, min(start + SCORE_CHUNK, count)) if rows is None else rows[start:start + SCORE_CHUNK]
+            scores[start:start + SCORE_CHUNK] = self._matrix[block].astype(np.float32) @ query
+            if self._scales is not None:
+                scores[start:start + SCORE_CHUNK] *= self._scales[block]
+        return scores
+
+    def search(self, query, top_k=1):
+        """Return up to top_k (score, id) pairs, best first."""
+        with self._lock:
+            if not self._size:
+                return []
+            query = normalize(query).reshape(-1)
+            return _top_k(self._scores(query), self._ids[:self._size], top_k)
+
+    def search_ids(self, query, ids, top_k=1):
+        """Re-rank only the given candidate ids; ids not in the index are ignored."""
+        with self._lock:
+            rows = np.fromiter((self._positions[row_id] for row_id in ids if row_id in self._positions),
+                               dtype=np.int64)
+            if not len(rows):
+                return []
+            query = normalize(query).reshape(-1)
+            return _top_k(self._scores(query, rows), self._ids[rows], top_k)
+
+
+def _top_k(scores, ids, top_k):
+    """Select the best top_k scores with argpartition and sort only those."""
+    top_k = min(top_k, len(scores))
+    if top_k <= 0:
+        return []
+    if top_k < len(scores):
+        best = np.argpartition(scores, -top_k)[-top_k:]
+    else:
+        best = np.arange(len(scores))
+    best = best[np.argsort(scores[best])[::-1]]
+    return [(float(scores[i]), int(ids[i])) for i in best]
+
+
+class IVFMemoryIndex(MemoryIndex):
+    """Approximate index using an inverted file over spherical k-means lists.
+
+    Rows are assigned to their nearest centroid as they are added, and each
+    list keeps the positions of its rows, so a search gathers and scores only
+    the rows in the n_probe closest lists without touching the rest. Below
+    exact_threshold rows the exact scan is used instead, since it is both
+    faster and lossless at that size. The centroids are retrained in the
+    background whenever the index doubles in size since the last training.
+    """
+
+    def __init__(self, dim=None, capacity=1024, storage="float32", n_probe=8, exact_threshold=5000, path=None):
+        super().__init__(dim, capacity, storage)
+        self.n_probe = n_probe
+        self.exact_threshold = exact_threshold
+        self.path = path
+        self.centroids = None
+        # Per row position: its list, and its slot in that list's member array
+        self._assign = np.empty(capacity, dtype=np.int32)
+        self._slot = np.empty(capacity, dtype=np.int64)
+        # Per list: row positions (first _counts[list] entries are valid)
+        self._members = []
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._trained_size = 0
+        self._training = False
+
+    def _reserve(self, extra):
+        """Grow the list assignments alongside the embedding matrix."""
+        super()._reserve(extra)
+        if len(self._assign) < self._capacity:
+            assign = np.empty(self._capacity, dtype=np.int32)
+            assign[:self._size] = self._assign[:self._size]
+            slot = np.empty(self._capacity, dtype=np.int64)
+            slot[:self._size] = self._slot[:self._size]
+            self._assign, self._slot = assign, slot
+
+    def _set_centroids(self, centroids):
+        """Install centroids and rebuild the lists from every row; the lock is held."""
+        self.centroids = centroids
+        self._members = [np.empty(0, dtype=np.int64) for _ in range(len(centroids))]
+        self._counts = np.zeros(len(centroids), dtype=np.int64)
+        for start in range(0, self._size, SCORE_CHUNK):
+            block = slice(start, min(start + SCORE_CHUNK, self._size))
+            self._assign[block] = _nearest(self._rows(block), centroids)
+        self._add_to_lists(np.arange(self._size))
+
+    def _add_to_lists(self, positions):
+        """Append row positions to the lists they are assigned to; the lock is held."""
+        if not len(positions):
+            return
+        assign = self._assign[positions]
+        order = np.argsort(assign, kind="stable")
+        bounds = np.flatnonzero(np.diff(assign[order])) + 1
+        for group in np.split(positions[order], bounds):
+            lst = int(self._assign[group[0]])
+            count = int(self._counts[lst])
+            needed = count + len(group)
+            if needed > len(self._members[lst]):
+                members = np.empty(max(needed, 2 * len(self._members[lst]), 8), dtype=np.int64)
+                members[:count] = self._members[lst][:count]
+                self._members[lst] = members
+            self._members[lst][count:needed] = group
+            self._slot[group] = np.arange(count, needed)
+            self._counts[lst] = needed
+
+    def _list_rows(self, lists):
+        """Return the row positions held by the given lists; the lock is held."""
+        parts = [self._members[lst][:self._counts[lst]] for lst in lists]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+    def _append(self, ids, vectors):
+        """Append rows and assign them to their nearest existing list."""
+        start = self._size
+        super()._append(ids, vectors)
+        if self.centroids is not None:
+            self._assign[start:self._size] = _nearest(vectors, self.centroids)
+            self._add_to_lists(np.arange(start, self._size))
+        if self._size >= self.exact_threshold and self._size >= 2 * self._trained_size and not self._training:
+            self._training = True
+            threading.Thread(target=self.train, daemon=True).start()
+
+    def _discard(self, pos):
+        """Take a removed row out of its list by moving the list's last member into its slot."""
+        if self.centroids is None:
+            return
+        lst, slot = int(self._assign[pos]), int(self._slot[pos])
+        last = int(self._counts[lst]) - 1
+        moved = self._members[lst][last]
+        self._members[lst][slot] = moved
+        self._slot[moved] = slot
+        self._counts[lst] = last
+
+    def _move(self, src, dst):
+        """Move the list assignment along with the row, and repoint its list entry."""
+        super()._move(src, dst)
+        self._assign[dst] = self._assign[src]
+        if self.centroids is not None:
+            slot = self._slot[src]
+            self._members[self._assign[src]][slot] = dst
+            self._slot[dst] = slot
+
+    def train(self, iterations=10, sample_size=20000, seed=0):
+        """Fit the centroids with spherical k-means and reassign every row."""
+        try:
+            rng = np.random.default_rng(seed)
+            with self._lock:
+                size = self._size
+                sample = rng.choice(size, min(size, sample_size), replace=False)
+                data = self._rows(sample)
+            n_lists = max(16, int(np.sqrt(size)))
+            centroids = _spherical_kmeans(data, n_lists, iterations, rng)
+            with self._lock:
+                self._set_centroids(centroids)
+                self._trained_size = self._size
+            if self.path:
+                self.save(self.path)
+        except Exception as e:
+            logging.error(f"Memory Index Training Error: {e}")
+        finally:
+            self._training = False
+
+    def search(self, query, top_k=1):
+        """Return up to top_k approximate (score, id) pairs, best first."""
+        with self._lock:
+            if self.centroids is not None and self._size >= self.exact_threshold:
+                query = normalize(query).reshape(-1)
+                n_probe = min(self.n_probe, len(self.centroids))
+                probe = np.argpartition(self.centroids @ query, -n_probe)[-n_probe:]
+                candidates = self._list_rows(probe)
+                return _top_k(self._scores(query, candidates), self._ids[candidates], top_k)
+        return super().search(query, top_k)
+
+    def save(self, path):
+        """Persist the trained centroids next to the database."""
+        with self._lock:
+            if self.centroids is None:
+                return
+            np.savez(path, centroids=self.centroids, trained_size=self._trained_size)
+
+    def restore(self, path):
+        """Load saved centroids before rows are added, skipping a stale or missing file."""
+        try:
+            with np.load(path) as saved:
+                centroids = saved["centroids"]
+                trained_size = int(saved["trained_size"])
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logging.error(f"Memory Index Restore Error: {e}")
+            return False
+        with self._lock:
+            if self._size or (self.dim is not None and centroids.shape[1] != self.dim):
+                return False
+            self.dim = centroids.shape[1]
+            self._set_centroids(centroids)
+            self._trained_size = trained_size
+        return True
+
+
+def _nearest(vectors, centroids, chunk=SCORE_CHUNK):
+    """Return the index of the most similar centroid for each row."""
+    assign = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), chunk):
+        assign[start:start + chunk] = np.argmax(vectors[start:start + chunk] @ centroids.T, axis=1)
+    return assign
+
+
+def _spherical_kmeans(data, n_lists, iterations, rng):
+    """Cluster normalized rows by cosine similarity."""
+    n_lists = min(n_lists, len(data))
+    centroids = data[rng.choice(len(data), n_lists, replace=False)].copy()
+    for _ in range(iterations):
+        assign = _nearest(data, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, data)
+        empty = np.bincount(assign, minlength=n_lists) == 0
+        sums[empty] = data[rng.choice(len(data), int(empty.sum()))]
+        centroids = normalize(sums)
+    return centroids
+
+
+# Available recall engines, selected with GROKVIS_MEMORY_INDEX
+INDEX_TYPES = {"exact": MemoryIndex, "ivf": IVFMemoryIndex}
+
+
+def embedding_format():
+    """Return the configured storage format from GROKVIS_EMBEDDING_FORMAT."""
+    fmt = os.environ.get("GROKVIS_EMBEDDING_FORMAT", "float32")
+    if fmt not in EMBEDDING_FORMATS:
+        logging.error(f"Unknown embedding format '{fmt}', using float32")
+        return "float32"
+    return fmt
+
+
+def index_path(conn, suffix=".ivf.npz"):
+    """Return a sidecar file path next to the database behind conn."""
+    for _, name, filename in conn.execute("PRAGMA database_list"):
+        if name == "main" and filename:
+            return os.path.splitext(filename)[0] + suffix
+    return None
+
+
+def read_embeddings(rows):
+    """Decode (id, blob, format) rows into ids and a float32 matrix."""
+    groups = {}
+    for row_id, blob, fmt in rows:
+        groups.setdefault((fmt or "float32", len(blob)), []).append((row_id, blob))
+    ids, matrices = [], []
+    for (fmt, _), group in groups.items():
+        ids.extend(row_id for row_id, _ in group)
+        matrices.append(decode_embeddings([blob for _, blob in group], fmt))
+    if not matrices:
+        return [], None
+    return ids, np.concatenate(matrices)
+
+
+def migrate_embeddings(conn, fmt, batch_size=1000, table="memory"):
+    """Rewrite every stored embedding in a table into the given format; returns rows changed."""
+    if fmt not in EMBEDDING_FORMATS:
+        raise ValueError(f"Unknown embedding format: {fmt}")
+    changed = 0
+    last_id = 0
+    while True:
+        rows = conn.execute(f"SELECT id, embedding, embedding_format FROM {table} WHERE id > ? "
+                            "AND embedding IS NOT NULL ORDER BY id LIMIT ?", (last_id, batch_size)).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        stale = [row for row in rows if (row[2] or "float32") != fmt]
+        if stale:
+            ids, vectors = read_embeddings(stale)
+            with conn:
+                conn.executemany(f"UPDATE {table} SET embedding = ?, embedding_format = ? WHERE id = ?",
+                                 [(encode_embedding(vector, fmt), fmt, row_id) for row_id, vector in zip(ids, vectors)])
+            changed += len(stale)
+    return changed
+
+
+# Words too common to narrow down a keyword search
+STOPWORDS = {
+    "a", "about", "an", "and", "are", "did", "do", "for", "i", "in", "is", "it", "me", "my",
+    "of", "on", "say", "said", "that", "the", "this", "to", "was", "what", "when", "you",
+}
+
+
+def create_fts(conn):
+    """Create the FTS5 mirror of memory.command/response and its sync triggers.
+
+    Returns False when SQLite was built without FTS5, in which case recall
+    stays purely semantic.
+    """
+    try:
+        exists = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'memory_fts'").fetchone()
+        conn.executescript('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS memory_fts USING fts5(
+            command, response, content='memory', content_rowid='id'
+        );
+        CREATE TRIGGER IF NOT EXISTS memory_fts_insert AFTER INSERT ON memory BEGIN
+            INSERT INTO memory_fts(rowid, command, response) VALUES (new.id, new.command, new.response);
+        END;
+        CREATE TRIGGER IF NOT EXISTS memory_fts_delete AFTER DELETE ON memory BEGIN
+            INSERT INTO memory_fts(memory_fts, rowid, command, response)
+            VALUES ('delete', old.id, old.command, old.response);
+        END;
+        CREATE TRIGGER IF NOT EXISTS memory_fts_update AFTER UPDATE OF command, response ON memory BEGIN
+            INSERT INTO memory_fts(memory_fts, rowid, command, response)
+            VALUES ('delete', old.id, old.command, old.response);
+            INSERT INTO memory_fts(rowid, command, response) VALUES (new.id, new.command, new.response);
+        END;
+        ''')
+        if not exists:
+            # Index the rows stored before the FTS table existed
+            conn.execute("INSERT INTO memory_fts(memory_fts) VALUES ('rebuild')")
+        conn.commit()
+        return True
+    except Exception as e:
+        logging.error(f"Memory FTS Setup Error: {e}")
+        return False
+
+
+def fts_query(text):
+    """Turn free text into an FTS5 OR-query of its quoted keywords."""
+    words = [word for word in re.findall(r"\w+", text.lower()) if word not in STOPWORDS]
+    return " OR ".join(f'"{word}"' for word in dict.fromkeys(words))
+
+
+def lexical_candidates(conn, text, limit=300):
+    """Return up to limit memory ids ranked by BM25 for the keywords in text."""
+    query = fts_query(text)
+    if not query:
+        return []
+    try:
+        rows = conn.execute("SELECT rowid FROM memory_fts WHERE memory_fts MATCH ? ORDER BY bm25(memory_fts) LIMIT ?",
+                            (query, limit))
+        return [row_id for row_id, in rows]
+    except Exception as e:
+        logging.debug(f"Memory FTS query failed: {e}")
+        return []
+
+
+def load_index(conn, kind=None, storage=None, table="memory"):
+    """Build a memory index from every embedding stored in a memory table."""
+    kind = kind or os.environ.get("GROKVIS_MEMORY_INDEX", "ivf")
+    storage = storage or embedding_format()
+    if kind == "ivf":
+        suffix = ".ivf.npz" if table == "memory" else f".{table}.ivf.npz"
+        index = IVFMemoryIndex(storage=storage, path=index_path(conn, suffix))
+    else:
+        index = INDEX_TYPES.get(kind, MemoryIndex)(storage=storage)
+    try:
+        columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+        fmt_column = "embedding_format" if "embedding_format" in columns else "NULL"
+        rows = conn.execute(f"SELECT id, embedding, {fmt_column} FROM {table} WHERE embedding IS NOT NULL").fetchall()
+        ids, vectors = read_embeddings(rows)
+        if ids:
+            if isinstance(index, IVFMemoryIndex) and index.path:
+                index.dim = vectors.shape[1]
+                index.restore(index.path)
+            index.add(ids, vectors)
+    except Exception as e:
+        logging.error(f"Memory Index Load Error: {e}")
+    return index
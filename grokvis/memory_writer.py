@@ -0,0 +1,116 @@
+"""
+Background memory writer for GrokVIS.
+Queues memory inserts from any thread and lets a single writer thread
+batch-encode them and insert each batch in one WAL-mode transaction, so
+voice commands never wait on the encoder or on fsync.
+"""
+import datetime
+import logging
+import queue
+import sqlite3
+import threading
+from grokvis.memory_index import encode_embedding
+
+_STOP = object()
+
+
+def connect(path):
+    """Open a SQLite connection in WAL mode, with incremental auto-vacuum on a new database.
+
+    auto_vacuum only takes effect if it is set before the database file is
+    first written, and switching to WAL writes it, so it is set first. An
+    existing database keeps its mode until compact_memory() converts it.
+
+    The connection may be used from threads other than the one that opened
+    it, but not at the same time: threads sharing one must hold a common lock
+    around each statement or transaction (see core.conn_lock). The writer
+    thread opens its own.
+    """
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class MemoryWriter:
+    """Single-threaded, batching writer for the memory table."""
+
+    def __init__(self, db_path, encoder, on_insert=None, batch_size=64, embedding_format="float32"):
+        """
+        Parameters:
+            db_path (str): Path of the memory database.
+            encoder: Object with an encode_many(texts) method, usually the EmbeddingCache.
+            on_insert (callable, optional): Called with (ids, embeddings) after each committed batch.
+            batch_size (int, optional): Largest number of rows written per transaction.
+            embedding_format (str, optional): Storage format for the embedding BLOBs.
+        """
+        self.db_path = db_path
+        self.encoder = encoder
+        self.on_insert = on_insert
+        self.batch_size = batch_size
+        self.embedding_format = embedding_format
+        self.written = 0
+        self.batches = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="memory-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, command, response, timestamp=None, session_id=None, turn=None):
+        """Queue a command/response pair for storage and return immediately."""
+        if timestamp is None:
+            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
+        self._queue.put((timestamp, command, response, session_id, turn))
+
+    def flush(self):
+        """Block until every queued memory has been committed."""
+        self._queue.join()
+
+    def close(self):
+        """Flush pending memories and stop the writer thread."""
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _run(self):
+        """Drain the queue in batches until close() is called."""
+        conn = connect(self.db_path)
+        try:
+            while True:
+                item = self._queue.get()
+                batch = [item]
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                stop = any(entry is _STOP for entry in batch)
+                rows = [entry for entry in batch if entry is not _STOP]
+                try:
+                    if rows:
+                        self._write(conn, rows)
+                except Exception as e:
+                    logging.error(f"Memory Writer Error: {e}")
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+                if stop:
+                    break
+        finally:
+            conn.close()
+
+    def _write(self, conn, rows):
+        """Encode and insert one batch inside a single transaction."""
+        embeddings = self.encoder.encode_many([f"{row[1]} {row[2]}" for row in rows])
+        ids = []
+        with conn:
+            for (timestamp, command, response, session_id, turn), embedding in zip(rows, embeddings):
+                cursor = conn.execute("INSERT INTO memory (timestamp, command, response, embedding, embedding_format, "
+                                      "session_id, turn) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                      (timestamp, command, response, encode_embedding(embedding, self.embedding_format),
+                                       self.embedding_format, session_id, turn))
+                # Each row's own id, whatever other connections insert meanwhile
+                ids.append(cursor.lastrowid)
+        self.written += len(rows)
+        self.batches += 1
+        if self.on_insert:
+            self.on_insert(ids, embeddings)
@@ -12,50 +12,74 @@ from datetime import datetime, timedelta
 
 # Import from core module
 from grokvis.speech import speak
+from grokvis.tts_manager import speak_many, PRIORITY_CHATTER
 from grokvis.shared import scheduler
+from grokvis.intent_router import register_intent
 
 # Global variables
 timers = {}
 stopwatches = {}
 shopping_lists = {}
 notes = []
+_notes_loaded = False
 
-def start_timer(duration_str):
-    """Start a countdown timer."""
-    try:
-        # Parse the duration string (e.g., "5 minutes", "1 hour 30 minutes")
-        duration_seconds = 0
+def parse_duration(duration_str):
+    """Return the seconds in a duration such as "5 minutes" or "1 hour 30 minutes", or None if there is none."""
+    duration_seconds = 0
 
+    if "hour" in duration_str:
+        hours = int(duration_str.split("hour")[0].strip().split()[-1])
+        duration_seconds += hours * 3600
+
+    if "minute" in duration_str:
         if "hour" in duration_str:
-            hours = int(duration_str.split("hour")[0].strip().split()[-1])
-            duration_seconds += hours * 3600
+            minutes_part = duration_str.split("hour")[1]
+        else:
+            minutes_part = duration_str
+        minutes = int(minutes_part.split("minute")[0].strip().split()[-1])
+        duration_seconds += minutes * 60
 
+    if "second" in duration_str:
         if "minute" in duration_str:
-            if "hour" in duration_str:
-                minutes_part = duration_str.split("hour")[1]
-            else:
-                minutes_part = duration_str
-            minutes = int(minutes_part.split("minute")[0].strip().split()[-1])
-            duration_seconds += minutes * 60
-
-        if "second" in duration_str:
-            if "minute" in duration_str:
-                seconds_part = duration_str.split("minute")[1]
-            elif "hour" in duration_str:
-                seconds_part = duration_str.split("hour")[1]
-            else:
-                seconds_part = duration_str
-            seconds = int(seconds_part.split("second")[0].strip().split()[-1])
-            duration_seconds += seconds
-
-        if duration_seconds == 0:
-            # If no specific time units found, try to parse as a number of minutes
-            try:
-                minutes = int(duration_str.split()[0])
-                duration_seconds = minutes * 60
-            except:
-                speak("I couldn't understand the timer duration. Please specify like '5 minutes' or '1 hour 30 minutes'.")
-                return
+            seconds_part = duration_str.split("minute")[1]
+        elif "hour" in duration_str:
+            seconds_part = duration_str.split("hour")[1]
+        else:
+            seconds_part = duration_str
+        seconds = int(seconds_part.split("second")[0].strip().split()[-1])
+        duration_seconds += seconds
+
+    if duration_seconds == 0:
+        # If no specific time units found, try to parse as a number of minutes
+        try:
+            return int(duration_str.split()[0]) * 60
+        except:
+            return None
+    return duration_seconds
+
+def timer_confirmation(duration_seconds):
+    """Return what is said when a timer of duration_seconds is set."""
+    hours, remainder = divmod(duration_seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+
+    duration_speech = ""
+    if hours > 0:
+        duration_speech += f"{hours} hour{'s' if hours > 1 else ''} "
+    if minutes > 0:
+        duration_speech += f"{minutes} minute{'s' if minutes > 1 else ''} "
+    if seconds > 0 and hours == 0:  # Only mention seconds if less than an hour
+        duration_speech += f"{seconds} second{'s' if seconds > 1 else ''}"
+
+    return f"Timer set for {duration_speech.strip()}."
+
+def start_timer(duration_str):
+    """Start a countdown timer."""
+    try:
+        # Parse the duration string (e.g., "5 minutes", "1 hour 30 minutes")
+        duration_seconds = parse_duration(duration_str)
+        if duration_seconds is None:
+            speak("I couldn't understand the timer duration. Please specify like '5 minutes' or '1 hour 30 minutes'.")
+            return
 
         # Create a unique ID for this timer
         timer_id = f"timer_{int(time.time())}"
@@ -68,19 +92,7 @@ def start_timer(duration_str):
             "remaining": duration_seconds
         }
 
-        # Format the duration for speech
-        hours, remainder = divmod(duration_seconds, 3600)
-        minutes, seconds = divmod(remainder, 60)
-
-        duration_speech = ""
-        if hours > 0:
-            duration_speech += f"{hours} hour{'s' if hours > 1 else ''} "
-        if minutes > 0:
-            duration_speech += f"{minutes} minute{'s' if minutes > 1 else ''} "
-        if seconds > 0 and hours == 0:  # Only mention seconds if less than an hour
-            duration_speech += f"{seconds} second{'s' if seconds > 1 else ''}"
-
-        speak(f"Timer set for {duration_speech.strip()}.")
+        speak(timer_confirmation(duration_seconds))
 
         # Schedule the timer to go off
         scheduler.add_job(
@@ -200,9 +212,10 @@ def show_shopping_list(list_name="default"):
             speak(f"All items in your {list_name} shopping list are marked as completed.")
             return
 
-        speak(f"Here's your {list_name} shopping list:")
+        lines = [f"Here's your {list_name} shopping list:"]
         for i, item in enumerate(items):
-            speak(f"{i+1}. {item}")
+            lines.append(f"{i+1}. {item}")
+        speak_many(lines, priority=PRIORITY_CHATTER)
     except Exception as e:
         logging.error(f"Show Shopping List Error: {e}")
         speak("Sorry, I had trouble showing your shopping list.")
@@ -229,6 +242,8 @@ def load_shopping_lists():
 def take_note(content):
     """Save a note."""
     try:
+        ensure_notes_loaded()
+
         # Create a new note
         note = {
             "content": content,
@@ -247,19 +262,28 @@ def take_note(content):
         logging.error(f"Take Note Error: {e}")
         speak("Sorry, I had trouble saving your note.")
 
+def recent_notes_lines(count=5):
+    """Return the lines read out by show_notes(), or None if there are no notes."""
+    if not notes:
+        return None
+
+    recent_notes = sorted(notes, key=lambda x: x["timestamp"], reverse=True)[:count]
+
+    lines = [f"Here are your {len(recent_notes)} most recent notes:"]
+    for i, note in enumerate(recent_notes):
+        timestamp = datetime.fromisoformat(note["timestamp"]).strftime("%B %d, %Y at %I:%M %p")
+        lines.append(f"{i+1}. On {timestamp}: {note['content']}")
+    return lines
+
 def show_notes(count=5):
     """Show recent notes."""
     try:
-        if not notes:
+        ensure_notes_loaded()
+        lines = recent_notes_lines(count)
+        if lines is None:
             speak("You don't have any notes yet.")
             return
-
-        recent_notes = sorted(notes, key=lambda x: x["timestamp"], reverse=True)[:count]
-
-        speak(f"Here are your {len(recent_notes)} most recent notes:")
-        for i, note in enumerate(recent_notes):
-            timestamp = datetime.fromisoformat(note["timestamp"]).strftime("%B %d, %Y at %I:%M %p")
-            speak(f"{i+1}. On {timestamp}: {note['content']}")
+        speak_many(lines, priority=PRIORITY_CHATTER)
     except Exception as e:
         logging.error(f"Show Notes Error: {e}")
         speak("Sorry, I had trouble showing your notes.")
@@ -274,7 +298,8 @@ def save_notes():
 
 def load_notes():
     """Load notes from a file."""
-    global notes
+    global notes, _notes_loaded
+    _notes_loaded = True
     try:
         if os.path.exists("notes.json"):
             with open("notes.json", "r") as f:
@@ -283,6 +308,11 @@ def load_notes():
         logging.error(f"Load Notes Error: {e}")
         notes = []
 
+def ensure_notes_loaded():
+    """Load notes from disk the first time they are needed, so saving never overwrites unread notes."""
+    if not _notes_loaded:
+        load_notes()
+
 def location_reminder(task, location):
     """Set a reminder for when you reach a specific location."""
     try:
@@ -322,3 +352,24 @@ def initialize():
     """Initialize the productivity module."""
     load_shopping_lists()
     load_notes()
+
+def _note_slots(command):
+    """Return the content of a take-a-note command."""
+    content = command.split("take a note")[1].strip()
+    if content.startswith(":"):
+        content = content[1:].strip()
+    return {"content": content}
+
+# Intents routed here by commands.process_command
+register_intent("location_reminder", [["remind me to", "when i get"]], location_reminder,
+                lambda command: {"task": command.split("remind me to")[1].split("when")[0].strip(),
+                                 "location": command.split("when i get")[1].strip()})
+register_intent("start_timer", ["start a timer for"], start_timer,
+                lambda command: {"duration_str": command.split("start a timer for")[1].strip()})
+register_intent("start_stopwatch", ["start a stopwatch"], start_stopwatch)
+register_intent("stop_stopwatch", ["stop the stopwatch"], stop_stopwatch)
+register_intent("add_to_shopping_list", [["add", "to my shopping list"]], add_to_shopping_list,
+                lambda command: {"item": command.split("add")[1].split("to my shopping list")[0].strip()})
+register_intent("show_shopping_list", ["show my shopping list"], show_shopping_list)
+register_intent("take_note", ["take a note"], take_note, _note_slots)
+register_intent("show_notes", ["show my notes"], show_notes)
@@ -0,0 +1,223 @@
+"""
+Speech-to-text engines for GrokVIS.
+Every engine works through the same two calls: start() opens a session that
+is fed raw audio while the user is still speaking, and the session's
+result() returns the final transcript once capture ends. The local Vosk
+engine decodes during capture and reports partial transcripts as it goes,
+so only the tail of the utterance is left to decode at the end. Google Web
+Speech only sees the finished recording and needs the network.
+"""
+import json
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+import speech_recognition as sr
+from grokvis.vad import get_endpointer, record_utterance
+
+# Set GROKVIS_ASR=google or vosk to pick an engine; by default the local
+# engine is used whenever its model is installed
+ENGINE = os.environ.get("GROKVIS_ASR") or None
+VOSK_MODEL_PATH = os.environ.get("GROKVIS_ASR_MODEL", "models/asr/vosk-model-small-en-us-0.15")
+
+# Seconds before a Google request is abandoned rather than hanging on a flaky uplink
+GOOGLE_TIMEOUT = 5
+
+
+class RecognitionSession(ABC):
+    """One utterance being decoded; engines that cannot stream decode it in result()."""
+
+    def accept(self, data):
+        """Feed the next block of raw little-endian PCM read from the source."""
+
+    @abstractmethod
+    def result(self, audio):
+        """
+        Return the final transcript.
+
+        Parameters:
+            audio (sr.AudioData): The complete utterance, as returned by capture_utterance().
+
+        Raises:
+            sr.UnknownValueError: Nothing intelligible was said.
+        """
+
+
+class SpeechRecognizer(ABC):
+    """Base class for speech-to-text engines; an engine missing start() cannot be instantiated."""
+
+    name = "base"
+    # True when sessions decode during capture and report partial transcripts
+    streaming = False
+
+    @abstractmethod
+    def start(self, sample_rate, sample_width=2, on_partial=None):
+        """
+        Open a session for one utterance.
+
+        Parameters:
+            sample_rate (int): Rate of the audio that will be fed in.
+            sample_width (int, optional): Bytes per sample of that audio.
+            on_partial (callable, optional): Called with the running transcript while decoding.
+        """
+
+    def recognize(self, audio):
+        """Return the transcript of a complete sr.AudioData."""
+        session = self.start(audio.sample_rate)
+        session.accept(audio.get_raw_data(convert_width=2))
+        return session.result(audio)
+
+
+class _GoogleSession(RecognitionSession):
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+
+    def result(self, audio):
+        return self.recognizer.recognize_google(audio)
+
+
+class GoogleRecognizer(SpeechRecognizer):
+    """Google Web Speech through speech_recognition; needs the network, no partials."""
+
+    name = "google"
+
+    def __init__(self, timeout=GOOGLE_TIMEOUT):
+        self.recognizer = sr.Recognizer()
+        self.recognizer.operation_timeout = timeout
+
+    def start(self, sample_rate, sample_width=2, on_partial=None):
+        return _GoogleSession(self.recognizer)
+
+
+class _VoskSession(RecognitionSession):
+    def __init__(self, recognizer, on_partial):
+        self.recognizer = recognizer
+        self.on_partial = on_partial
+        self.segments = []
+        self.partial = ""
+        self.transcript = ""
+
+    def accept(self, data):
+        if self.recognizer.AcceptWaveform(data):
+            # Vosk found a pause and finalized everything decoded so far
+            text = json.loads(self.recognizer.Result()).get("text", "")
+            if text:
+                self.segments.append(text)
+            self.partial = ""
+        else:
+            self.partial = json.loads(self.recognizer.PartialResult()).get("partial", "")
+        transcript = " ".join(self.segments + [self.partial]).strip()
+        if transcript != self.transcript:
+            self.transcript = transcript
+            if self.on_partial is not None:
+                self.on_partial(transcript)
+
+    def result(self, audio):
+        text = json.loads(self.recognizer.FinalResult()).get("text", "")
+        transcript = " ".join(self.segments + [text]).strip()
+        if not transcript:
+            raise sr.UnknownValueError()
+        return transcript
+
+
+class VoskRecognizer(SpeechRecognizer):
+    """Offline streaming recognition with a Vosk (Kaldi) model on the CPU."""
+
+    name = "vosk"
+    streaming = True
+
+    def __init__(self, model_path=VOSK_MODEL_PATH):
+        """
+        Parameters:
+            model_path (str, optional): Unpacked Vosk model directory.
+        """
+        import vosk
+        vosk.SetLogLevel(-1)
+        self.model_path = model_path
+        self.model = vosk.Model(model_path)
+        self._vosk = vosk
+
+    def start(self, sample_rate, sample_width=2, on_partial=None):
+        if sample_width != 2:
+            raise ValueError("Vosk needs 16-bit audio")
+        # Kaldi recognizers resample to the model rate internally
+        recognizer = self._vosk.KaldiRecognizer(self.model, sample_rate)
+        return _VoskSession(recognizer, on_partial)
+
+
+ENGINES = {"google": GoogleRecognizer, "vosk": VoskRecognizer}
+
+_recognizer = None
+_recognizer_lock = threading.Lock()
+
+
+def get_recognizer():
+    """Return the shared speech-to-text engine, loading it on first use.
+
+    Falls back to Google Web Speech when the local engine or its model is missing.
+    """
+    global _recognizer
+    with _recognizer_lock:
+        if _recognizer is None:
+            name = ENGINE or ("vosk" if os.path.isdir(VOSK_MODEL_PATH) else "google")
+            try:
+                _recognizer = ENGINES[name]()
+            except Exception as e:
+                logging.error(f"Speech Recognizer Error: {name}: {e}; using Google Web Speech")
+                _recognizer = GoogleRecognizer()
+            logging.info(f"Speech recognition engine: {_recognizer.name}")
+        return _recognizer
+
+
+class _TapStream:
+    """Wraps a source's stream and hands every block read to a callback."""
+
+    def __init__(self, stream, callback):
+        self._stream = stream
+        self._callback = callback
+
+    def read(self, size):
+        data = self._stream.read(size)
+        if data:
+            self._callback(data)
+        return data
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+@contextmanager
+def tap(source, callback):
+    """While active, pass every block read from an open audio source to callback."""
+    stream = source.stream
+    source.stream = _TapStream(stream, callback)
+    try:
+        yield source
+    finally:
+        source.stream = stream
+
+
+def capture_utterance(source, engine=None, on_partial=None, endpointer=None, timeout=None, max_seconds=None):
+    """
+    Record one utterance from an open audio source while the engine decodes it.
+
+    Returns (audio, session); call session.result(audio) for the transcript,
+    which for a streaming engine only has the last few blocks left to decode.
+    The end of the utterance is found by the VAD endpointer, whose noise
+    floor is shared across calls.
+
+    Parameters:
+        source (sr.AudioSource): An entered source such as sr.Microphone or CaptureSource.
+        engine (SpeechRecognizer, optional): Defaults to get_recognizer().
+        on_partial (callable, optional): Called with partial transcripts during capture.
+        endpointer (Endpointer, optional): Defaults to the shared one for the source's rate.
+        timeout (float, optional): Seconds to wait for speech before raising sr.WaitTimeoutError.
+        max_seconds (float, optional): Longest utterance before it is cut off.
+    """
+    engine = engine or get_recognizer()
+    endpointer = endpointer or get_endpointer(source.SAMPLE_RATE)
+    session = engine.start(source.SAMPLE_RATE, source.SAMPLE_WIDTH, on_partial)
+    with tap(source, session.accept):
+        audio = record_utterance(source, endpointer, timeout, max_seconds)
+    return audio, session
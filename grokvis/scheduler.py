@@ -5,6 +5,7 @@ Handles scheduling events and reminders.
 
 import datetime
 import logging
+import re
 from apscheduler.schedulers.background import BackgroundScheduler
 
 # Initialize and start the scheduler
@@ -12,8 +13,10 @@ scheduler = BackgroundScheduler()
 scheduler.start()
 
 # Import from other modules
-from grokvis.speech import speak
+from grokvis.speech import speak, ask
+from grokvis.tts_manager import speak_many, speak_reminder, PRIORITY_CHATTER
 from grokvis.memory import store_memory
+from grokvis.intent_router import register_intent
 
 
 def add_event(time_str, task):
@@ -28,7 +31,7 @@ def add_event(time_str, task):
         if event_time < datetime.datetime.now():
             event_time += datetime.timedelta(days=1)
         scheduler.add_job(
-            speak, "date", run_date=event_time, args=[f"Reminder: {task} now."]
+            speak_reminder, "date", run_date=event_time, args=[f"Reminder: {task} now."]
         )
         speak(f"Scheduled: {task} at {time_str}.")
         store_memory(f"schedule {task} at {time_str}", "Added to calendar.")
@@ -45,11 +48,12 @@ def list_events():
             speak("You have no scheduled events.")
             return
 
-        speak("Here are your scheduled events:")
+        lines = ["Here are your scheduled events:"]
         for job in jobs:
             run_time = job.next_run_time.strftime("%Y-%m-%d %H:%M")
             task = job.args[0] if job.args else "Unknown task"
-            speak(f"{run_time}: {task}")
+            lines.append(f"{run_time}: {task}")
+        speak_many(lines, priority=PRIORITY_CHATTER)
     except Exception as e:
         logging.error(f"List Events Error: {e}")
         speak("Sorry, I couldn't list your events.")
@@ -73,3 +77,54 @@ def remove_event(task_keyword):
     except Exception as e:
         logging.error(f"Remove Event Error: {e}")
         speak("Sorry, I couldn't remove that event.")
+
+
+def parse_time(text):
+    """Return "HH:MM" for the first clock time in text ("6", "6:30", "6:30 p.m.", "18:30"), or None."""
+    found = re.search(r"\b(\d{1,2})(?::(\d{2}))?\s*(?:([ap])\.?\s?m\b\.?)?", text.lower())
+    if not found:
+        return None
+    hour, minute, half = int(found.group(1)), int(found.group(2) or 0), found.group(3)
+    if half == "p" and hour < 12:
+        hour += 12
+    elif half == "a" and hour == 12:
+        hour = 0
+    if hour > 23 or minute > 59:
+        return None
+    return f"{hour:02d}:{minute:02d}"
+
+
+def parse_event(command):
+    """Return (task, "HH:MM" or None) from "schedule <task> [at <time>]" or "remind me to <task> [at <time>]"."""
+    found = re.search(r"\b(?:remind me to|remind me|schedule)\s+(.*?)\s*(?:\bat\s+(\d.*))?$", command)
+    if not found:
+        return "", None
+    return found.group(1).strip(), parse_time(found.group(2)) if found.group(2) else None
+
+
+def schedule_command(command):
+    """List, remove or add events as asked in a spoken schedule or reminder command."""
+    if "list" in command or "show" in command:
+        list_events()
+    elif "remove" in command or "delete" in command or "cancel" in command:
+        task_keyword = command.split("remove")[-1].strip() if "remove" in command else \
+                       command.split("delete")[-1].strip() if "delete" in command else \
+                       command.split("cancel")[-1].strip()
+        remove_event(task_keyword)
+    else:
+        # Ask by voice for whatever the command left out
+        task, time_str = parse_event(command)
+        if not task:
+            task = ask("What should I remind you about?")
+            if not task:
+                return
+        if time_str is None:
+            time_str = parse_time(ask(f"What time should I remind you to {task}?"))
+            if time_str is None:
+                speak("Sorry, I didn't catch a time.")
+                return
+        add_event(time_str, task)
+
+
+# Intents routed here by commands.process_command
+register_intent("schedule", ["schedule", "remind me"], schedule_command, lambda command: {"command": command})
@@ -40,3 +40,26 @@ jarvis_quips = [
     "As you wish. Your wish is my command.",
     "Executed with precision. What's next on the agenda?"
 ]
+
+# Fixed status lines, pre-rendered into the TTS audio cache at startup
+STATIC_PHRASES = [
+    "Hello! What persona would you like to use? You can choose Alfred, Beatrice, or any other available persona.",
+    "You have chosen Alfred.",
+    "You have chosen Beatrice.",
+    "You have chosen a default persona.",
+    "Greetings, I'm Alfred, your loyal assistant.",
+    "Hello, I'm Beatrice, here to assist you with grace.",
+    "Hello, I'm your assistant, ready to help.",
+    "Voice model loaded successfully.",
+    "Dashboard running at http://localhost:5000",
+    "Sorry, I didn't catch that. Please repeat your command.",
+    "Sorry, I only listen to my owner.",
+    "Sorry, I couldn't process that command. Please try again.",
+    "I'm awake and listening again.",
+    "Stopwatch started.",
+    "Timer complete!",
+    "Here are your scheduled events:",
+    "You have no scheduled events.",
+    "You don't have any notes yet.",
+    "Shutting down. Stay legendary.",
+]
@@ -0,0 +1,237 @@
+"""
+Speculative command dispatch for GrokVIS.
+Many commands can be identified from their first few words. While a
+streaming recognizer is still decoding, each partial transcript is matched
+against a small set of unambiguous command prefixes; on a match, the slow
+part of that command's handler (an HTTP fetch, loading notes from disk,
+synthesizing the reply) is started on a worker thread. When the final
+transcript arrives, speculations that still match it are committed and
+their results left for the handler; the rest are cancelled.
+"""
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Set GROKVIS_SPECULATION=0 to only run handlers once the final transcript is known
+SPECULATION = os.environ.get("GROKVIS_SPECULATION", "1") != "0"
+
+# Speculations started per utterance; partials that keep changing an
+# argument ("weather in new", "weather in new york") stop here
+MAX_SPECULATIONS = 3
+
+
+class SpeculationRule:
+    """A command prefix that identifies one handler, and the work to start early for it."""
+
+    def __init__(self, intent, pattern, prewarm):
+        """
+        Parameters:
+            intent (str): Name the handler asks for in take_speculation().
+            pattern (str): Regex matched against the start of a transcript; an optional
+                "arg" group captures the handler's argument.
+            prewarm (callable): Called with the argument (or None) on a worker thread;
+                its return value is what the handler gets back.
+        """
+        self.intent = intent
+        self.pattern = re.compile(pattern)
+        self.prewarm = prewarm
+
+    def match(self, text):
+        """Return the argument if text is this command, "" if it has no argument, else None."""
+        found = self.pattern.match(text.strip().lower())
+        if found is None:
+            return None
+        argument = found.groupdict().get("arg")
+        if argument is None:
+            return ""
+        argument = argument.strip()
+        # Only the prefix is known so far
+        return argument or None
+
+
+class Speculation:
+    """Work started for one (intent, argument) pair."""
+
+    def __init__(self, rule, argument, future):
+        self.rule = rule
+        self.argument = argument
+        self.future = future
+        self.started = time.perf_counter()
+        self.done = None
+        future.add_done_callback(self._finished)
+
+    def _finished(self, _future):
+        self.done = time.perf_counter()
+
+
+class SpeculativeDispatcher:
+    """Starts handler work from partial transcripts and settles it against the final one."""
+
+    def __init__(self, rules, max_workers=2):
+        """
+        Parameters:
+            rules (list[SpeculationRule]): Checked in order; the first match wins.
+            max_workers (int, optional): Threads running prewarm work.
+        """
+        self.rules = rules
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="speculation")
+        self._lock = threading.Lock()
+        self._active = []
+        self._committed = {}
+        self.speculations = 0
+        self.hits = 0
+        self.misses = 0
+        self.taken = 0
+        self.saved_seconds = 0.0
+
+    def begin(self):
+        """Start a new utterance; work committed for the previous one is dropped."""
+        with self._lock:
+            self._cancel(self._active)
+            self._active = []
+            self._committed = {}
+
+    def on_partial(self, text):
+        """Recognizer partial-transcript callback; starts prewarm work on a confident match."""
+        for rule in self.rules:
+            argument = rule.match(text)
+            if argument is None:
+                continue
+            with self._lock:
+                if any(s.rule is rule and s.argument == argument for s in self._active):
+                    return
+                if len(self._active) >= MAX_SPECULATIONS:
+                    return
+                self.speculations += 1
+                future = self._pool.submit(rule.prewarm, argument or None)
+                self._active.append(Speculation(rule, argument, future))
+            return
+
+    def resolve(self, command):
+        """
+        Settle this utterance's speculations against the final transcript.
+
+        Matching ones are committed for take(); the rest are cancelled. Pass
+        None when the utterance was rejected.
+        """
+        now = time.perf_counter()
+        with self._lock:
+            active, self._active = self._active, []
+            for speculation in active:
+                if command is not None and speculation.rule.match(command) == speculation.argument:
+                    self.hits += 1
+                    # The head start: how much of the work was done before the final transcript
+                    finished = speculation.done if speculation.done is not None else now
+                    self.saved_seconds += min(finished, now) - speculation.started
+                    self._committed[speculation.rule.intent] = speculation
+                else:
+                    self.misses += 1
+                    self._cancel([speculation])
+
+    @staticmethod
+    def _cancel(speculations):
+        """Cancel work that has not started; running work finishes but its result is dropped."""
+        for speculation in speculations:
+            speculation.future.cancel()
+
+    def take(self, intent, argument=None):
+        """
+        Return the committed future for intent, or None.
+
+        Parameters:
+            intent (str): The rule's intent name.
+            argument (str, optional): Must equal the speculated argument, ignoring case and spaces.
+        """
+        with self._lock:
+            speculation = self._committed.get(intent)
+            if speculation is None:
+                return None
+            if argument is not None and speculation.argument != argument.strip().lower():
+                return None
+            del self._committed[intent]
+            self.taken += 1
+            return speculation.future
+
+    def stats(self):
+        """Return speculation counters; hit rate is hits per settled speculation."""
+        settled = self.hits + self.misses
+        return {
+            "speculations": self.speculations,
+            "hits": self.hits,
+            "misses": self.misses,
+            "taken": self.taken,
+            "hit_rate": self.hits / settled if settled else None,
+            "saved_ms": self.saved_seconds * 1000,
+            "mean_saved_ms": self.saved_seconds * 1000 / self.hits if self.hits else None,
+        }
+
+
+def _prewarm_weather(city):
+    """Fetch the weather, then synthesize the report get_weather() will speak."""
+    from grokvis.weather import fetch_weather, weather_report
+    from grokvis.tts_manager import synthesize_cached
+    temp, desc = fetch_weather(city)
+    try:
+        synthesize_cached(weather_report(city, temp, desc))
+    except Exception as e:
+        logging.error(f"Speculation Error: {e}")
+    return temp, desc
+
+
+def _prewarm_timer(duration):
+    """Synthesize the confirmation start_timer() will speak."""
+    from grokvis.productivity import parse_duration, timer_confirmation
+    from grokvis.tts_manager import synthesize_cached
+    seconds = parse_duration(duration)
+    if seconds is not None:
+        synthesize_cached(timer_confirmation(seconds))
+
+
+def _prewarm_notes(_argument):
+    """Load the notes from disk."""
+    from grokvis.productivity import ensure_notes_loaded
+    ensure_notes_loaded()
+
+
+def _prewarm_show_notes(_argument):
+    """Load the notes and synthesize the lines show_notes() will read out."""
+    from grokvis.productivity import ensure_notes_loaded, recent_notes_lines
+    from grokvis.tts_manager import render_batch
+    ensure_notes_loaded()
+    lines = recent_notes_lines()
+    if lines:
+        render_batch(lines)
+
+
+# Prefixes that process_command() sends to exactly one handler
+RULES = [
+    SpeculationRule("weather", r"(?:what's|what is|how's|how is) the weather in (?!.*forecast)(?P<arg>[^0-9]+)$", _prewarm_weather),
+    SpeculationRule("timer", r"start a timer for (?P<arg>.*\b(?:hours?|minutes?|seconds?))$", _prewarm_timer),
+    SpeculationRule("take_note", r"take a note\b", _prewarm_notes),
+    SpeculationRule("show_notes", r"show my notes\b", _prewarm_show_notes),
+]
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher():
+    """Return the shared speculative dispatcher, creating it on first use."""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = SpeculativeDispatcher(RULES)
+        return _dispatcher
+
+
+def take_speculation(intent, argument=None):
+    """Return the committed speculative result for a handler, or None; see SpeculativeDispatcher.take()."""
+    return get_dispatcher().take(intent, argument)
+
+
+def get_speculation_stats():
+    """Return the shared dispatcher's counters."""
+    return get_dispatcher().stats()
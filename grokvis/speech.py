@@ -2,39 +2,72 @@ import os
 from grokvis.setup_wakeword import download_wakeword_file, extract_wakeword_file
 import datetime
 import logging
-import sounddevice as sd
+import queue
+import threading
+import time
 import speech_recognition as sr
-import librosa
 import numpy as np
 import joblib
-import glob
 from sklearn.svm import OneClassSVM
 import pvporcupine
 from grokvis.shared import model, wake_word_handle, persona
-from grokvis.tts_manager import speak
+from grokvis.core import metrics_logger
+from grokvis.tts_manager import speak, cancel_speech
+from grokvis.audio_capture import MicrophoneCapture, CaptureSource
+from grokvis.recognizer import capture_utterance
+from grokvis.vad import get_endpointer
+from grokvis.speculation import get_dispatcher, get_speculation_stats, SPECULATION
+from grokvis.voice_features import get_mfcc_extractor, file_features, EnrollmentSet, MFCC_SAMPLE_RATE
+
+# The running capture pipeline, set while wake_word_listener is active
+capture = None
+
+# Wake word detections waiting for the command worker; when it is full,
+# further detections are dropped rather than stalling detection
+COMMAND_QUEUE_SIZE = 2
+_listener_stats = {"detections": 0, "dropped_detections": 0, "commands": 0,
+                   "dispatch_seconds": 0.0, "max_dispatch_seconds": 0.0}
+
+# Seconds of silence after the wake word before the command is given up on,
+# and the longest command accepted
+COMMAND_TIMEOUT = 5
+MAX_COMMAND_SECONDS = 15
+# Capture history used to seed the VAD noise floor before the first command
+CALIBRATION_SECONDS = 3
+
+# When the user stopped speaking in the last captured command
+_last_speech_end = None
 
 def extract_mfcc(filename):
-    """Extract MFCC features from an audio file."""
+    """Extract MFCC features from an audio file, resampled to the verification rate."""
+    try:
+        return file_features(filename)
+    except Exception as e:
+        logging.error(f"MFCC Extraction Error: {e}")
+        return None
+
+def extract_mfcc_audio(audio):
+    """Extract MFCC features from an sr.AudioData in memory, with no temporary file."""
     try:
-        y, sr = librosa.load(filename, sr=None)
-        mfcc = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13)
-        return np.mean(mfcc.T, axis=0)
+        pcm = audio.get_raw_data(convert_rate=MFCC_SAMPLE_RATE, convert_width=2)
+        return get_mfcc_extractor().features_from_pcm(pcm)
     except Exception as e:
         logging.error(f"MFCC Extraction Error: {e}")
         return None
 
-def train_one_class_model(directory):
-    """Train a one-class SVM model on voice samples."""
+def train_one_class_model(directory, enrollment=None):
+    """Train a one-class SVM model on voice samples, decoding only clips not already cached."""
     try:
-        features = []
-        for file in glob.glob(f"{directory}/*.wav"):
-            mfcc = extract_mfcc(file)
-            if mfcc is not None:
-                features.append(mfcc)
-        if not features:
+        if enrollment is None:
+            enrollment = EnrollmentSet(directory)
+        enrollment.update()
+        if not len(enrollment):
             raise ValueError("No valid audio samples found for training.")
         clf = OneClassSVM(kernel='rbf', gamma='auto', nu=0.01)
-        clf.fit(features)
+        clf.fit(enrollment.features())
+        # Models trained on features at another rate must be retrained before use
+        clf.feature_sample_rate_ = MFCC_SAMPLE_RATE
+        clf.enrollment_version_ = enrollment.version
         joblib.dump(clf, 'models/voice/voice_model.pkl')
         return clf
     except Exception as e:
@@ -43,12 +76,24 @@ def train_one_class_model(directory):
         return None
 
 def train_voice_model(retrain=False):
-    """Load or train the voice model. Optionally retrain with new samples."""
+    """Load or train the voice model. Optionally retrain with new samples.
+
+    Retraining keeps the earlier samples; only the new phrases are decoded.
+    """
     global model
     try:
         if retrain or not os.path.exists('models/voice/voice_model.pkl'):
             raise FileNotFoundError("Forcing retrain or model not found.")
         model = joblib.load('models/voice/voice_model.pkl')
+        enrollment = EnrollmentSet('voice_samples/my_voice')
+        enrollment.update()
+        stale = (getattr(model, 'feature_sample_rate_', None) != MFCC_SAMPLE_RATE
+                 or getattr(model, 'enrollment_version_', None) != enrollment.version)
+        if stale and len(enrollment):
+            # Samples were added or removed, or the model predates the current features
+            model = train_one_class_model('voice_samples/my_voice', enrollment)
+            if model is None:
+                raise FileNotFoundError("Retraining from the recorded samples failed.")
         speak("Voice model loaded successfully.")
     except FileNotFoundError:
         speak("I need to learn your voice. Please say 10 phrases after each prompt.")
@@ -75,21 +120,46 @@ def record_clip(filename):
         logging.error(f"Recording Error: {e}")
         speak("Sorry, I couldn't record that. Please check your microphone and try again.")
 
-def listen():
-    """Listen for a command and verify the speaker's voice."""
+def listen(position=None):
+    """Listen for a command and verify the speaker's voice.
+
+    While the wake word listener runs, the command is read from its capture
+    ring buffer, starting at position (default: now), instead of opening a
+    new microphone. A streaming engine transcribes while the user speaks,
+    and the VAD endpointer ends the command after a short hangover.
+    """
+    global _last_speech_end
+    dispatcher = get_dispatcher()
+    dispatcher.begin()
+    command = None
     try:
-        recognizer = sr.Recognizer()
-        with sr.Microphone() as source:
+        if capture is not None:
+            position = capture.buffer.position if position is None else position
+            source = CaptureSource(capture, position)
+            endpointer = get_endpointer(capture.sample_rate)
+            if endpointer.detector.floor_db is None:
+                # Seed the noise floor from the audio heard before the wake word
+                history = min(position, int(CALIBRATION_SECONDS * capture.sample_rate))
+                samples, _ = capture.buffer.read(position - history, history, timeout=0)
+                if samples is not None:
+                    endpointer.detector.calibrate(samples, endpointer.frame_length)
+        else:
+            source = sr.Microphone()
+        with source:
             print("Listening...")
-            audio = recognizer.listen(source)
-            with open("temp.wav", "wb") as f:
-                f.write(audio.get_wav_data())
-            mfcc = extract_mfcc("temp.wav")
-            if mfcc is None or model.predict([mfcc]) != 1:
-                speak("Sorry, I only listen to my owner.")
-                return ""
-            command = recognizer.recognize_google(audio).lower()
-            return command
+            # Partial transcripts may start a handler's slow work before the user finishes
+            audio, session = capture_utterance(source, on_partial=dispatcher.on_partial if SPECULATION else None,
+                                               timeout=COMMAND_TIMEOUT, max_seconds=MAX_COMMAND_SECONDS)
+        _last_speech_end = get_endpointer(source.SAMPLE_RATE).speech_end_time
+        mfcc = extract_mfcc_audio(audio)
+        if mfcc is None or model.predict([mfcc]) != 1:
+            speak("Sorry, I only listen to my owner.")
+            return ""
+        command = session.result(audio).lower()
+        return command
+    except sr.WaitTimeoutError:
+        # Nothing was said after the wake word
+        return ""
     except sr.UnknownValueError:
         speak("Sorry, I didn't catch that. Please repeat your command.")
         return ""
@@ -97,10 +167,60 @@ def listen():
         logging.error(f"Listening Error: {e}")
         speak("Sorry, I couldn't process that command. Please try again.")
         return ""
+    finally:
+        # Commit the speculations the final transcript confirms; cancel the rest
+        dispatcher.resolve(command)
+
+def ask(question):
+    """Speak a follow-up question and return the owner's spoken answer, or "" if there was none.
+
+    Meant for handlers on the command worker that are missing a value; the
+    answer is captured the same way as the command itself. speak() first
+    lets any queued speech finish, so the microphone does not pick it up.
+    """
+    speak(question)
+    return listen()
+
+def command_worker(detections):
+    """Capture, verify, recognize and run one command per queued wake word detection.
+
+    Parameters:
+        detections (queue.Queue): Ring buffer positions just after each wake word; None stops the worker.
+    """
+    from grokvis.commands import process_command
+    while True:
+        position = detections.get()
+        try:
+            if position is None:
+                return
+            command = listen(position)
+            if command:
+                _listener_stats["commands"] += 1
+                if _last_speech_end is not None:
+                    # End of speech to dispatch: hangover, verification and the final decode
+                    latency = time.perf_counter() - _last_speech_end
+                    _listener_stats["dispatch_seconds"] += latency
+                    _listener_stats["max_dispatch_seconds"] = max(_listener_stats["max_dispatch_seconds"], latency)
+                process_command(command)
+        except Exception as e:
+            logging.error(f"Command Worker Error: {e}")
+        finally:
+            detections.task_done()
+
+def get_listener_stats():
+    """Return wake word and capture counters for the running listener."""
+    stats = dict(_listener_stats)
+    commands = stats["commands"]
+    stats["mean_dispatch_ms"] = stats.pop("dispatch_seconds") * 1000 / commands if commands else None
+    stats["max_dispatch_ms"] = stats.pop("max_dispatch_seconds") * 1000
+    if capture is not None:
+        stats.update(capture.stats())
+    stats["speculation"] = get_speculation_stats()
+    return stats
 
 def wake_word_listener(sensitivity=0.5):
     """Listen for the wake word 'Hey Grok' using Porcupine."""
-    global wake_word_handle
+    global wake_word_handle, capture
     try:
         access_key = os.environ.get("PICOVOICE_ACCESS_KEY", "YpmwAcCDdDu82WlIAbZWMn840MiaGELoTIt+Ssh3LivetKM1k+Nw3w==")
         keywords = ["Hey Grok"]
@@ -122,36 +242,45 @@ def wake_word_listener(sensitivity=0.5):
             speak("Wake word detection failed due to invalid access key.")
             return
 
-        def audio_callback(indata, _frames, _time, status):
-            """Process audio input for wake word detection."""
-            if status:
-                logging.warning(f"Audio callback status: {status}")
-                return
-            pcm = indata.flatten().astype(np.int16)
-            keyword_index = wake_word_handle.process(pcm)
-            if keyword_index >= 0:
-                print("Wake word detected! Executing command...")
-                sd.stop()
-                command = listen()
-                if command:
-                    from grokvis.commands import process_command
-                    process_command(command)
-                sd.start()
-
         print(f"Listening for wake word with sensitivity {sensitivity}... (Press Ctrl+C to exit)")
-        with sd.InputStream(
-            callback=audio_callback,
-            channels=1,
-            samplerate=wake_word_handle.sample_rate,
-            blocksize=wake_word_handle.frame_length,
-            dtype=np.int16,
-        ):
+        # One input stream for the whole session; Porcupine and command capture
+        # both read from its ring buffer. Commands run on a worker so detection
+        # never waits for recognition or command handling.
+        detections = queue.Queue(maxsize=COMMAND_QUEUE_SIZE)
+        worker = threading.Thread(target=command_worker, args=(detections,), name="command-worker", daemon=True)
+        worker.start()
+        with MicrophoneCapture(wake_word_handle.sample_rate, wake_word_handle.frame_length) as capture:
+            # Porcupine input is refilled in place for every frame
+            pcm = np.empty(wake_word_handle.frame_length, dtype=np.int16)
+            position = capture.buffer.position
             try:
                 while True:
-                    sd.sleep(100)
+                    # The timeout keeps Ctrl+C responsive while the buffer is idle
+                    next_position = capture.buffer.read_into(pcm, position, timeout=0.1)
+                    if next_position is None:
+                        continue
+                    position = next_position
+                    keyword_index = wake_word_handle.process(pcm)
+                    if keyword_index >= 0:
+                        print("Wake word detected! Executing command...")
+                        _listener_stats["detections"] += 1
+                        # Barge-in: the user talking over queued speech cancels it
+                        cancel_speech()
+                        # The command starts with the frame right after the wake word
+                        try:
+                            detections.put_nowait(position)
+                        except queue.Full:
+                            _listener_stats["dropped_detections"] += 1
+                            logging.warning("Command worker busy; wake word ignored")
             except KeyboardInterrupt:
                 print("Wake word detection stopped.")
             finally:
+                metrics_logger.info(f"Wake word listener stats: {get_listener_stats()}")
+                capture = None
+                try:
+                    detections.put_nowait(None)
+                except queue.Full:
+                    pass
                 if wake_word_handle:
                     wake_word_handle.delete()
                     wake_word_handle = None
@@ -173,12 +302,11 @@ def setup_personality():
 
         speak("Welcome! I need a persona. Would you prefer Alfred, the gentleman, or Beatrice, the lady? Say 'Alfred' or 'Beatrice'.")
 
-        recognizer = sr.Recognizer()
         with sr.Microphone() as source:
             print("Listening for persona choice...")
-            audio = recognizer.listen(source)
+            audio, session = capture_utterance(source)
             try:
-                choice = recognizer.recognize_google(audio).lower()
+                choice = session.result(audio).lower()
                 print(f"You chose: {choice}")
             except:
                 choice = ""
@@ -0,0 +1,158 @@
+"""
+Speech output scheduler for GrokVIS.
+Lets any thread queue lines to be spoken and return immediately, while a
+single playback thread speaks them in priority order. Consecutive
+low-priority lines are merged into one playback batch, urgent lines
+preempt queued chatter, and a wake word cancels everything at once.
+"""
+import heapq
+import itertools
+import logging
+import threading
+
+# Lower numbers are spoken first
+PRIORITY_URGENT = 0
+PRIORITY_NORMAL = 1
+PRIORITY_CHATTER = 2
+
+
+class SpeechQueue:
+    """Priority queue of utterances consumed by one playback thread."""
+
+    def __init__(self, play, split=None, max_batch=16, play_batch=None):
+        """
+        Parameters:
+            play (callable): Called as play(chunks, persona, stop) on the playback thread.
+                It should return the number of chunks it finished, stopping early once
+                the stop event is set.
+            split (callable, optional): Splits a line into chunks; defaults to one chunk per line.
+            max_batch (int, optional): Largest number of low-priority lines merged into one batch.
+            play_batch (callable, optional): Same signature as play; used instead of it when
+                several lines were merged, so they can be played as one utterance.
+        """
+        self.play = play
+        self.split = split or (lambda text: [text])
+        self.max_batch = max_batch
+        self.play_batch = play_batch
+        self.spoken = 0
+        self.batches = 0
+        self.preempted = 0
+        self._heap = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._playing = None
+        self._stop = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="speech-output", daemon=True)
+        self._thread.start()
+
+    def submit(self, text, priority=PRIORITY_NORMAL, persona="Default"):
+        """Queue text for playback and return immediately."""
+        self._push([self.split(text)], priority, persona)
+
+    def submit_many(self, lines, priority=PRIORITY_CHATTER, persona="Default"):
+        """Queue several lines back to back, each kept whole as one chunk."""
+        self._push([[line] for line in lines if line.strip()], priority, persona)
+
+    def _push(self, entries, priority, persona):
+        """Add chunk lists to the heap in order and wake the playback thread."""
+        entries = [chunks for chunks in entries if chunks]
+        if not entries:
+            return
+        with self._condition:
+            if self._closed:
+                return
+            for chunks in entries:
+                heapq.heappush(self._heap, (priority, next(self._sequence), persona, chunks))
+            # A more urgent line interrupts the batch now playing after its current chunk
+            if self._playing is not None and priority < self._playing:
+                self._stop.set()
+            self._condition.notify()
+
+    def cancel(self):
+        """Drop every queued line and stop the one playing; used for barge-in."""
+        with self._condition:
+            self._heap.clear()
+            if self._stop is not None:
+                self._stop.set()
+            self._playing = None
+
+    def pending(self):
+        """Return the number of lines waiting to be spoken."""
+        with self._condition:
+            return len(self._heap)
+
+    def wait(self, timeout=None):
+        """Block until the queue is empty and nothing is playing."""
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._heap and self._stop is None, timeout)
+
+    def close(self):
+        """Cancel pending speech and stop the playback thread."""
+        with self._condition:
+            self._closed = True
+        self.cancel()
+        with self._condition:
+            self._condition.notify_all()
+        self._thread.join()
+
+    def _next_batch(self):
+        """Pop the next line, merging following low-priority lines for the same persona."""
+        priority, sequence, persona, chunks = heapq.heappop(self._heap)
+        batch = [(sequence, chunks)]
+        if priority >= PRIORITY_CHATTER:
+            while self._heap and len(batch) < self.max_batch:
+                next_priority, next_sequence, next_persona, next_chunks = self._heap[0]
+                if next_priority != priority or next_persona != persona:
+                    break
+                heapq.heappop(self._heap)
+                batch.append((next_sequence, next_chunks))
+        return priority, persona, batch
+
+    def _run(self):
+        """Speak queued lines until close() is called."""
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._heap or self._closed)
+                if self._closed:
+                    return
+                priority, persona, batch = self._next_batch()
+                stop = threading.Event()
+                self._playing = priority
+                self._stop = stop
+
+            chunks = [chunk for _, line in batch for chunk in line]
+            play = self.play_batch if self.play_batch and len(batch) > 1 else self.play
+            try:
+                played = play(chunks, persona, stop) or 0
+            except Exception as e:
+                logging.error(f"Speech Output Error: {e}")
+                played = len(chunks)
+
+            with self._condition:
+                self.batches += 1
+                # Preempted rather than cancelled: requeue what was not heard in its old place
+                if stop.is_set() and self._playing is not None and not self._closed:
+                    self.preempted += 1
+                    for sequence, line in batch:
+                        if played >= len(line):
+                            played -= len(line)
+                            self.spoken += 1
+                            continue
+                        heapq.heappush(self._heap, (priority, sequence, persona, line[played:]))
+                        played = 0
+                else:
+                    self.spoken += len(batch)
+                self._playing = None
+                self._stop = None
+                self._condition.notify_all()
+
+    def stats(self):
+        """Return counters describing the queue's activity."""
+        with self._condition:
+            return {
+                "pending": len(self._heap),
+                "spoken": self.spoken,
+                "batches": self.batches,
+                "preempted": self.preempted,
+            }
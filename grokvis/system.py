@@ -14,6 +14,7 @@ from datetime import datetime, timedelta
 # Import from core module
 from grokvis.speech import speak
 from grokvis.shared import persona, wake_word_handle
+from grokvis.intent_router import register_intent
 
 # Global variables
 sleep_until = None
@@ -165,3 +166,21 @@ def check_for_updates():
     except Exception as e:
         logging.error(f"Update Check Error: {e}")
         speak("Sorry, I had trouble checking for updates.")
+
+
+def volume_command(command):
+    """Turn the volume up or down as asked in a spoken command."""
+    if any(word in command.lower() for word in ["up", "increase", "higher", "louder"]):
+        adjust_volume("up")
+    elif any(word in command.lower() for word in ["down", "decrease", "lower", "quieter"]):
+        adjust_volume("down")
+    else:
+        speak("Please specify if you want to turn the volume up or down.")
+
+# Intents routed here by commands.process_command
+register_intent("switch_persona", [["switch to", "alfred"], ["switch to", "beatrice"]], switch_persona,
+                lambda command: {"new_persona": "Alfred" if "alfred" in command.lower() else "Beatrice"})
+register_intent("volume", ["volume"], volume_command, lambda command: {"command": command})
+register_intent("sleep_mode", ["go to sleep for"], sleep_mode,
+                lambda command: {"duration_str": command.split("go to sleep for")[1].strip()})
+register_intent("check_for_updates", ["update yourself", "check for updates"], check_for_updates)
@@ -7,12 +7,14 @@ import os
 import platform
 import subprocess
 import psutil
+import re
 import time
 import json
 from pathlib import Path
 
 # Import from core module
 from grokvis.speech import speak
+from grokvis.intent_router import register_intent
 
 # Common application paths by platform
 APP_PATHS = {
@@ -389,4 +391,51 @@ def add_app_shortcut(app_name, app_path):
         return False
 
 # Initialize module
-load_user_apps()
\ No newline at end of file
+load_user_apps()
+
+def shutdown_command(command):
+    """Shut the computer down, after the delay in minutes given with "in" or "after" if any."""
+    if "in" in command or "after" in command:
+        # Extract delay time
+        delay_text = command.split("in")[1].strip() if "in" in command else command.split("after")[1].strip()
+        try:
+            # Try to parse minutes
+            delay = int(re.search(r'\d+', delay_text).group())
+            shutdown_computer(delay)
+        except:
+            speak("I couldn't understand the delay time. Please specify like 'shutdown computer in 30 minutes'.")
+    else:
+        shutdown_computer()
+
+def _required(key, value):
+    """Return {key: value}, or None to decline the command when value is empty."""
+    return {key: value} if value else None
+
+def _app_name_slots(command, verbs):
+    """Return the application named after the first verb found in command."""
+    for verb in verbs:
+        if verb in command:
+            return _required("app_name", command.split(verb)[1].strip())
+    return None
+
+def _close_slots(command):
+    """Return the application to close; "quit" with "shutdown" is left to the quit command."""
+    if "quit" in command and "shutdown" in command:
+        return None
+    return _app_name_slots(command, ["close", "exit"])
+
+# Intents routed here by commands.process_command
+DEVICE_WORDS = ["computer", "pc", "system"]
+register_intent("launch_application", ["open", "launch", "start"], launch_application,
+                lambda command: _app_name_slots(command, ["open", "launch", "start"]))
+register_intent("close_application", ["close", "exit"], close_application, _close_slots)
+register_intent("take_screenshot", ["take a screenshot", "capture screen"], take_screenshot)
+register_intent("lock_computer", [["lock", word] for word in DEVICE_WORDS], lock_computer)
+register_intent("shutdown_computer", [["shutdown", word] for word in DEVICE_WORDS], shutdown_command,
+                lambda command: {"command": command})
+register_intent("restart_computer", [["restart", word] for word in DEVICE_WORDS], restart_computer)
+register_intent("system_status", ["system status", "how's my computer", "computer status"], get_system_status)
+register_intent("find_files", [["find", "files"]], find_files,
+                lambda command: _required("query", command.split("find")[1].split("files")[0].strip()))
+register_intent("create_folder", [["create", "folder"]], create_folder,
+                lambda command: _required("folder_name", command.split("folder")[1].strip()))
@@ -0,0 +1,161 @@
+"""
+TTS audio cache for GrokVIS.
+Stores synthesized waveforms on disk under a content address derived from
+(model, persona, normalized text), evicts the least recently used clips once
+the directory grows past its size budget, and keeps recently played clips in
+an in-RAM hot tier so repeated phrases play without touching the model.
+"""
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+from grokvis.embedding_cache import normalize_text
+
+CACHE_DIR = os.path.join("models", "voice", "cache")
+
+
+class AudioCache:
+    """Content-addressed, size-bounded LRU cache of synthesized audio."""
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=256 * 1024 * 1024, max_memory_bytes=32 * 1024 * 1024):
+        """
+        Parameters:
+            directory (str, optional): Folder holding one .npy file per clip.
+            max_bytes (int, optional): Disk budget; older clips are deleted past it.
+            max_memory_bytes (int, optional): Budget for the in-RAM hot tier.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_memory_bytes = max_memory_bytes
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # key -> (audio, sample_rate)
+        self._memory_bytes = 0
+        self._files = OrderedDict()  # key -> (sample_rate, size), least recently used first
+        self._disk_bytes = 0
+        try:
+            os.makedirs(directory, exist_ok=True)
+            self._scan()
+        except Exception as e:
+            logging.error(f"Audio Cache Error: {e}")
+
+    @staticmethod
+    def key(model_name, persona, text):
+        """Return the content address of a phrase spoken by a model and persona."""
+        return hashlib.sha1(f"{model_name}\0{persona}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+    def _path(self, key, sample_rate):
+        """Return the file path of a clip; the sample rate is part of the name."""
+        return os.path.join(self.directory, f"{key}_{sample_rate}.npy")
+
+    def _scan(self):
+        """Index the clips already on disk, oldest modification time first."""
+        entries = []
+        for name in os.listdir(self.directory):
+            stem, ext = os.path.splitext(name)
+            if ext != ".npy" or "_" not in stem:
+                continue
+            key, rate = stem.rsplit("_", 1)
+            stat = os.stat(os.path.join(self.directory, name))
+            entries.append((stat.st_mtime, key, int(rate), stat.st_size))
+        for _, key, rate, size in sorted(entries):
+            self._files[key] = (rate, size)
+            self._disk_bytes += size
+
+    def __contains__(self, key):
+        return key in self._memory or key in self._files
+
+    def get(self, key):
+        """Return (audio, sample_rate) for a cached clip, or None on a miss."""
+        with self._lock:
+            clip = self._memory.get(key)
+            if clip is not None:
+                self._memory.move_to_end(key)
+                if key in self._files:
+                    self._files.move_to_end(key)
+                self.hits += 1
+                return clip
+            entry = self._files.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            rate, _ = entry
+            path = self._path(key, rate)
+            try:
+                audio = np.load(path)
+                # The modification time carries the LRU order across restarts
+                os.utime(path)
+            except Exception as e:
+                logging.error(f"Audio Cache Read Error: {e}")
+                self._forget_file(key)
+                self.misses += 1
+                return None
+            self._files.move_to_end(key)
+            self._remember(key, audio, rate)
+            self.disk_hits += 1
+            return audio, rate
+
+    def put(self, key, audio, sample_rate):
+        """Store a clip in both tiers, evicting old clips past the budgets."""
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+        with self._lock:
+            self._remember(key, audio, sample_rate)
+            if key in self._files:
+                return
+            path = self._path(key, sample_rate)
+            try:
+                # Write then rename so a crash never leaves a truncated clip behind
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, "wb") as f:
+                    np.save(f, audio)
+                os.replace(tmp_path, path)
+            except Exception as e:
+                logging.error(f"Audio Cache Write Error: {e}")
+                return
+            self._files[key] = (sample_rate, audio.nbytes)
+            self._disk_bytes += audio.nbytes
+            while self._disk_bytes > self.max_bytes and len(self._files) > 1:
+                oldest = next(iter(self._files))
+                self._delete_file(oldest)
+
+    def _remember(self, key, audio, sample_rate):
+        """Insert into the hot tier, evicting the least recently played clips."""
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return
+        self._memory[key] = (audio, sample_rate)
+        self._memory_bytes += audio.nbytes
+        while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+            _, (old_audio, _) = self._memory.popitem(last=False)
+            self._memory_bytes -= old_audio.nbytes
+
+    def _forget_file(self, key):
+        """Drop a clip from the disk index without touching the file."""
+        _, size = self._files.pop(key)
+        self._disk_bytes -= size
+
+    def _delete_file(self, key):
+        """Evict a clip from disk."""
+        rate, _ = self._files[key]
+        self._forget_file(key)
+        try:
+            os.remove(self._path(key, rate))
+        except OSError as e:
+            logging.error(f"Audio Cache Eviction Error: {e}")
+
+    def stats(self):
+        """Return hit/miss counters and tier sizes for logging or the dashboard."""
+        total = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.disk_hits) / total if total else 0.0,
+            "clips": len(self._files),
+            "disk_bytes": self._disk_bytes,
+            "memory_bytes": self._memory_bytes,
+        }
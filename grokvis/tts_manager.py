@@ -4,9 +4,15 @@ Handles lazy TTS initialization and speech synthesis.
 
 import os
 import logging
+import queue
+import re
+import threading
+import time
+import numpy as np
 from TTS.api import TTS
 import sounddevice as sd  # type: ignore
-import soundfile as sf
+from grokvis.tts_cache import AudioCache
+from grokvis.speech_queue import SpeechQueue, PRIORITY_URGENT, PRIORITY_NORMAL, PRIORITY_CHATTER
 
 
 # Configure logging to keep track of the system’s groove
@@ -15,114 +21,544 @@ logging.basicConfig(level=logging.INFO)
 
 # Global variable for TTS instance
 _tts_instance = None
+_tts_model_name = None
+_tts_init_lock = threading.Lock()
+
+# Engine tiers, best quality first; synthesis moves down a tier when it
+# cannot keep up with real time (synthesis time / audio duration > 1), and
+# back up once a re-probe shows the better tier keeping up again
+_tiers = None
+_tier_index = 0
+RTF_LIMIT = 1.0
+RTF_MIN_AUDIO_SECONDS = 0.5
+RTF_MIN_SAMPLES = 3
+RTF_SMOOTHING = 0.3
+# Timed probe syntheses per tier at startup, after one untimed warmup call
+RTF_PROBE_RUNS = 3
+RTF_PROBE_TEXT = "Good morning. All systems are ready."
+# On a lower tier, the next better one is re-probed after this many measurements,
+# and taken back only if it reaches RTF_RECOVERY_LIMIT, so tiers do not flap
+RTF_RECOVERY_SAMPLES = 50
+RTF_RECOVERY_LIMIT = 0.8
+_rtf = {"average": None, "samples": 0}
+_reprobe_thread = None
+
+# Set GROKVIS_TTS_TIER=quality or fast to skip measurement and switching
+PINNED_TIER = os.environ.get("GROKVIS_TTS_TIER") or None
+
+# Synthesized phrases, keyed by (model, persona, normalized text)
+_audio_cache = None
+_audio_cache_lock = threading.Lock()
+
+# Replies are split at sentence boundaries so the first sentence can play
+# while the next one is still being synthesized
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+# Set GROKVIS_TTS_STREAMING=0 to synthesize whole replies before playback
+STREAMING = os.environ.get("GROKVIS_TTS_STREAMING", "1") != "0"
+
+# Coqui models are not safe to run from two threads at once
+_synth_lock = threading.Lock()
+
+# One persistent output stream; only one utterance plays at a time
+_output_stream = None
+_output_lock = threading.Lock()
+
+# Silence inserted between the lines of a list read out with speak_many()
+LINE_GAP_SECONDS = 0.25
+
+# Interruptible playback writes this much audio at a time, bounding barge-in latency
+WRITE_BLOCK_SECONDS = 0.05
+
+# Non-blocking speech output, created on first use
+_speech_queue = None
+_speech_queue_lock = threading.Lock()
+
+# Stop events of synchronous speak()/speak_many() calls in progress, set by cancel_speech()
+_direct_stops = set()
+_direct_stops_lock = threading.Lock()
+
+# Time from speak() being called to the first sample reaching the output stream
+_metrics = {"utterances": 0, "last_time_to_first_audio": None, "total_time_to_first_audio": 0.0}
+
+def get_tts_tiers():
+    """Return the (tier name, TTS configuration) pairs to choose from, best quality first."""
+    global _tiers
+    if _tiers is None:
+        # Import hardware manager here to avoid circular imports
+        from grokvis.hardware_manager import get_hardware_manager
+        tiers = get_hardware_manager().get_tts_tiers()
+        pinned = [tier for tier in tiers if tier[0] == PINNED_TIER]
+        _tiers = pinned or tiers
+    return _tiers
+
+def get_tts_tier():
+    """Return the name of the engine tier in use."""
+    return get_tts_tiers()[_tier_index][0]
 
 def get_tts_instance():
-    """Lazily initialize and return the TTS instance."""
-    global _tts_instance
-    if _tts_instance is None:
+    """Lazily initialize and return the TTS instance for the current tier."""
+    global _tts_instance, _tts_model_name, _tier_index
+    # Startup preloads the model on a background thread; callers arriving
+    # meanwhile wait for it instead of loading a second copy
+    with _tts_init_lock:
+        while _tts_instance is None:
+            tier, tts_config = get_tts_tiers()[_tier_index]
+            try:
+                from grokvis.hardware_manager import get_hardware_manager
+                logger.info(f"Initializing {tier} TTS tier with config: {tts_config}")
+                logger.info(f"Hardware detected: {get_hardware_manager().get_summary()}")
+
+                _tts_instance = TTS(**tts_config)
+                _tts_model_name = tts_config['model_name']
+
+                # Log which device is being used
+                device_type = "GPU" if tts_config['gpu'] else "CPU"
+                logger.info(f"TTS initialized using {device_type}")
+
+            except Exception as e:
+                logger.error("Failed to initialize the %s TTS tier: %s. Check your TTS configuration.", tier, e)
+                if _tier_index + 1 < len(get_tts_tiers()):
+                    _tier_index += 1
+                    continue
+
+                # Fallback to CPU-only configuration if every tier failed
+                logger.info("Falling back to CPU-only configuration")
+                _tts_instance = TTS(
+                    model_name="tts_models/en/ljspeech/tacotron2-DDC",
+                    progress_bar=False,
+                    gpu=False
+                )
+                _tts_model_name = "tts_models/en/ljspeech/tacotron2-DDC"
+    return _tts_instance
+
+def get_tts_model_name():
+    """Return the name of the TTS model in use, without loading it."""
+    global _tts_model_name
+    if _tts_model_name is None:
+        _tts_model_name = get_tts_tiers()[_tier_index][1]['model_name']
+    return _tts_model_name
+
+def switch_tts_tier(index, instance=None):
+    """Make the tier at index current; its model is loaded on the next synthesis unless instance is given."""
+    global _tts_instance, _tts_model_name, _tier_index
+    with _tts_init_lock:
+        if index == _tier_index:
+            return
+        logger.warning("Switching TTS tier from %s to %s", get_tts_tiers()[_tier_index][0], get_tts_tiers()[index][0])
+        _tier_index = index
+        _tts_instance = instance
+        _tts_model_name = get_tts_tiers()[index][1]['model_name'] if instance is not None else None
+        _rtf["average"] = None
+        _rtf["samples"] = 0
+
+def _record_rtf(elapsed, samples, sample_rate):
+    """Track the real-time factor and move to a faster tier when synthesis falls behind.
+
+    On a lower tier, every RTF_RECOVERY_SAMPLES measurements start a
+    background re-probe of the next better one.
+    """
+    duration = len(samples) / sample_rate
+    # Very short clips are dominated by fixed per-call overhead
+    if duration < RTF_MIN_AUDIO_SECONDS:
+        return
+    rtf = elapsed / duration
+    average = _rtf["average"]
+    _rtf["average"] = rtf if average is None else RTF_SMOOTHING * rtf + (1 - RTF_SMOOTHING) * average
+    _rtf["samples"] += 1
+    if (_rtf["samples"] >= RTF_MIN_SAMPLES and _rtf["average"] > RTF_LIMIT
+            and PINNED_TIER is None and _tier_index + 1 < len(get_tts_tiers())):
+        logger.warning("TTS real-time factor %.2f is above %.1f", _rtf["average"], RTF_LIMIT)
+        switch_tts_tier(_tier_index + 1)
+    elif PINNED_TIER is None and _tier_index > 0 and _rtf["samples"] % RTF_RECOVERY_SAMPLES == 0:
+        _start_reprobe()
+
+def _measure_rtf(tts, probe):
+    """Return the median real-time factor of RTF_PROBE_RUNS timed syntheses after one untimed warmup call."""
+    tts.tts(text=probe)
+    rtfs = []
+    for _ in range(RTF_PROBE_RUNS):
+        started = time.perf_counter()
+        audio = tts.tts(text=probe)
+        rtfs.append((time.perf_counter() - started) / max(len(audio) / tts.sample_rate, 1e-6))
+    return float(np.median(rtfs))
+
+def _start_reprobe():
+    """Re-probe the next better tier on a background thread, unless a re-probe is running."""
+    global _reprobe_thread
+    if _reprobe_thread is not None and _reprobe_thread.is_alive():
+        return
+    _reprobe_thread = threading.Thread(target=reprobe_tts_tier, name="tts-reprobe", daemon=True)
+    _reprobe_thread.start()
+
+def reprobe_tts_tier(probe=RTF_PROBE_TEXT):
+    """Time the next better tier on the probe sentence and move back up to it if it keeps up again.
+
+    The better model is loaded alongside the current one and timed under the
+    synthesis lock, so the measurement does not compete with speech. Returns
+    True if the tier was switched.
+    """
+    index = _tier_index - 1
+    if index < 0:
+        return False
+    tier, tts_config = get_tts_tiers()[index]
+    try:
+        tts = TTS(**tts_config)
+        with _synth_lock:
+            rtf = _measure_rtf(tts, probe)
+    except Exception as e:
+        logger.error("TTS tier %s re-probe failed: %s", tier, e)
+        return False
+    logger.info("TTS tier %s re-probed real-time factor: %.2f", tier, rtf)
+    if rtf > RTF_RECOVERY_LIMIT:
+        return False
+    switch_tts_tier(index, tts)
+    return True
+
+def select_tts_tier(probe=RTF_PROBE_TEXT):
+    """Pick the best-quality tier whose measured real-time factor is at most RTF_LIMIT.
+
+    Each tier is loaded and timed on the probe sentence, best quality first;
+    if none keeps up with real time, the fastest one measured is used. The
+    first synthesis after loading pays for CUDA/JIT warmup and allocation, so
+    it is left untimed and the median of RTF_PROBE_RUNS further calls is used.
+    Also warms up the chosen model. Returns the chosen tier name.
+    """
+    measured = []
+    for index in range(len(get_tts_tiers())):
+        switch_tts_tier(index)
+        tts = get_tts_instance()
+        with _synth_lock:
+            rtf = _measure_rtf(tts, probe)
+        logger.info("TTS tier %s real-time factor: %.2f", get_tts_tier(), rtf)
+        measured.append((rtf, index))
+        if rtf <= RTF_LIMIT:
+            break
+    else:
+        switch_tts_tier(min(measured)[1])
+        get_tts_instance()
+    return get_tts_tier()
+
+def get_audio_cache():
+    """Return the synthesized-audio cache, creating it on first use."""
+    global _audio_cache
+    with _audio_cache_lock:
+        if _audio_cache is None:
+            _audio_cache = AudioCache()
+        return _audio_cache
+
+def split_sentences(text):
+    """Split text into sentences for chunked synthesis."""
+    return [sentence.strip() for sentence in SENTENCE_BOUNDARY.split(text.strip()) if sentence.strip()]
+
+def get_output_stream(sample_rate):
+    """Return the persistent output stream, reopening it only if the sample rate changes."""
+    global _output_stream
+    if _output_stream is None or _output_stream.samplerate != sample_rate:
+        if _output_stream is not None:
+            _output_stream.close()
+        _output_stream = sd.OutputStream(samplerate=sample_rate, channels=1, dtype="float32")
+        _output_stream.start()
+    return _output_stream
+
+def close_output_stream():
+    """Stop and close the persistent output stream; called on shutdown."""
+    global _output_stream
+    with _output_lock:
+        if _output_stream is not None:
+            _output_stream.close()
+            _output_stream = None
+
+def synthesize(text):
+    """Synthesize one chunk of text and return (float32 samples, sample rate)."""
+    tts = get_tts_instance()
+    with _synth_lock:
+        started = time.perf_counter()
+        audio = np.asarray(tts.tts(text=text), dtype=np.float32)
+        elapsed = time.perf_counter() - started
+    _record_rtf(elapsed, audio, tts.sample_rate)
+    return audio, tts.sample_rate
+
+def synthesize_cached(text, persona="Default"):
+    """Return (samples, sample rate) for text, synthesizing only on a cache miss."""
+    cache = get_audio_cache()
+    key = cache.key(get_tts_model_name(), persona, text)
+    clip = cache.get(key)
+    if clip is None:
+        clip = synthesize(text)
+        cache.put(key, *clip)
+    return clip
+
+def render_batch(lines, persona="Default"):
+    """Return (samples, sample rate) for every line, synthesizing the cache misses once each."""
+    clips = {}
+    for line in lines:
+        if line not in clips:
+            clips[line] = synthesize_cached(line, persona)
+    return [clips[line] for line in lines]
+
+def preload_tts():
+    """Load the TTS model on a background thread and return the thread.
+
+    Unless a tier is pinned, the engine tier is chosen by measured real-time
+    factor; the timing synthesis also pays the first-inference warmup cost
+    before anything is actually spoken.
+    """
+    def load():
         try:
-            # Import hardware manager here to avoid circular imports
-            from grokvis.hardware_manager import get_hardware_manager
-            
-            # Get hardware-optimized TTS configuration
-            hw_manager = get_hardware_manager()
-            tts_config = hw_manager.get_tts_config()
-            
-            logger.info(f"Initializing TTS instance with config: {tts_config}")
-            logger.info(f"Hardware detected: {hw_manager.get_summary()}")
-            
-            _tts_instance = TTS(**tts_config)
-            
-            # Log which device is being used
-            device_type = "GPU" if tts_config['gpu'] else "CPU"
-            logger.info(f"TTS initialized using {device_type}")
-            
+            if PINNED_TIER is None:
+                logger.info("Selected TTS tier: %s", select_tts_tier())
+            else:
+                synthesize("Ready.")
         except Exception as e:
-            logger.error("Failed to initialize TTS: %s. Check your TTS configuration.", e)
-
-            # Fallback to CPU-only configuration if hardware detection fails
-            logger.info("Falling back to CPU-only configuration")
-            _tts_instance = TTS(
-                model_name="tts_models/en/ljspeech/tacotron2-DDC",
-                progress_bar=False,
-                gpu=True
-            )
-    return _tts_instance
+            logger.error("TTS preload failed: %s", e)
+
+    thread = threading.Thread(target=load, name="tts-preload", daemon=True)
+    thread.start()
+    return thread
 
-def speak(text, persona="Default", command=None):  # Consolidated speak function
+def prerender(phrases, persona="Default"):
+    """Synthesize every sentence of the given phrases into the audio cache.
 
+    Returns the number of sentences that had to be synthesized.
     """
-    Synthesize speech from text and play it in real-time.
-    
-    Parameters:
-        text (str): The text to be synthesized.
-        persona (str, optional): Identifier for organizing voice samples. Defaults to "Default".
-        command (str, optional): Command or label used to name the output file. If None, a timestamp will be used.
+    cache = get_audio_cache()
+    rendered = 0
+    for phrase in phrases:
+        for sentence in split_sentences(phrase):
+            key = cache.key(get_tts_model_name(), persona, sentence)
+            if key in cache:
+                continue
+            cache.put(key, *synthesize(sentence))
+            rendered += 1
+    return rendered
+
+def get_tts_metrics():
+    """Return time-to-first-audio statistics in seconds, with the engine tier and real-time factor."""
+    count = _metrics["utterances"]
+    return {
+        "tier": get_tts_tier(),
+        "real_time_factor": _rtf["average"],
+        "utterances": count,
+        "last_time_to_first_audio": _metrics["last_time_to_first_audio"],
+        "mean_time_to_first_audio": _metrics["total_time_to_first_audio"] / count if count else None,
+    }
+
+def _record_first_audio(seconds):
+    """Add one time-to-first-audio measurement to the metrics."""
+    _metrics["utterances"] += 1
+    _metrics["last_time_to_first_audio"] = seconds
+    _metrics["total_time_to_first_audio"] += seconds
+    logger.info("Time to first audio: %.3f s", seconds)
+
+def play_chunks(chunks, persona="Default", stop=None, gap=0.0):
+    """Synthesize chunks on a worker thread while earlier chunks play.
+
+    Chunk N+1 is synthesized while chunk N is written to the persistent output
+    stream, so only the first chunk's synthesis time is heard as silence.
+    Cached chunks skip synthesis entirely. Setting the optional stop event cuts
+    playback off within one write block and drops whatever is still buffered.
+    gap seconds of silence are played before every chunk after the first.
+    Returns the number of chunks played to the end.
     """
-    # If command is not provided, use a timestamp for file naming
-    if command is None:
-        import datetime
-        command = f"speech_{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}"
-    # Construct the directory and file path
-    directory = os.path.join("models/voice", persona)
-    file_path = os.path.join(directory, f"{command}.wav")
+    if not chunks:
+        return 0
+    started = time.perf_counter()
+    ready = queue.Queue()
+    cancelled = threading.Event()
+    played = 0
+
+    def produce():
+        try:
+            for chunk in chunks:
+                if cancelled.is_set() or (stop is not None and stop.is_set()):
+                    return
+                ready.put(synthesize_cached(chunk, persona))
+            ready.put(None)
+        except Exception as e:
+            ready.put(e)
 
-    # Create the directory if it doesn't exist
-    os.makedirs(directory, exist_ok=True)
+    threading.Thread(target=produce, name="tts-synthesis", daemon=True).start()
+    try:
+        with _output_lock:
+            first = True
+            stream = None
+            while True:
+                item = _next_chunk(ready, stop)
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                audio, sample_rate = item
+                stream = get_output_stream(sample_rate)
+                if first:
+                    _record_first_audio(time.perf_counter() - started)
+                    first = False
+                elif gap:
+                    audio = np.concatenate([np.zeros(int(sample_rate * gap), dtype=np.float32), audio])
+                if not _write_interruptible(stream, audio, sample_rate, stop):
+                    # Barge-in: drop the buffered tail instead of letting it play out
+                    stream.abort()
+                    stream.start()
+                    return played
+                played += 1
+            if stream is not None:
+                # Let the buffered tail finish before returning, like sd.wait() did
+                time.sleep(stream.latency)
+    finally:
+        cancelled.set()
+    return played
 
-    # Synthesize speech and save it as a WAV file if it doesn't exist
+def play_batched(lines, persona="Default", stop=None, gap=LINE_GAP_SECONDS):
+    """Play lines as one pipelined chunk stream with a short silence between each.
+
+    Each line is still synthesized on its own, but line N+1 is synthesized
+    while line N plays, so the list sounds like one utterance and only the
+    first line's synthesis time is heard as silence. Returns the number of
+    lines played to the end.
+    """
+    return play_chunks(lines, persona, stop, gap)
+
+def _next_chunk(ready, stop):
+    """Wait for the next synthesized chunk, returning None early if stop is set."""
+    while True:
+        try:
+            return ready.get(timeout=WRITE_BLOCK_SECONDS)
+        except queue.Empty:
+            if stop is not None and stop.is_set():
+                return None
+
+def _write_interruptible(stream, audio, sample_rate, stop):
+    """Write audio in short blocks, checking stop between them; False if stopped."""
+    if stop is None:
+        # Blocks until the samples are queued in the device buffer
+        stream.write(audio.reshape(-1, 1))
+        return True
+    block = max(1, int(sample_rate * WRITE_BLOCK_SECONDS))
+    for start in range(0, len(audio), block):
+        if stop.is_set():
+            return False
+        stream.write(audio[start:start + block].reshape(-1, 1))
+    return not stop.is_set()
+
+def speak_streaming(text, persona="Default", stop=None):
+    """Speak text sentence by sentence through the persistent output stream."""
+    play_chunks(split_sentences(text), persona, stop)
+
+def _start_direct():
+    """Register and return a stop event for a synchronous utterance."""
+    stop = threading.Event()
+    with _direct_stops_lock:
+        _direct_stops.add(stop)
+    return stop
+
+def _end_direct(stop):
+    """Forget a finished synchronous utterance's stop event."""
+    with _direct_stops_lock:
+        _direct_stops.discard(stop)
+
+def _after_queue(stop):
+    """Wait for queued speech to finish so a direct utterance neither talks over nor jumps ahead of it.
+
+    Returns False if the utterance was cancelled meanwhile.
+    """
+    if _speech_queue is not None:
+        _speech_queue.wait()
+    return not stop.is_set()
 
+def speak(text, persona="Default"):
+    """
+    Synthesize speech from text and play it in real-time, after any queued speech.
+
+    Parameters:
+        text (str): The text to be synthesized.
+        persona (str, optional): Voice persona; part of the audio cache key. Defaults to "Default".
+    """
+    stop = _start_direct()
     try:
-        tts = get_tts_instance()
-        logger.info("Synthesizing speech for text: '%s'", text)
-        audio_data = tts.tts(text=text)
-        
-        # Play the audio data using sounddevice
-        logger.info("Playing synthesized audio in real-time")
-        sd.play(audio_data, samplerate=tts.sample_rate)
-        sd.wait()
+        if not _after_queue(stop):
+            return
+        logger.info("Speaking text: '%s'", text)
+        if STREAMING:
+            speak_streaming(text, persona, stop)
+        else:
+            play_chunks([text], persona, stop)
     except Exception as e:
         logger.error("Failed to synthesize or play speech: %s", e)
         raise
+    finally:
+        _end_direct(stop)
+
+def get_speech_queue():
+    """Return the speech output queue, starting its playback thread on first use."""
+    global _speech_queue
+    with _speech_queue_lock:
+        if _speech_queue is None:
+            split = split_sentences if STREAMING else (lambda text: [text] if text.strip() else [])
+            _speech_queue = SpeechQueue(play_chunks, split=split, play_batch=play_batched)
+        return _speech_queue
+
+def say(text, priority=PRIORITY_NORMAL, persona="Default"):
     """
-    Synthesize speech from text, save it as a WAV file, and play it.
-    
+    Queue text to be spoken and return without waiting for playback.
+
     Parameters:
         text (str): The text to be synthesized.
-        persona (str, optional): Identifier for organizing voice samples. Defaults to "Default".
-        command (str, optional): Command or label used to name the output file. If None, a timestamp will be used.
+        priority (int, optional): PRIORITY_URGENT, PRIORITY_NORMAL or PRIORITY_CHATTER.
+            Consecutive PRIORITY_CHATTER lines are played back to back as one batch.
+        persona (str, optional): Voice persona; part of the audio cache key. Defaults to "Default".
     """
-    # If command is not provided, use a timestamp
-    if command is None:
-        import datetime
-        command = f"speech_{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}"
-    # Construct the directory and file path
-    directory = os.path.join("models/voice", persona)
-    file_path = os.path.join(directory, f"{command}.wav")
-    logger.info(f"Saving audio to: {file_path}")  # Now using file_path
+    logger.info("Queueing text (priority %d): '%s'", priority, text)
+    get_speech_queue().submit(text, priority, persona)
 
+def speak_many(lines, persona="Default", priority=None):
+    """
+    Speak a list of lines as one pipelined utterance with short pauses between them.
 
-    # Create the directory if it doesn't exist
-    os.makedirs(directory, exist_ok=True)
+    Parameters:
+        lines (list[str]): The lines to be spoken, in order.
+        persona (str, optional): Voice persona; part of the audio cache key. Defaults to "Default".
+        priority (int, optional): Queue the lines at this priority and return immediately.
+            By default they are played before returning, after any queued speech, like speak().
+    """
+    lines = [line for line in lines if line.strip()]
+    if priority is not None:
+        logger.info("Queueing %d lines (priority %d)", len(lines), priority)
+        get_speech_queue().submit_many(lines, priority, persona)
+        return
+    stop = _start_direct()
+    try:
+        if not _after_queue(stop):
+            return
+        logger.info("Speaking %d lines", len(lines))
+        play_batched(lines, persona, stop)
+    except Exception as e:
+        logger.error("Failed to synthesize or play speech: %s", e)
+        raise
+    finally:
+        _end_direct(stop)
 
-    # If the file doesn't exist, generate it
+def speak_reminder(text):
+    """Announce a scheduled reminder ahead of any queued chatter."""
+    say(text, priority=PRIORITY_URGENT)
 
-    if not os.path.isfile(file_path):
-        try:
-            tts = get_tts_instance()
-            logger.info("Synthesizing speech for text: '%s'", text)
-            tts.tts_to_file(text=text, file_path=file_path)
-        except Exception as e:
-            logger.error("Failed to synthesize speech: %s", e)
-            raise
+def cancel_speech():
+    """Stop the current utterance and drop everything queued; called on wake word.
 
-    # Play the synthesized audio using sounddevice
+    Synchronous speak() and speak_many() calls bypass the queue, so their
+    stop events are set as well.
+    """
+    if _speech_queue is not None:
+        _speech_queue.cancel()
+    with _direct_stops_lock:
+        for stop in _direct_stops:
+            stop.set()
 
-    try:
-        data, fs = sf.read(file_path, dtype='float32')
-        logger.info("Playing audio file: %s", file_path)
-        sd.play(data, fs)
-        sd.wait()
-    except Exception as e:
-        logger.error("Error during audio playback: %s", e)
-        raise
+def close_speech_queue():
+    """Stop the speech output thread; called on shutdown."""
+    global _speech_queue
+    with _speech_queue_lock:
+        if _speech_queue is not None:
+            logger.info("Speech queue stats: %s", _speech_queue.stats())
+            _speech_queue.close()
+            _speech_queue = None
@@ -0,0 +1,190 @@
+"""
+Voice activity detection and endpointing for GrokVIS.
+Classifies short frames as speech or not from their energy against an
+adaptive noise floor, with the zero-crossing rate rescuing quiet unvoiced
+sounds such as a trailing "s". The endpointer turns those decisions into
+the start and end of an utterance, ending it after a configurable stretch
+of non-speech (the hangover) instead of speech_recognition's fixed pause
+timings. The noise floor lives on the detector, so it carries over from
+one command to the next rather than being re-learned every time.
+"""
+import collections
+import os
+import time
+import numpy as np
+import speech_recognition as sr
+
+FRAME_MS = 20
+# Non-speech needed after speech before the utterance is considered finished;
+# set GROKVIS_VAD_HANGOVER_MS to trade dead air against cutting off slow speakers
+HANGOVER_MS = int(os.environ.get("GROKVIS_VAD_HANGOVER_MS", "300"))
+# Consecutive speech needed to start an utterance, so clicks do not trigger it
+START_MS = 60
+# Audio kept from before the start was detected, so the first phoneme is not clipped
+PREROLL_MS = 300
+
+# Endpointer events
+SILENCE, SPEECH_START, SPEECH, SPEECH_END = "silence", "speech_start", "speech", "speech_end"
+
+
+class VoiceActivityDetector:
+    """Frame-level speech/non-speech decisions against an adaptive noise floor."""
+
+    def __init__(self, margin_db=10.0, fricative_margin_db=5.0, fricative_zcr=0.3,
+                 fall=0.3, rise=0.1, speech_rise_db=0.02, min_floor_db=-80.0):
+        """
+        Parameters:
+            margin_db (float, optional): Level above the floor that counts as speech.
+            fricative_margin_db (float, optional): Lower margin accepted for frames with a high zero-crossing rate.
+            fricative_zcr (float, optional): Zero crossings per sample above which a frame sounds unvoiced.
+            fall (float, optional): Fraction of the gap closed per frame when the level is below the floor.
+            rise (float, optional): Fraction closed per non-speech frame above the floor.
+            speech_rise_db (float, optional): Most the floor rises per speech frame, so a floor seeded on
+                speech or a room that got louder still recovers without speech dragging it up.
+            min_floor_db (float, optional): Lowest floor, for digital silence.
+        """
+        self.margin_db = margin_db
+        self.fricative_margin_db = fricative_margin_db
+        self.fricative_zcr = fricative_zcr
+        self.fall = fall
+        self.rise = rise
+        self.speech_rise_db = speech_rise_db
+        self.min_floor_db = min_floor_db
+        self.floor_db = None
+
+    @staticmethod
+    def level_db(frame):
+        """Mean power of an int16 frame in dB relative to full scale."""
+        samples = np.asarray(frame, dtype=np.float32) / 32768.0
+        return 10 * np.log10(max(float(np.mean(samples * samples)), 1e-12))
+
+    @staticmethod
+    def zero_crossing_rate(frame):
+        """Fraction of adjacent sample pairs that change sign."""
+        return float(np.count_nonzero(np.diff(np.signbit(frame)))) / max(len(frame) - 1, 1)
+
+    def calibrate(self, samples, frame_length):
+        """Set the floor from audio that is mostly background, such as the capture history."""
+        frames = len(samples) // frame_length
+        if frames == 0:
+            return
+        blocks = np.asarray(samples[:frames * frame_length], dtype=np.float32).reshape(frames, frame_length) / 32768.0
+        levels = 10 * np.log10(np.maximum(np.mean(blocks * blocks, axis=1), 1e-12))
+        # Speech in the history sits in the upper percentiles
+        self.floor_db = max(float(np.percentile(levels, 20)), self.min_floor_db)
+
+    def is_speech(self, frame):
+        """Classify one int16 frame and adapt the noise floor to it."""
+        level = self.level_db(frame)
+        if self.floor_db is None:
+            self.floor_db = max(level, self.min_floor_db)
+        above = level - self.floor_db
+        speech = above > self.margin_db or (
+            above > self.fricative_margin_db and self.zero_crossing_rate(frame) > self.fricative_zcr)
+        if speech:
+            step = min(self.speech_rise_db, above)
+        else:
+            step = (self.fall if above < 0 else self.rise) * above
+        self.floor_db = max(self.floor_db + step, self.min_floor_db)
+        return speech
+
+
+class Endpointer:
+    """Turns per-frame VAD decisions into utterance start and end events."""
+
+    def __init__(self, sample_rate, detector=None, frame_ms=FRAME_MS, hangover_ms=HANGOVER_MS,
+                 start_ms=START_MS, preroll_ms=PREROLL_MS):
+        """
+        Parameters:
+            sample_rate (int): Rate of the audio passed to process().
+            detector (VoiceActivityDetector, optional): Shared detector; its floor persists across utterances.
+            frame_ms (int, optional): Frame length in milliseconds.
+            hangover_ms (int, optional): Non-speech after speech that ends the utterance.
+            start_ms (int, optional): Consecutive speech that starts it.
+            preroll_ms (int, optional): Audio kept from before the start.
+        """
+        self.sample_rate = sample_rate
+        self.detector = detector or VoiceActivityDetector()
+        self.frame_length = int(sample_rate * frame_ms / 1000)
+        self.hangover_frames = max(1, round(hangover_ms / frame_ms))
+        self.start_frames = max(1, round(start_ms / frame_ms))
+        self.preroll_frames = max(self.start_frames, round(preroll_ms / frame_ms))
+        self.reset()
+
+    def reset(self):
+        """Forget the current utterance; the detector's noise floor is kept."""
+        self.triggered = False
+        self._speech_run = 0
+        self._silence_run = 0
+        self.speech_start_time = None
+        self.speech_end_time = None
+
+    def process(self, frame):
+        """Classify one frame of frame_length int16 samples; return an event constant."""
+        speech = self.detector.is_speech(frame)
+        if not self.triggered:
+            self._speech_run = self._speech_run + 1 if speech else 0
+            if self._speech_run < self.start_frames:
+                return SILENCE
+            self.triggered = True
+            self._silence_run = 0
+            self.speech_start_time = self.speech_end_time = time.perf_counter()
+            return SPEECH_START
+        if speech:
+            self._silence_run = 0
+            # Frames arrive in real time, so this is when the user stopped talking
+            self.speech_end_time = time.perf_counter()
+            return SPEECH
+        self._silence_run += 1
+        return SPEECH_END if self._silence_run >= self.hangover_frames else SPEECH
+
+
+def record_utterance(source, endpointer, timeout=None, max_seconds=None):
+    """
+    Read one utterance from an open audio source, ending it with the endpointer.
+
+    Returns an sr.AudioData running from just before the detected start to
+    the end of the hangover, like Recognizer.listen().
+
+    Parameters:
+        source (sr.AudioSource): An entered source with 16-bit samples.
+        endpointer (Endpointer): Built for the source's sample rate; reset here.
+        timeout (float, optional): Seconds to wait for speech before raising sr.WaitTimeoutError.
+        max_seconds (float, optional): Longest utterance before it is cut off.
+    """
+    endpointer.reset()
+    frame_bytes = endpointer.frame_length * source.SAMPLE_WIDTH
+    preroll = collections.deque(maxlen=endpointer.preroll_frames)
+    frames = []
+    waited = spoken = 0.0
+    frame_seconds = endpointer.frame_length / source.SAMPLE_RATE
+    while True:
+        data = source.stream.read(endpointer.frame_length)
+        if len(data) < frame_bytes:
+            # The source was closed
+            break
+        event = endpointer.process(np.frombuffer(data, dtype="<i2"))
+        if not endpointer.triggered:
+            preroll.append(data)
+            waited += frame_seconds
+            if timeout is not None and waited > timeout:
+                raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+            continue
+        if event == SPEECH_START:
+            frames.extend(preroll)
+        frames.append(data)
+        spoken += frame_seconds
+        if event == SPEECH_END or (max_seconds is not None and spoken > max_seconds):
+            break
+    return sr.AudioData(b"".join(frames), source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+
+
+_endpointers = {}
+
+
+def get_endpointer(sample_rate):
+    """Return the shared endpointer for a sample rate; all of them share one noise floor."""
+    if sample_rate not in _endpointers:
+        detector = next(iter(_endpointers.values())).detector if _endpointers else None
+        _endpointers[sample_rate] = Endpointer(sample_rate, detector)
+    return _endpointers[sample_rate]
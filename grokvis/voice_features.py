@@ -0,0 +1,221 @@
+"""
+In-memory voice features for GrokVIS speaker verification.
+Computes the same mean-MFCC vector as librosa.feature.mfcc with its default
+settings, but straight from PCM samples at one fixed sample rate, with the
+window, mel filterbank and DCT matrix built once and reused.
+
+EnrollmentSet keeps the features of every enrollment clip on disk, keyed by
+path, size and modification time, so retraining only decodes new clips.
+"""
+import glob
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+# Commands are captured at Porcupine's rate; training clips are resampled to it
+MFCC_SAMPLE_RATE = 16000
+
+ENROLLMENT_PATH = "models/voice/enrollment.json"
+
+# Below this many new clips, decoding in-process beats starting worker processes
+PARALLEL_MIN_FILES = 8
+
+
+class MFCCExtractor:
+    """Mean-MFCC feature extractor with cached transforms for one sample rate."""
+
+    def __init__(self, sample_rate=MFCC_SAMPLE_RATE, n_mfcc=13, n_fft=2048, hop_length=512, n_mels=128, top_db=80.0):
+        """
+        Parameters:
+            sample_rate (int, optional): Rate of every signal passed in.
+            n_mfcc (int, optional): Number of coefficients kept.
+            n_fft (int, optional): FFT size; also the window length.
+            hop_length (int, optional): Samples between frames.
+            n_mels (int, optional): Number of mel bands.
+            top_db (float, optional): Dynamic range kept below the loudest band, as librosa.power_to_db.
+        """
+        import librosa
+        self.sample_rate = sample_rate
+        self.n_mfcc = n_mfcc
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.top_db = top_db
+        # Periodic Hann window, as scipy.signal.get_window('hann', n_fft) used by librosa.stft
+        self.window = (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(n_fft) / n_fft)).astype(np.float32)
+        self.mel_basis = librosa.filters.mel(sr=sample_rate, n_fft=n_fft, n_mels=n_mels).astype(np.float32)
+        self.dct = self._dct_matrix(n_mels, n_mfcc).astype(np.float32)
+
+    @staticmethod
+    def _dct_matrix(n_inputs, n_outputs):
+        """Rows of the orthonormal DCT-II, as scipy.fft.dct(type=2, norm='ortho')."""
+        k = np.arange(n_outputs)[:, None]
+        n = np.arange(n_inputs)[None, :]
+        matrix = np.sqrt(2.0 / n_inputs) * np.cos(np.pi * k * (2 * n + 1) / (2 * n_inputs))
+        matrix[0] /= np.sqrt(2.0)
+        return matrix
+
+    def mfcc(self, samples):
+        """Return the (n_mfcc, frames) MFCC matrix of float samples in [-1, 1]."""
+        samples = np.asarray(samples, dtype=np.float32)
+        # Centered frames with zero padding, as librosa.stft(center=True)
+        padded = np.pad(samples, self.n_fft // 2)
+        if len(padded) < self.n_fft:
+            padded = np.pad(padded, (0, self.n_fft - len(padded)))
+        frames = np.lib.stride_tricks.sliding_window_view(padded, self.n_fft)[::self.hop_length]
+        power = np.abs(np.fft.rfft(frames * self.window, axis=1)) ** 2
+        mel = power @ self.mel_basis.T
+        log_mel = 10.0 * np.log10(np.maximum(mel, 1e-10))
+        log_mel = np.maximum(log_mel, log_mel.max() - self.top_db)
+        return (log_mel @ self.dct.T).T
+
+    def features(self, samples):
+        """Return the mean MFCC vector used by the voice model."""
+        return np.mean(self.mfcc(samples).T, axis=0)
+
+    def features_from_pcm(self, pcm):
+        """Return the mean MFCC vector of 16-bit PCM bytes or an int16 array."""
+        if isinstance(pcm, (bytes, bytearray, memoryview)):
+            pcm = np.frombuffer(pcm, dtype=np.int16)
+        return self.features(pcm.astype(np.float32) / 32768.0)
+
+
+_extractor = None
+_extractor_lock = threading.Lock()
+
+
+def get_mfcc_extractor():
+    """Return the shared extractor for MFCC_SAMPLE_RATE, building it on first use."""
+    global _extractor
+    with _extractor_lock:
+        if _extractor is None:
+            _extractor = MFCCExtractor()
+        return _extractor
+
+
+def file_features(path):
+    """Return the mean MFCC vector of an audio file, resampled to MFCC_SAMPLE_RATE.
+
+    Module-level so a process pool can pickle it.
+    """
+    import librosa
+    y, _ = librosa.load(path, sr=MFCC_SAMPLE_RATE)
+    return get_mfcc_extractor().features(y)
+
+
+def _safe_file_features(path):
+    """file_features() that returns (path, vector or None, error message) instead of raising."""
+    try:
+        return path, file_features(path).tolist(), None
+    except Exception as e:
+        return path, None, str(e)
+
+
+class EnrollmentSet:
+    """Versioned record of the enrollment clips and their cached feature vectors.
+
+    Each clip is keyed by its path, size and modification time. update() only
+    decodes clips that are new or changed, spread over worker processes when
+    there are enough of them, and bumps the version whenever the set of
+    usable features changes, so a model can tell whether it is out of date.
+    Clips that fail to decode are remembered with no features and are not
+    retried until the file changes.
+    """
+
+    def __init__(self, directory, path=ENROLLMENT_PATH, sample_rate=MFCC_SAMPLE_RATE):
+        """
+        Parameters:
+            directory (str): Folder holding the enrollment .wav clips.
+            path (str, optional): JSON file storing the version and cached features.
+            sample_rate (int, optional): Feature rate; a cache written at another rate is discarded.
+        """
+        self.directory = directory
+        self.path = path
+        self.sample_rate = sample_rate
+        self.version = 0
+        self.entries = {}
+        self.load()
+
+    def load(self):
+        """Read the cached features, keeping only those computed at this sample rate."""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            self.version = data.get("version", 0)
+            if data.get("sample_rate") == self.sample_rate:
+                self.entries = data.get("files", {})
+        except Exception as e:
+            logging.error(f"Enrollment Cache Error: {e}")
+            self.entries = {}
+
+    def save(self):
+        """Write the version and cached features, replacing the file atomically."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"version": self.version, "sample_rate": self.sample_rate, "files": self.entries}, f)
+        os.replace(temp_path, self.path)
+
+    @staticmethod
+    def _stamp(path):
+        """Return the (size, mtime_ns) pair that identifies one version of a file."""
+        stat = os.stat(path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def update(self, workers=None):
+        """
+        Bring the cache in line with the directory; return the number of clips decoded.
+
+        Removed clips are dropped, new or modified ones are decoded, and the
+        version is bumped if the usable features changed.
+
+        Parameters:
+            workers (int, optional): Worker processes for decoding; defaults to the CPU count.
+        """
+        files = sorted(glob.glob(os.path.join(self.directory, "*.wav")))
+        stamps = {path: self._stamp(path) for path in files}
+        stale = [path for path in files
+                 if tuple(self.entries.get(path, {}).get("stamp", ())) != stamps[path]]
+        removed = [path for path in self.entries if path not in stamps]
+        # Only clips with features reach the model; failed ones changing does not make it stale
+        changed = any(self.entries[path].get("features") is not None for path in removed)
+        for path in removed:
+            del self.entries[path]
+
+        if len(stale) >= PARALLEL_MIN_FILES and (workers is None or workers > 1):
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_safe_file_features, stale))
+        else:
+            results = [_safe_file_features(path) for path in stale]
+
+        for path, vector, error in results:
+            if vector is None:
+                logging.error(f"MFCC Extraction Error: {path}: {error}")
+            if vector is not None or self.entries.get(path, {}).get("features") is not None:
+                changed = True
+            # A failed clip keeps its stamp, so it is skipped until the file changes
+            self.entries[path] = {"stamp": list(stamps[path]), "features": vector}
+
+        if changed:
+            self.version += 1
+        if stale or removed or not os.path.exists(self.path):
+            try:
+                self.save()
+            except Exception as e:
+                logging.error(f"Enrollment Cache Error: {e}")
+        return len(stale)
+
+    def features(self):
+        """Return the cached feature vectors of the usable clips as an (n_clips, n_mfcc) array, in path order."""
+        return np.array([self.entries[path]["features"] for path in sorted(self.usable())])
+
+    def usable(self):
+        """Return the paths of clips that decoded to features."""
+        return [path for path, entry in self.entries.items() if entry.get("features") is not None]
+
+    def __len__(self):
+        return len(self.usable())
@@ -3,11 +3,15 @@ Weather service functionality for GrokVIS.
 Handles fetching and reporting weather information.
 """
 import logging
+import re
 import requests
 
 # Import from core module
 from grokvis.core import executor
-from grokvis.speech import speak
+from grokvis.speech import speak, ask
+from grokvis.tts_manager import speak_many, PRIORITY_CHATTER
+from grokvis.speculation import take_speculation
+from grokvis.intent_router import register_intent
 
 def fetch_weather(city):
     """Fetch weather data synchronously for threading."""
@@ -16,12 +20,19 @@ def fetch_weather(city):
     response = requests.get(url).json()
     return response['main']['temp'], response['weather'][0]['description']
 
+def weather_report(city, temp, desc):
+    """Return what is said for the current weather in a city."""
+    return f"{city}: {temp}°C, {desc}."
+
 def get_weather(city):
-    """Fetch and announce weather asynchronously."""
+    """Fetch and announce weather asynchronously.
+
+    Uses the fetch already started by speculative dispatch for this city, if any.
+    """
     try:
-        future = executor.submit(fetch_weather, city)
+        future = take_speculation("weather", city) or executor.submit(fetch_weather, city)
         temp, desc = future.result()
-        speak(f"{city}: {temp}°C, {desc}.")
+        speak(weather_report(city, temp, desc))
         return {"temp": temp, "desc": desc}
     except Exception as e:
         logging.error(f"Weather API Error: {e}")
@@ -49,15 +60,45 @@ def get_forecast(city, days=5):
             daily_forecasts[date]['descriptions'].append(item['weather'][0]['description'])
         
         # Summarize the forecast for each day
-        speak(f"Weather forecast for {city}:")
+        lines = [f"Weather forecast for {city}:"]
         for date, data in daily_forecasts.items():
             avg_temp = sum(data['temps']) / len(data['temps'])
             # Get the most common description
             common_desc = max(set(data['descriptions']), key=data['descriptions'].count)
-            speak(f"{date}: Average {avg_temp:.1f}°C, {common_desc}")
+            lines.append(f"{date}: Average {avg_temp:.1f}°C, {common_desc}")
+        speak_many(lines, priority=PRIORITY_CHATTER)
             
         return daily_forecasts
     except Exception as e:
         logging.error(f"Forecast API Error: {e}")
         speak("Sorry, I couldn't fetch the forecast.")
-        return None
\ No newline at end of file
+        return None
+
+# "in" as a whole word, so the one inside "raining" or "Helsinki" is not taken for it
+CITY_PATTERN = re.compile(r"\bin\s+(\w[\w\s]*)$")
+
+def _city_slots(command):
+    """Return the city named after "in", or None to decline a command that names none."""
+    found = CITY_PATTERN.search(command.strip())
+    return {"city": found.group(1).strip()} if found else None
+
+def _forecast_slots(command):
+    """Return the city and days of a forecast command, or None if it names no city."""
+    slots = _city_slots(command)
+    return dict(slots, days=5) if slots else None
+
+def ask_weather(command):
+    """Ask which city a weather command without one is about, then report it."""
+    city = ask("Which city?")
+    if not city:
+        return
+    if "forecast" in command:
+        get_forecast(city)
+    else:
+        get_weather(city)
+
+# Intents routed here by commands.process_command
+register_intent("weather_forecast", [["weather", "forecast"]], get_forecast, _forecast_slots)
+register_intent("weather", ["weather"], get_weather, _city_slots)
+# Weather commands that named no city fall through to here
+register_intent("weather_city", ["weather"], ask_weather, lambda command: {"command": command}, priority=-1)
@@ -0,0 +1,164 @@
+"""
+Word error rate and latency benchmark for GrokVIS speech recognition engines.
+Runs each engine from grokvis.recognizer over a set of recorded command
+fixtures and reports, per engine:
+
+- word error rate against the reference transcripts
+- final latency: time from the last block of audio to the final transcript,
+  which is what the user waits for once they stop speaking
+- real-time factor: total decode time / audio duration
+
+Audio is fed to each session in microphone-sized blocks, as capture_utterance()
+does, but as fast as the engine takes it rather than at speaking pace.
+
+Fixtures are WAV files in one directory with a transcripts.tsv next to them
+(file name, tab, reference text). Record a set on the target microphone with
+--record, which prompts for each of a fixed list of commands.
+
+Usage:
+    python tests/benchmark_asr.py [--fixtures tests/fixtures/asr] [--engines vosk google] [--chunk 1024]
+    python tests/benchmark_asr.py --record [--fixtures tests/fixtures/asr]
+"""
+import argparse
+import re
+import sys
+import os
+import time
+import speech_recognition as sr
+
+# Add the parent directory to the path so we can import the grokvis package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from grokvis.recognizer import ENGINES
+
+TRANSCRIPTS = "transcripts.tsv"
+
+# Commands GrokVIS handles, read aloud when recording fixtures
+PROMPTS = [
+    "what's the weather in london",
+    "set a timer for five minutes",
+    "remind me to call mom at six pm",
+    "add milk to my shopping list",
+    "what's on my schedule today",
+    "tell me a joke",
+    "what's the cpu usage",
+    "read me the news headlines",
+    "take a note buy new headphones",
+    "who wrote pride and prejudice",
+    "turn on the living room lights",
+    "play some music",
+]
+
+
+def words(text):
+    """Lowercase words with punctuation removed, as compared for WER."""
+    return re.sub(r"[^a-z0-9' ]", " ", text.lower()).split()
+
+
+def word_errors(reference, hypothesis):
+    """Word-level edit distance (substitutions + deletions + insertions)."""
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_word in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hypothesis, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1]
+
+
+def load_fixtures(directory):
+    """Return [(path, reference text)] from the transcripts file."""
+    fixtures = []
+    with open(os.path.join(directory, TRANSCRIPTS), encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                name, text = line.rstrip("\n").split("\t", 1)
+                fixtures.append((os.path.join(directory, name), text))
+    return fixtures
+
+
+def record(directory):
+    """Prompt for each command and save the recordings with their transcripts."""
+    os.makedirs(directory, exist_ok=True)
+    recognizer = sr.Recognizer()
+    with open(os.path.join(directory, TRANSCRIPTS), "w", encoding="utf-8") as transcripts:
+        with sr.Microphone() as source:
+            recognizer.adjust_for_ambient_noise(source)
+            for i, prompt in enumerate(PROMPTS):
+                input(f"[{i + 1}/{len(PROMPTS)}] Press Enter, then say: \"{prompt}\"")
+                audio = recognizer.listen(source)
+                name = f"command_{i:02d}.wav"
+                with open(os.path.join(directory, name), "wb") as f:
+                    f.write(audio.get_wav_data())
+                transcripts.write(f"{name}\t{prompt}\n")
+    print(f"Recorded {len(PROMPTS)} fixtures in {directory}")
+
+
+def transcribe(engine, audio, chunk):
+    """Return (transcript, decode seconds, final latency seconds) for one fixture."""
+    data = audio.get_raw_data(convert_width=2)
+    block = chunk * 2
+    start = time.perf_counter()
+    session = engine.start(audio.sample_rate)
+    for offset in range(0, len(data), block):
+        session.accept(data[offset:offset + block])
+    fed = time.perf_counter()
+    try:
+        text = session.result(audio)
+    except sr.UnknownValueError:
+        text = ""
+    end = time.perf_counter()
+    return text, end - start, end - fed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", default=os.path.join(os.path.dirname(__file__), "fixtures", "asr"))
+    parser.add_argument("--engines", nargs="+", default=list(ENGINES), choices=list(ENGINES))
+    parser.add_argument("--chunk", type=int, default=1024, help="samples per block, as CaptureSource")
+    parser.add_argument("--record", action="store_true", help="record a fixture set and exit")
+    parser.add_argument("--verbose", action="store_true", help="print every transcript")
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.fixtures)
+        return
+
+    fixtures = load_fixtures(args.fixtures)
+    clips = []
+    for path, reference in fixtures:
+        with sr.AudioFile(path) as source:
+            clips.append((sr.Recognizer().record(source), reference))
+    audio_seconds = sum(len(audio.frame_data) / (audio.sample_rate * audio.sample_width) for audio, _ in clips)
+    print(f"{len(clips)} fixtures, {audio_seconds:.1f} s of audio")
+    print(f"{'engine':>8} {'WER':>7} {'final ms':>9} {'max ms':>8} {'RTF':>6}")
+
+    for name in args.engines:
+        try:
+            engine = ENGINES[name]()
+        except Exception as e:
+            print(f"{name:>8} failed to load: {e}")
+            continue
+        errors = reference_words = 0
+        decode_seconds = 0.0
+        latencies = []
+        for audio, reference in clips:
+            try:
+                text, decode, latency = transcribe(engine, audio, args.chunk)
+            except Exception as e:
+                print(f"{name:>8} failed: {e}")
+                break
+            expected = words(reference)
+            errors += word_errors(expected, words(text))
+            reference_words += len(expected)
+            decode_seconds += decode
+            latencies.append(latency)
+            if args.verbose:
+                print(f"{'':>8} {reference!r} -> {text!r}")
+        else:
+            print(f"{name:>8} {errors / reference_words:>7.1%} {sum(latencies) * 1000 / len(latencies):>9.0f} "
+                  f"{max(latencies) * 1000:>8.0f} {decode_seconds / audio_seconds:>6.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Micro-benchmark for the GrokVIS wake word frame path.
+Compares the original per-frame conversion, indata.flatten().astype(np.int16),
+with the ring buffer path (write a column view, read_into a reused array)
+on 512-sample frames, reporting time per frame and the peak bytes allocated
+while a frame is handled. A peak below the frame size means no frame data
+is copied into new arrays.
+
+Porcupine itself is not called, so this runs without an access key.
+
+Usage:
+    python tests/benchmark_audio_frames.py [--frames 100000] [--frame-length 512]
+"""
+import argparse
+import sys
+import os
+import time
+import tracemalloc
+import numpy as np
+
+# Add the parent directory to the path so we can import the grokvis package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from grokvis.audio_capture import AudioRingBuffer
+
+
+def original_path(frame_length):
+    """Return a per-frame step doing what the old audio_callback did before Porcupine."""
+    indata = np.zeros((frame_length, 1), dtype=np.int16)
+
+    def step():
+        return indata.flatten().astype(np.int16)
+    return step
+
+
+def ring_buffer_path(frame_length):
+    """Return a per-frame step through the ring buffer into a reused Porcupine array."""
+    indata = np.zeros((frame_length, 1), dtype=np.int16)
+    buffer = AudioRingBuffer(16000 * 30)
+    pcm = np.empty(frame_length, dtype=np.int16)
+    state = {"position": 0}
+
+    def step():
+        buffer.write(indata[:, 0])
+        state["position"] = buffer.read_into(pcm, state["position"])
+        return pcm
+    return step
+
+
+def measure(step, frames):
+    """Return (microseconds per frame, peak bytes allocated during a frame)."""
+    for _ in range(1000):
+        step()
+    start = time.perf_counter()
+    for _ in range(frames):
+        step()
+    micros = (time.perf_counter() - start) * 1e6 / frames
+
+    # Allocations freed within the frame still raise the peak
+    tracemalloc.start()
+    try:
+        base, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        for _ in range(min(frames, 1000)):
+            step()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return micros, peak - base
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=100000)
+    parser.add_argument("--frame-length", type=int, default=512)
+    args = parser.parse_args()
+
+    print(f"frame: {args.frame_length} samples, {args.frame_length * 2} bytes")
+    print(f"{'path':>12} {'us/frame':>10} {'peak alloc B':>13}")
+    for name, factory in (("original", original_path), ("ring buffer", ring_buffer_path)):
+        micros, peak = measure(factory(args.frame_length), args.frames)
+        print(f"{name:>12} {micros:>10.2f} {peak:>13}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Endpointing benchmark for GrokVIS command capture.
+Feeds the same synthetic commands (background noise, a few syllable-like
+bursts with short gaps, then background noise) through speech_recognition's
+Recognizer.listen() with its default pause timings and through the VAD
+endpointer, and reports for each:
+
+- dead air: audio captured after the last syllable ended, which is time the
+  user waits after speaking before recognition can finish
+- clipped: whether any speech was cut off
+
+Both read from an in-memory source, so results do not depend on the machine.
+
+Usage:
+    python tests/benchmark_endpointing.py [--commands 20] [--noise-db -55] [--hangover-ms 150 300 500]
+"""
+import argparse
+import io
+import sys
+import os
+import numpy as np
+import speech_recognition as sr
+
+# Add the parent directory to the path so we can import the grokvis package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from grokvis.vad import Endpointer, VoiceActivityDetector, record_utterance
+
+RATE = 16000
+
+
+class ArraySource(sr.AudioSource):
+    """An entered audio source that plays back an int16 array, then returns short reads."""
+
+    def __init__(self, samples, chunk=1024):
+        self.SAMPLE_RATE = RATE
+        self.SAMPLE_WIDTH = 2
+        self.CHUNK = chunk
+        self.stream = io.BytesIO(samples.astype("<i2").tobytes())
+        # BytesIO.read takes bytes; sources read in samples
+        read = self.stream.read
+        self.stream.read = lambda size: read(size * 2)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+def command(rng, noise_db):
+    """Return (samples, index where speech ends) for one synthetic command."""
+    noise = 10 ** (noise_db / 20)
+    parts = [rng.standard_normal(int(RATE * 1.0)) * noise]
+    for _ in range(rng.integers(3, 7)):
+        length = int(RATE * rng.uniform(0.12, 0.3))
+        t = np.arange(length) / RATE
+        envelope = np.sin(np.pi * np.arange(length) / length)
+        pitch = rng.uniform(100, 220)
+        voiced = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 5)) * 0.15 * envelope
+        parts.append(voiced + rng.standard_normal(length) * noise)
+        parts.append(rng.standard_normal(int(RATE * rng.uniform(0.05, 0.15))) * noise)
+    speech_end = sum(len(p) for p in parts[:-1])
+    parts[-1] = rng.standard_normal(int(RATE * 3.0)) * noise
+    samples = np.clip(np.concatenate(parts), -1, 1) * 32767
+    return samples.astype(np.int16), speech_end
+
+
+def dead_air(source, speech_end):
+    """Seconds of audio read after speech ended; negative means speech was clipped."""
+    # Capture stops at the last sample read; everything after speech_end up to there is dead air
+    return (source.stream.tell() // 2 - speech_end) / RATE
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--commands", type=int, default=20)
+    parser.add_argument("--noise-db", type=float, default=-55, help="background level in dBFS")
+    parser.add_argument("--hangover-ms", type=int, nargs="+", default=[150, 300, 500])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    commands = [command(rng, args.noise_db) for _ in range(args.commands)]
+    print(f"{'endpointer':>24} {'mean dead air ms':>17} {'max ms':>8} {'clipped':>8}")
+
+    recognizer = sr.Recognizer()
+    results = []
+    for samples, speech_end in commands:
+        source = ArraySource(samples)
+        recognizer.listen(source)
+        results.append(dead_air(source, speech_end))
+    report("Recognizer.listen", results)
+
+    for hangover in args.hangover_ms:
+        # One detector for all commands, as in the assistant
+        endpointer = Endpointer(RATE, VoiceActivityDetector(), hangover_ms=hangover)
+        results = []
+        for samples, speech_end in commands:
+            source = ArraySource(samples)
+            record_utterance(source, endpointer)
+            results.append(dead_air(source, speech_end))
+        report(f"VAD, {hangover} ms hangover", results)
+
+
+def report(name, results):
+    """Print one row of the results table."""
+    ms = [r * 1000 for r in results]
+    clipped = sum(1 for r in results if r < 0)
+    print(f"{name:>24} {np.mean(ms):>17.0f} {max(ms):>8.0f} {clipped:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Intent classifier benchmark for GrokVIS.
+Builds the fallback classifier from grokvis.intent_classifier.EXAMPLES with
+the real sentence embedding model and runs it over held-out paraphrases
+(none of them appear in the examples) and unrelated small talk, reporting
+for each threshold:
+
+- accuracy: paraphrases sent to the right intent
+- wrong: paraphrases sent to a different intent
+- false accepts: small talk sent to any intent instead of the default reply
+
+It also reports per-command latency, split into the model's forward pass and
+the prototype matrix product, at the median and 99th percentile. Every
+command is encoded without the embedding cache, so the numbers are for
+commands the assistant has not heard before.
+
+Usage:
+    python tests/benchmark_intent_classifier.py [--model all-MiniLM-L6-v2] [--thresholds 0.5 0.6 0.7] [--repeats 5]
+"""
+import argparse
+import sys
+import os
+import time
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+# Add the parent directory to the path so we can import the grokvis package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from grokvis.intent_classifier import EXAMPLES, MARGIN, IntentClassifier
+from grokvis.memory_index import normalize
+
+HELD_OUT = [
+    ("i could use a good laugh", "tell_joke"),
+    ("tell me something that'll make me smile", "tell_joke"),
+    ("give me an interesting piece of trivia", "random_fact"),
+    ("i want to learn something new", "random_fact"),
+    ("what are today's top stories", "news_headlines"),
+    ("anything important happen in the world today", "news_headlines"),
+    ("will it be sunny in madrid", "weather"),
+    ("should i bring a jacket in toronto", "weather"),
+    ("what notes have i taken", "show_notes"),
+    ("read back what i jotted down", "show_notes"),
+    ("what's on the grocery list", "show_shopping_list"),
+    ("what do i still have to buy at the store", "show_shopping_list"),
+    ("time how long this takes", "start_stopwatch"),
+    ("stop the clock", "stop_stopwatch"),
+    ("save an image of my screen", "take_screenshot"),
+    ("how much ram am i using", "system_status"),
+    ("is the processor busy", "system_status"),
+    ("do you have any updates", "check_for_updates"),
+    ("louder please", "volume"),
+    ("lower your voice", "volume"),
+    ("save this conversation for later", "remember_conversation"),
+]
+
+SMALL_TALK = [
+    "how are you today",
+    "what's your name",
+    "thank you very much",
+    "i had a long day at work",
+    "who won the game last night",
+    "what's the meaning of life",
+    "good morning",
+    "do you like pizza",
+]
+
+
+def percentiles(seconds):
+    """Return (median, p99) in milliseconds."""
+    ms = np.asarray(seconds) * 1000
+    return np.percentile(ms, 50), np.percentile(ms, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.5, 0.6, 0.7])
+    parser.add_argument("--repeats", type=int, default=5, help="timed passes over every command")
+    args = parser.parse_args()
+
+    model = SentenceTransformer(args.model)
+    start = time.perf_counter()
+    classifier = IntentClassifier(model.encode, EXAMPLES, model_name=args.model)
+    print(f"{sum(len(texts) for texts in EXAMPLES.values())} examples for {len(EXAMPLES)} intents "
+          f"embedded in {time.perf_counter() - start:.2f} s")
+
+    commands = [text for text, _ in HELD_OUT] + SMALL_TALK
+    queries = normalize(model.encode(commands))
+    scores = np.stack([np.maximum.reduceat(classifier.matrix @ query, classifier._starts) for query in queries])
+    best = scores.argmax(axis=1)
+    ordered = np.sort(scores, axis=1)
+    lead = ordered[:, -1] - ordered[:, -2]
+
+    print(f"{'threshold':>10} {'accuracy':>9} {'wrong':>6} {'false accepts':>14}")
+    for threshold in args.thresholds:
+        accepted = (scores.max(axis=1) >= threshold) & (lead >= MARGIN)
+        labels = [classifier.labels[i] if ok else None for i, ok in zip(best, accepted)]
+        right = sum(label == intent for label, (_, intent) in zip(labels, HELD_OUT))
+        wrong = sum(label is not None and label != intent for label, (_, intent) in zip(labels, HELD_OUT))
+        false_accepts = sum(label is not None for label in labels[len(HELD_OUT):])
+        print(f"{threshold:>10.2f} {right / len(HELD_OUT):>9.0%} {wrong:>6} {false_accepts:>8}/{len(SMALL_TALK)}")
+
+    encode_times, match_times = [], []
+    for _ in range(args.repeats):
+        for command in commands:
+            start = time.perf_counter()
+            query = normalize(model.encode([command]))[0]
+            encoded = time.perf_counter()
+            np.argmax(np.maximum.reduceat(classifier.matrix @ query, classifier._starts))
+            encode_times.append(encoded - start)
+            match_times.append(time.perf_counter() - encoded)
+    totals = [e + m for e, m in zip(encode_times, match_times)]
+    print(f"{'latency ms':>10} {'p50':>8} {'p99':>8}")
+    for name, times in (("encode", encode_times), ("matmul", match_times), ("total", totals)):
+        p50, p99 = percentiles(times)
+        print(f"{name:>10} {p50:>8.3f} {p99:>8.3f}")
+
+
+if __name__ == '__main__':
+    main()
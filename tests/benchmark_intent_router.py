@@ -0,0 +1,87 @@
+"""
+Intent routing benchmark for GrokVIS.
+Registers a growing number of synthetic intents and times routing a set of
+commands two ways:
+
+- chain: the original process_command() approach, testing each intent's
+  trigger phrases with `in` one intent after another until one matches
+- router: the compiled IntentRouter, which scans the command once
+
+Commands are drawn so that about half match an intent near the end of the
+registry or none at all, the cases where the chain does the most work.
+
+Usage:
+    python tests/benchmark_intent_router.py [--intents 40 200 1000] [--commands 2000]
+"""
+import argparse
+import random
+import sys
+import os
+import time
+
+# Add the parent directory to the path so we can import the grokvis package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from grokvis.intent_router import IntentRouter
+
+WORDS = ["turn", "show", "play", "open", "check", "set", "start", "stop", "add", "read", "the", "my",
+         "lights", "music", "notes", "timer", "weather", "news", "list", "volume", "screen", "door"]
+
+
+def synthetic_intents(count, rng):
+    """Return [(name, trigger)] with distinct trigger phrases, none containing another."""
+    seen = set()
+    intents = []
+    while len(intents) < count:
+        phrase = f"{rng.choice(WORDS)} {len(intents)} {rng.choice(WORDS)}"
+        if phrase not in seen:
+            seen.add(phrase)
+            intents.append((f"intent_{len(intents)}", phrase))
+    return intents
+
+
+def chain_route(intents, command):
+    """Test each intent in registration order, as the original elif chain did."""
+    for name, trigger in intents:
+        if trigger in command:
+            return name
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--intents", type=int, nargs="+", default=[40, 200, 1000])
+    parser.add_argument("--commands", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'intents':>8} {'chain us':>9} {'router us':>10} {'speedup':>8}")
+    for count in args.intents:
+        rng = random.Random(0)
+        intents = synthetic_intents(count, rng)
+        router = IntentRouter()
+        for name, trigger in intents:
+            router.register(name, [trigger], None)
+        commands = []
+        for _ in range(args.commands):
+            if rng.random() < 0.5:
+                # A late intent, or an unknown command
+                name, trigger = intents[rng.randrange(count * 3 // 4, count)]
+                commands.append(f"please {trigger} now" if rng.random() < 0.5 else "what time is it now")
+            else:
+                commands.append(f"please {rng.choice(intents)[1]} now")
+        router.route(commands[0])
+
+        start = time.perf_counter()
+        expected = [chain_route(intents, command) for command in commands]
+        chain = time.perf_counter() - start
+        start = time.perf_counter()
+        routed = [router.route(command)[0] for command in commands]
+        compiled = time.perf_counter() - start
+        # Synthetic triggers never contain one another, so both must agree
+        assert expected == [intent.name if intent else None for intent in routed]
+        print(f"{count:>8} {chain * 1e6 / len(commands):>9.1f} {compiled * 1e6 / len(commands):>10.1f} "
+              f"{chain / compiled:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark for GrokVIS memory recall.
+Compares the original per-row cosine scan with the exact MemoryIndex and
+the approximate IVFMemoryIndex at 1k, 10k and 100k stored memories.
+
+With --quantization it also reports, per storage format, the database size
+on disk, exact recall latency and top-1 agreement with float32.
+
+Usage:
+    python tests/benchmark_memory.py [--sizes 1000 10000 100000] [--skip-scan] [--quantization]
+"""
+import argparse
+import sqlite3
+import sys
+import os
+import tempfile
+import time
+import numpy as np
+
+# Add the parent directory to the path so we can import the grokvis package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from grokvis.memory_index import load_index, migrate_embeddings, IVFMemoryIndex, EMBEDDING_FORMATS
+
+DIM = 384  # all-MiniLM-L6-v2 embedding size
+QUERIES = 20
+
+
+def clustered(rng, rows, centers):
+    """Random embeddings grouped around topic centers, like real memories."""
+    labels = rng.integers(0, len(centers), rows)
+    return (centers[labels] + 0.5 * rng.standard_normal((rows, DIM))).astype(np.float32)
+
+
+def build_db(rows, centers, path=":memory:"):
+    """Create a memory table filled with random embeddings."""
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE memory (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT, "
+                 "command TEXT, response TEXT, embedding BLOB, embedding_format TEXT, "
+                 "session_id TEXT, turn INTEGER)")
+    vectors = clustered(np.random.default_rng(0), rows, centers)
+    conn.executemany("INSERT INTO memory (timestamp, command, response, embedding) VALUES (?, ?, ?, ?)",
+                     (("2025-01-01 00:00", f"command {i}", "Noted.", v.tobytes()) for i, v in enumerate(vectors)))
+    conn.commit()
+    return conn
+
+
+def scan_recall(conn, query, top_k=1):
+    """The original recall path: full SELECT plus one cosine_similarity per row."""
+    from sklearn.metrics.pairwise import cosine_similarity
+    results = []
+    for cmd, resp, emb_blob in conn.execute("SELECT command, response, embedding FROM memory"):
+        emb = np.frombuffer(emb_blob, dtype=np.float32)
+        results.append((cosine_similarity([query], [emb])[0][0], cmd, resp))
+    results.sort(reverse=True)
+    return results[:top_k]
+
+
+def time_ms(func, queries):
+    """Return the mean wall time of func over the queries in milliseconds."""
+    start = time.perf_counter()
+    for query in queries:
+        func(query)
+    return (time.perf_counter() - start) * 1000 / len(queries)
+
+
+def report_formats(rows, centers, queries):
+    """Print disk size, recall latency and top-1 agreement for each storage format."""
+    print(f"\n{rows} rows: {'format':>8} {'disk MB':>10} {'recall ms':>10} {'top-1 agree':>12}")
+    reference = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in EMBEDDING_FORMATS:
+            path = os.path.join(tmp, f"{fmt}.db")
+            conn = build_db(rows, centers, path)
+            migrate_embeddings(conn, fmt)
+            conn.execute("VACUUM")
+            disk_mb = os.path.getsize(path) / 2 ** 20
+            index = load_index(conn, "exact", storage=fmt)
+            recall_ms = time_ms(lambda q: index.search(q, 1), queries)
+            best = [index.search(q, 1)[0][1] for q in queries]
+            reference = reference or best
+            agree = sum(a == b for a, b in zip(best, reference)) / len(queries)
+            print(f"{'':>{len(str(rows)) + 6}} {fmt:>8} {disk_mb:>10.2f} {recall_ms:>10.3f} {agree:>12.2f}")
+            conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--skip-scan", action="store_true", help="skip the slow per-row baseline")
+    parser.add_argument("--quantization", action="store_true", help="compare float32, float16 and int8 storage")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    centers = rng.standard_normal((200, DIM))
+    queries = clustered(rng, QUERIES, centers)
+    print(f"{'rows':>8} {'load ms':>10} {'exact ms':>10} {'ivf ms':>10} {'recall@5':>10} {'scan ms':>10}")
+    for rows in args.sizes:
+        conn = build_db(rows, centers)
+        start = time.perf_counter()
+        index = load_index(conn, "exact")
+        load_ms = (time.perf_counter() - start) * 1000
+        exact_ms = time_ms(lambda q: index.search(q, 5), queries)
+
+        ivf = IVFMemoryIndex(exact_threshold=10 ** 9)
+        ivf.add(index._ids[:len(index)], index._matrix[:len(index)])
+        ivf.exact_threshold = 0
+        ivf.train()
+        ivf_ms = time_ms(lambda q: ivf.search(q, 5), queries)
+        agree = sum(len({i for _, i in index.search(q, 5)} & {i for _, i in ivf.search(q, 5)}) for q in queries)
+
+        scan_ms = "-" if args.skip_scan else f"{time_ms(lambda q: scan_recall(conn, q), queries[:3]):.2f}"
+        print(f"{rows:>8} {load_ms:>10.1f} {exact_ms:>10.3f} {ivf_ms:>10.3f} {agree / (5 * QUERIES):>10.2f} {scan_ms:>10}")
+        conn.close()
+
+    if args.quantization:
+        for rows in args.sizes:
+            report_formats(rows, centers, queries)
+
+
+if __name__ == '__main__':
+    main()
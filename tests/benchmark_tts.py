@@ -0,0 +1,102 @@
+"""
+Benchmark for GrokVIS list-style speech.
+Compares reading a 10-item list one line at a time, as show_notes and
+list_events used to (a separate speak() per line, each waiting for its audio
+to finish), with the speak_many path, which synthesizes line N+1 while line N
+plays. For each path it reports:
+
+- first audio: seconds from the call until the first sample is written
+- total: wall time until the whole list has been played
+
+By default the output device is replaced by a stream whose writes take as
+long as the audio would to play, so no sound card is needed. With --play the
+audio goes to the real output device. Each run uses an empty audio cache.
+
+Usage:
+    python tests/benchmark_tts.py [--items 10] [--repeats 3] [--play]
+"""
+import argparse
+import sys
+import os
+import tempfile
+import time
+
+# Add the parent directory to the path so we can import the grokvis package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from grokvis import tts_manager
+from grokvis.tts_cache import AudioCache
+
+
+class SimulatedStream:
+    """Stands in for the output stream; a write blocks for the duration of the audio."""
+
+    latency = 0.0
+
+    def __init__(self, sample_rate):
+        self.samplerate = sample_rate
+
+    def write(self, audio):
+        time.sleep(len(audio) / self.samplerate)
+
+    def abort(self):
+        pass
+
+    def start(self):
+        pass
+
+
+def list_lines(items, run):
+    """A shopping-list style reply; run makes the text unique so nothing is cached."""
+    return [f"Here's your list number {run}:"] + [f"{i + 1}. Item {i + 1} of list {run}." for i in range(items)]
+
+
+def per_line(lines):
+    """The original path: one utterance per line."""
+    for line in lines:
+        tts_manager.speak(line)
+
+
+def pipelined(lines):
+    """The speak_many path: one chunk stream for the whole list."""
+    tts_manager.speak_many(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--play", action="store_true", help="play the audio through the output device")
+    args = parser.parse_args()
+
+    # Record when the first sample of a run is about to be written
+    first_write = []
+    open_stream = tts_manager.get_output_stream if args.play else SimulatedStream
+
+    def get_output_stream(sample_rate):
+        if not first_write:
+            first_write.append(time.perf_counter())
+        return open_stream(sample_rate)
+
+    tts_manager.get_output_stream = get_output_stream
+
+    # Load and warm up the model outside the timed runs
+    tts_manager.synthesize("Ready.")
+    print(f"{'path':>10} {'first audio s':>14} {'total s':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, func in (("per-line", per_line), ("pipelined", pipelined)):
+            first = total = 0.0
+            for run in range(args.repeats):
+                tts_manager._audio_cache = AudioCache(os.path.join(tmp, f"{name}-{run}"))
+                lines = list_lines(args.items, run)
+                first_write.clear()
+                start = time.perf_counter()
+                func(lines)
+                total += time.perf_counter() - start
+                first += first_write[0] - start
+            print(f"{name:>10} {first / args.repeats:>14.2f} {total / args.repeats:>8.2f}")
+    tts_manager.close_output_stream()
+
+
+if __name__ == '__main__':
+    main()
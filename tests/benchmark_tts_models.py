@@ -0,0 +1,182 @@
+"""
+Real-time-factor benchmark for GrokVIS TTS models.
+Runs every candidate TTS configuration from HardwareManager.get_tts_candidates()
+on a fixed corpus of GrokVIS responses and records, per configuration:
+
+- load time
+- time to first sample: synthesis time of the first sentence of each reply,
+  which is what the streaming speak path waits for before audio starts
+- real-time factor: synthesis time / audio duration (below 1.0 keeps up)
+- peak RSS of the process that loaded the model
+- real-time factor at 1, 2, 4, ... torch threads (CPU configurations only)
+
+Each configuration runs in its own process so peak RSS is per model. The
+results are written as JSON to the path HardwareManager reads when choosing
+a TTS model, so a run on a machine replaces the VRAM heuristic there.
+
+Usage:
+    python tests/benchmark_tts_models.py [--output models/voice/tts_benchmark.json] [--models NAME ...] [--no-threads]
+"""
+import argparse
+import datetime
+import json
+import multiprocessing
+import queue
+import sys
+import os
+import threading
+import time
+
+# Add the parent directory to the path so we can import the grokvis package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from grokvis.hardware_manager import get_hardware_manager, TTS_BENCHMARK_PATH
+
+# Typical replies; kept fixed so runs on different machines are comparable
+CORPUS = [
+    "Hello! What persona would you like to use? You can choose Alfred, Beatrice, or any other available persona.",
+    "Greetings, I'm Alfred, your loyal assistant.",
+    "Scheduled: dentist appointment at 14:30.",
+    "London: 12°C, light rain.",
+    "Timer set for 5 minutes.",
+    "Here are your scheduled events: 2025-01-01 09:00: Reminder: stand-up meeting now.",
+    "CPU usage is at 23 percent. Memory usage is at 61 percent. Disk usage is at 48 percent.",
+    "Sorry, I didn't catch that. Please repeat your command.",
+    "Task completed with the efficiency you've come to expect.",
+    "Shutting down. Stay legendary.",
+]
+
+# Replies timed at each thread count; the full corpus would take too long
+THREAD_CORPUS = CORPUS[:3]
+
+
+class PeakRSS:
+    """Samples the resident set size of this process on a background thread."""
+
+    def __init__(self, interval=0.05):
+        import psutil
+        self.process = psutil.Process()
+        self.interval = interval
+        self.peak = self.process.memory_info().rss
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._done.wait(self.interval):
+            self.peak = max(self.peak, self.process.memory_info().rss)
+
+    def stop(self):
+        """Stop sampling and return the peak in megabytes."""
+        self._done.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.process.memory_info().rss)
+        return self.peak / 2 ** 20
+
+
+def synthesis_time(tts, text):
+    """Return (seconds to synthesize text, seconds of audio produced)."""
+    start = time.perf_counter()
+    audio = tts.tts(text=text)
+    return time.perf_counter() - start, len(audio) / tts.sample_rate
+
+
+def real_time_factor(tts, texts):
+    """Synthesis time divided by audio duration over the texts."""
+    timings = [synthesis_time(tts, text) for text in texts]
+    return sum(t for t, _ in timings) / sum(d for _, d in timings)
+
+
+def benchmark_config(config, thread_counts, results):
+    """Measure one configuration; runs in a child process and puts a dict on results."""
+    entry = {"model_name": config["model_name"], "gpu": config["gpu"]}
+    try:
+        import torch
+        from TTS.api import TTS
+        from grokvis.tts_manager import split_sentences
+
+        rss = PeakRSS()
+        start = time.perf_counter()
+        tts = TTS(**config)
+        entry["load_seconds"] = time.perf_counter() - start
+
+        # The first inference pays one-off warmup costs that a running assistant does not
+        tts.tts(text="Warming up.")
+
+        first_sample = [synthesis_time(tts, split_sentences(reply)[0])[0] for reply in CORPUS]
+        entry["time_to_first_sample"] = sum(first_sample) / len(first_sample)
+        entry["max_time_to_first_sample"] = max(first_sample)
+        entry["real_time_factor"] = real_time_factor(tts, CORPUS)
+        entry["peak_rss_mb"] = rss.stop()
+
+        if not config["gpu"]:
+            entry["threads"] = {}
+            for count in thread_counts:
+                torch.set_num_threads(count)
+                entry["threads"][str(count)] = real_time_factor(tts, THREAD_CORPUS)
+    except Exception as e:
+        entry["error"] = str(e)
+    results.put(entry)
+
+
+def default_thread_counts():
+    """Powers of two up to the number of logical CPUs, plus that number itself."""
+    cpus = os.cpu_count() or 1
+    counts = []
+    count = 1
+    while count < cpus:
+        counts.append(count)
+        count *= 2
+    return counts + [cpus]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default=TTS_BENCHMARK_PATH)
+    parser.add_argument("--models", nargs="+", help="only benchmark these model names")
+    parser.add_argument("--no-threads", action="store_true", help="skip the thread scaling runs")
+    parser.add_argument("--timeout", type=float, default=1800, help="seconds allowed per configuration")
+    args = parser.parse_args()
+
+    hw_manager = get_hardware_manager()
+    configs = [config for config in hw_manager.get_tts_candidates()
+               if not args.models or config["model_name"] in args.models]
+    thread_counts = [] if args.no_threads else default_thread_counts()
+
+    # spawn keeps each child's RSS free of anything the parent loaded
+    context = multiprocessing.get_context("spawn")
+    entries = []
+    print(f"{'model':>40} {'gpu':>5} {'load s':>8} {'TTFS ms':>9} {'RTF':>6} {'RSS MB':>8}")
+    for config in configs:
+        results = context.Queue()
+        child = context.Process(target=benchmark_config, args=(config, thread_counts, results))
+        child.start()
+        try:
+            entry = results.get(timeout=args.timeout)
+        except queue.Empty:
+            child.terminate()
+            entry = {"model_name": config["model_name"], "gpu": config["gpu"], "error": "timed out or crashed"}
+        child.join()
+        entries.append(entry)
+        if "error" in entry:
+            print(f"{config['model_name']:>40} {str(config['gpu']):>5} failed: {entry['error']}")
+            continue
+        print(f"{entry['model_name']:>40} {str(entry['gpu']):>5} {entry['load_seconds']:>8.1f} "
+              f"{entry['time_to_first_sample'] * 1000:>9.0f} {entry['real_time_factor']:>6.2f} "
+              f"{entry['peak_rss_mb']:>8.0f}")
+        for count, rtf in entry.get("threads", {}).items():
+            print(f"{'':>40} {'':>5} {count + ' threads':>18} RTF {rtf:.2f}")
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump({
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "hardware": hw_manager.get_fingerprint(),
+            "corpus_size": len(CORPUS),
+            "results": entries,
+        }, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
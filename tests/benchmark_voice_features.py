@@ -0,0 +1,77 @@
+"""
+Latency benchmark for GrokVIS speaker verification features.
+Compares the original path (write temp.wav, librosa.load(sr=None),
+librosa.feature.mfcc) with the in-memory MFCCExtractor working on
+audio.get_raw_data(), for command-length utterances.
+
+Usage:
+    python tests/benchmark_voice_features.py [--seconds 1 3 6] [--rate 16000] [--repeats 20]
+"""
+import argparse
+import sys
+import os
+import tempfile
+import time
+import numpy as np
+import librosa
+import speech_recognition as sr
+
+# Add the parent directory to the path so we can import the grokvis package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from grokvis.voice_features import MFCCExtractor, MFCC_SAMPLE_RATE
+
+
+def utterance(seconds, rate):
+    """A speech-like test signal: a few harmonics under noise, as captured int16 audio."""
+    t = np.arange(int(seconds * rate)) / rate
+    signal = sum(np.sin(2 * np.pi * f * t) / (i + 1) for i, f in enumerate((140, 280, 420, 1100)))
+    signal = 0.2 * signal + 0.02 * np.random.default_rng(0).standard_normal(len(t))
+    pcm = (np.clip(signal, -1, 1) * 32767).astype(np.int16)
+    return sr.AudioData(pcm.tobytes(), rate, 2)
+
+
+def temp_wav_path(audio, path):
+    """The original listen() path."""
+    with open(path, "wb") as f:
+        f.write(audio.get_wav_data())
+    y, rate = librosa.load(path, sr=None)
+    return np.mean(librosa.feature.mfcc(y=y, sr=rate, n_mfcc=13).T, axis=0)
+
+
+def in_memory_path(audio, extractor):
+    """The new listen() path."""
+    return extractor.features_from_pcm(audio.get_raw_data(convert_rate=MFCC_SAMPLE_RATE, convert_width=2))
+
+
+def time_ms(func, repeats):
+    """Mean wall time of func in milliseconds, after one warmup call."""
+    func()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - start) * 1000 / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, nargs="+", default=[1, 3, 6])
+    parser.add_argument("--rate", type=int, default=MFCC_SAMPLE_RATE, help="capture rate of the utterance")
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    extractor = MFCCExtractor()
+    print(f"extractor setup: {(time.perf_counter() - start) * 1000:.1f} ms (once per process)")
+    print(f"{'seconds':>8} {'temp.wav ms':>12} {'in-memory ms':>13} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "temp.wav")
+        for seconds in args.seconds:
+            audio = utterance(seconds, args.rate)
+            old_ms = time_ms(lambda: temp_wav_path(audio, path), args.repeats)
+            new_ms = time_ms(lambda: in_memory_path(audio, extractor), args.repeats)
+            print(f"{seconds:>8} {old_ms:>12.2f} {new_ms:>13.2f} {old_ms / new_ms:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -38,6 +38,193 @@ class TestCore(unittest.TestCase):
             self.assertTrue(True)
         except ImportError as e:
             self.fail(f"Failed to import module: {e}")
-            
+
+
+class TestIntentRouter(unittest.TestCase):
+    """Test cases for routing commands through the compiled intent registry."""
+
+    def router(self):
+        from grokvis.intent_router import IntentRouter
+        router = IntentRouter()
+        router.register("launch_application", ["open", "launch", "start"], None,
+                        lambda command: {"app": command.split(" ", 1)[1]} if " " in command else None)
+        router.register("restart_computer", [["restart", "computer"]], None)
+        router.register("start_timer", ["start a timer for"], None,
+                        lambda command: {"duration": command.split("start a timer for")[1].strip()})
+        router.register("weather_forecast", [["weather", "forecast"]], None)
+        router.register("weather", ["weather"], None)
+        router.register("tell_joke", ["joke"], None)
+        router.register("quit", ["quit", "exit", "shutdown"], None, priority=-1)
+        router.register("shutdown_computer", [["shutdown", "computer"]], None)
+        return router
+
+    def route(self, router, command):
+        intent, slots = router.route(command)
+        return (intent.name, slots) if intent else (None, None)
+
+    def test_specific_trigger_wins(self):
+        """Test that the most specific trigger wins regardless of registration order."""
+        router = self.router()
+        self.assertEqual(self.route(router, "start a timer for 5 minutes"), ("start_timer", {"duration": "5 minutes"}))
+        self.assertEqual(self.route(router, "start notepad"), ("launch_application", {"app": "notepad"}))
+        self.assertEqual(self.route(router, "what's the weather forecast"), ("weather_forecast", {}))
+        self.assertEqual(self.route(router, "what's the weather"), ("weather", {}))
+
+    def test_word_boundaries(self):
+        """Test that triggers only match at the start of a word."""
+        router = self.router()
+        self.assertEqual(self.route(router, "restart computer")[0], "restart_computer")
+        self.assertEqual(self.route(router, "tell me some jokes")[0], "tell_joke")
+        self.assertEqual(self.route(router, "reopen the file"), (None, None))
+
+    def test_priority_and_declined_slots(self):
+        """Test that low-priority intents yield and that declined slots fall through to the next candidate."""
+        router = self.router()
+        self.assertEqual(self.route(router, "shutdown computer")[0], "shutdown_computer")
+        self.assertEqual(self.route(router, "shutdown")[0], "quit")
+        # "open" alone has no application to launch
+        self.assertEqual(self.route(router, "open"), (None, None))
+        router.register("open_file", [["open", "file"]], None, priority=1)
+        self.assertEqual(self.route(router, "open the file")[0], "open_file")
+
+    def test_feature_slots_decline_missing_values(self):
+        """Test that weather and schedule slots parse at word boundaries and leave missing values to be asked for."""
+        from grokvis.weather import _city_slots
+        from grokvis.scheduler import parse_event
+        self.assertEqual(_city_slots("what's the weather in helsinki"), {"city": "helsinki"})
+        self.assertEqual(_city_slots("weather in berlin"), {"city": "berlin"})
+        self.assertIsNone(_city_slots("is it going to rain"))
+        self.assertEqual(parse_event("remind me to call mom at 6:30 p.m."), ("call mom", "18:30"))
+        self.assertEqual(parse_event("schedule a meeting"), ("a meeting", None))
+        self.assertEqual(parse_event("schedule"), ("", None))
+
+    def test_matcher_agrees_with_scan(self):
+        """Test that the Aho-Corasick matcher finds the same phrases as a word-start substring scan."""
+        import random
+        import re
+        from grokvis.intent_router import PhraseMatcher
+        rng = random.Random(0)
+        words = ["a", "an", "and", "start", "restart", "art", "star", "the", "then", "he", "her"]
+        phrases = words + ["start a", "the art", "and the"]
+        matcher = PhraseMatcher(phrases)
+        for _ in range(200):
+            text = " ".join(rng.choice(words) for _ in range(rng.randint(1, 8)))
+            expected = {}
+            for phrase in phrases:
+                found = re.search(r"(?<![a-z0-9])" + re.escape(phrase), text)
+                if found:
+                    expected[phrase] = found.start()
+            self.assertEqual(matcher.find(text), expected, text)
+
+
+class WordEncoder:
+    """Bag-of-words stand-in for the sentence embedding model that counts the texts it encodes."""
+
+    def __init__(self):
+        self.texts = 0
+
+    def encode(self, texts):
+        import zlib
+        import numpy as np
+        self.texts += len(texts)
+        vectors = np.zeros((len(texts), 256), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                vectors[row, zlib.crc32(word.encode("utf-8")) % 256] += 1
+        return vectors
+
+
+class TestIntentClassifier(unittest.TestCase):
+    """Test cases for the embedding fallback behind the intent router."""
+
+    EXAMPLES = {
+        "tell_joke": ["make me laugh", "say something funny", "cheer me up"],
+        "weather": ["is it going to rain in london", "how hot is it outside", "do i need an umbrella"],
+        "show_notes": ["read my notes", "what did i write down", "list my saved notes"],
+    }
+    HELD_OUT = [
+        ("please make me laugh", "tell_joke"),
+        ("say something funny now", "tell_joke"),
+        ("is it going to rain today", "weather"),
+        ("do i need an umbrella tomorrow", "weather"),
+        ("read my saved notes", "show_notes"),
+        ("what did i write down yesterday", "show_notes"),
+    ]
+
+    def classifier(self, encoder, path=None, examples=None):
+        from grokvis.intent_classifier import IntentClassifier
+        return IntentClassifier(encoder.encode, examples or self.EXAMPLES, path, "words", threshold=0.5, margin=0.05)
+
+    def test_accuracy_and_latency(self):
+        """Test held-out paraphrase accuracy and p99 classification latency, and report both."""
+        classifier = self.classifier(WordEncoder())
+        for _ in range(20):
+            correct = sum(classifier.classify(text)[0] == intent for text, intent in self.HELD_OUT)
+        accuracy = correct / len(self.HELD_OUT)
+        stats = classifier.stats()
+        report = f"accuracy {accuracy:.0%}, p99 {stats['p99_ms']:.3f} ms over {stats['queries']} queries"
+        self.assertEqual(accuracy, 1.0, report)
+        self.assertLess(stats["p99_ms"], 5.0, report)
+
+    def test_unrelated_and_ambiguous_rejected(self):
+        """Test that commands unlike every example, or equally like two intents, get no intent."""
+        classifier = self.classifier(WordEncoder())
+        self.assertIsNone(classifier.classify("what's your favourite colour")[0])
+        # Two words each from "make me laugh" and "read my notes"
+        self.assertIsNone(classifier.classify("make laugh read notes")[0])
+
+    def test_prototypes_cached_on_disk(self):
+        """Test that the examples are embedded once and re-embedded only when they change."""
+        import tempfile
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "intents", "prototypes.npz")
+            encoder = WordEncoder()
+            first = self.classifier(encoder, path)
+            embedded = encoder.texts
+            second = self.classifier(encoder, path)
+            self.assertEqual(encoder.texts, embedded)
+            self.assertTrue((first.matrix == second.matrix).all())
+            changed = dict(self.EXAMPLES, tell_joke=["make me laugh"])
+            self.classifier(encoder, path, changed)
+            self.assertEqual(encoder.texts, embedded * 2 - 2)
+
+    def test_fallback_uses_router_slots(self):
+        """Test that classified commands get the router's handler and slots, and unparseable ones are declined."""
+        from unittest import mock
+        from grokvis import intent_classifier
+        from grokvis.intent_router import IntentRouter
+        router = IntentRouter()
+        router.register("tell_joke", ["tell me a joke"], None)
+        router.register("weather", ["weather"], None, lambda command: {"city": command.split(" in ")[1]})
+        with mock.patch.object(intent_classifier, "_classifier", self.classifier(WordEncoder())), \
+                mock.patch("grokvis.intent_router.get_router", return_value=router):
+            intent, slots = intent_classifier.classify_command("please make me laugh")
+            self.assertEqual((intent.name, slots), ("tell_joke", {}))
+            intent, slots = intent_classifier.classify_command("is it going to rain in paris")
+            self.assertEqual((intent.name, slots), ("weather", {"city": "paris"}))
+            # The weather extractor needs " in "
+            self.assertEqual(intent_classifier.classify_command("do i need an umbrella today"), (None, None))
+            # show_notes has examples but no registered intent
+            self.assertEqual(intent_classifier.classify_command("read my notes"), (None, None))
+
+    def test_weather_paraphrase_without_city_declined(self):
+        """Test that a weather paraphrase naming no city is declined without prompting on stdin."""
+        from unittest import mock
+        from grokvis import intent_classifier
+        from grokvis.intent_router import IntentRouter
+        from grokvis.weather import _city_slots
+        router = IntentRouter()
+        router.register("weather", ["weather"], None, _city_slots)
+        classifier = self.classifier(WordEncoder())
+        self.assertEqual(classifier.classify("is it cold outside")[0], "weather")
+        with mock.patch.object(intent_classifier, "_classifier", classifier), \
+                mock.patch("grokvis.intent_router.get_router", return_value=router), \
+                mock.patch("builtins.input", side_effect=AssertionError("read from stdin")):
+            self.assertEqual(intent_classifier.classify_command("is it cold outside"), (None, None))
+            self.assertEqual(intent_classifier.classify_command("is it going to rain"), (None, None))
+            intent, slots = intent_classifier.classify_command("is it going to rain in paris")
+            self.assertEqual((intent.name, slots), ("weather", {"city": "paris"}))
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -4,6 +4,9 @@ Test hardware detection functionality.
 import sys
 import os
 import unittest
+import json
+import tempfile
+from unittest import mock
 
 # Add the parent directory to the path so we can import the grokvis package
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -41,5 +44,44 @@ class TestHardwareDetection(unittest.TestCase):
         
         print(f"\nTTS Configuration: {tts_config}")
 
+    def test_tts_tiers(self):
+        """Test that TTS tiers start with the hardware config and end with a faster model."""
+        hw_manager = get_hardware_manager()
+        quality = {'model_name': "tts_models/en/ljspeech/tacotron2-DDC", 'progress_bar': False, 'gpu': True}
+        # Fixed configs, so the result does not depend on this machine's hardware or benchmark file
+        with mock.patch.object(hw_manager, 'get_tts_config', return_value=quality):
+            tiers = hw_manager.get_tts_tiers()
+        self.assertEqual(tiers[0], ("quality", quality))
+        self.assertEqual(tiers[-1], ("fast", dict(quality, model_name="tts_models/en/ljspeech/vits")))
+
+        # A quality model that is already the fast one leaves a single tier
+        with mock.patch.object(hw_manager, 'get_tts_config', return_value=tiers[-1][1]):
+            self.assertEqual([name for name, _ in hw_manager.get_tts_tiers()], ["quality"])
+
+    def test_benchmarked_tts_model(self):
+        """Test that benchmark results pick the preferred model that keeps up with real time."""
+        hw_manager = get_hardware_manager()
+        results = {
+            "hardware": hw_manager.get_fingerprint(),
+            "results": [
+                {"model_name": "tts_models/en/ljspeech/glow-tts", "gpu": False, "real_time_factor": 0.9},
+                {"model_name": "tts_models/en/ljspeech/tacotron2-DDC", "gpu": False, "real_time_factor": 0.4},
+                {"model_name": "tts_models/en/ljspeech/vits", "gpu": False, "real_time_factor": 0.2},
+            ],
+        }
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "tts_benchmark.json")
+            with open(path, "w") as f:
+                json.dump(results, f)
+            self.assertEqual(hw_manager.get_benchmarked_tts_model(False, path), "tts_models/en/ljspeech/tacotron2-DDC")
+            self.assertIsNone(hw_manager.get_benchmarked_tts_model(True, path))
+
+            # Results recorded on other hardware are ignored
+            results["hardware"] = dict(results["hardware"], cpu="Some other CPU")
+            with open(path, "w") as f:
+                json.dump(results, f)
+            self.assertIsNone(hw_manager.get_benchmarked_tts_model(False, path))
+            self.assertIsNone(hw_manager.get_benchmarked_tts_model(False, os.path.join(tmp, "missing.json")))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,437 @@
+"""
+Tests for the memory embedding index of Grok-VIS.
+"""
+import unittest
+import sqlite3
+import tempfile
+import sys
+import os
+import numpy as np
+
+# Add the parent directory to the path so we can import the grokvis package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from grokvis.memory_index import MemoryIndex, IVFMemoryIndex, load_index, normalize
+from grokvis.memory_index import encode_embedding, decode_embeddings, migrate_embeddings
+from grokvis.memory_index import create_fts, fts_query, lexical_candidates
+from grokvis.embedding_cache import EmbeddingCache
+from grokvis.memory_writer import MemoryWriter, connect
+from grokvis import memory_compaction
+
+class TestMemoryIndex(unittest.TestCase):
+    """Test cases for the exact memory index."""
+
+    def setUp(self):
+        """Set up a batch of random embeddings."""
+        rng = np.random.default_rng(42)
+        self.vectors = rng.standard_normal((500, 32)).astype(np.float32)
+        self.queries = rng.standard_normal((10, 32)).astype(np.float32)
+
+    def brute_force(self, query, top_k):
+        """Reference cosine ranking."""
+        scores = normalize(self.vectors) @ normalize(query)
+        return list(np.argsort(scores)[::-1][:top_k])
+
+    def test_search_matches_brute_force(self):
+        """Top-k ids match a full cosine sort."""
+        index = MemoryIndex()
+        index.add(np.arange(len(self.vectors)), self.vectors)
+        for query in self.queries:
+            hits = index.search(query, 5)
+            self.assertEqual([row_id for _, row_id in hits], self.brute_force(query, 5))
+
+    def test_incremental_add(self):
+        """Rows added one at a time are searchable and grow the index."""
+        index = MemoryIndex(capacity=2)
+        for row_id, vector in enumerate(self.vectors[:50]):
+            index.add([row_id], [vector])
+        self.assertEqual(len(index), 50)
+        score, row_id = index.search(self.vectors[17], 1)[0]
+        self.assertEqual(row_id, 17)
+        self.assertAlmostEqual(score, 1.0, places=5)
+
+    def test_empty_index(self):
+        """Searching an empty index returns nothing."""
+        self.assertEqual(MemoryIndex().search(self.queries[0], 3), [])
+
+    def test_load_index(self):
+        """load_index reads every embedding from the memory table."""
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE TABLE memory (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT, "
+                     "command TEXT, response TEXT, embedding BLOB, embedding_format TEXT, "
+                     "session_id TEXT, turn INTEGER)")
+        conn.executemany("INSERT INTO memory (command, response, embedding) VALUES (?, ?, ?)",
+                         [(f"c{i}", "Noted.", v.tobytes()) for i, v in enumerate(self.vectors[:20])])
+        index = load_index(conn)
+        self.assertEqual(len(index), 20)
+        self.assertEqual(index.search(self.vectors[3], 1)[0][1], 4)  # ids start at 1
+
+class TestIVFMemoryIndex(unittest.TestCase):
+    """Test cases for the approximate IVF memory index."""
+
+    def setUp(self):
+        """Set up clustered embeddings, which is how real memories are distributed."""
+        rng = np.random.default_rng(7)
+        centers = rng.standard_normal((40, 64))
+        labels = rng.integers(0, 40, 8000)
+        self.vectors = (centers[labels] + 0.35 * rng.standard_normal((8000, 64))).astype(np.float32)
+        self.queries = (centers[rng.integers(0, 40, 50)] + 0.35 * rng.standard_normal((50, 64))).astype(np.float32)
+
+    def build(self, **kwargs):
+        """Build and synchronously train an IVF index over the test vectors."""
+        index = IVFMemoryIndex(exact_threshold=10 ** 9, **kwargs)
+        index.add(np.arange(len(self.vectors)), self.vectors)
+        index.exact_threshold = 0
+        index.train()
+        return index
+
+    def test_recall_against_exact(self):
+        """IVF top-10 results agree with exact search at least 90% of the time."""
+        exact = MemoryIndex()
+        exact.add(np.arange(len(self.vectors)), self.vectors)
+        ivf = self.build()
+        found = total = 0
+        for query in self.queries:
+            truth = {row_id for _, row_id in exact.search(query, 10)}
+            approx = {row_id for _, row_id in ivf.search(query, 10)}
+            found += len(truth & approx)
+            total += len(truth)
+        recall = found / total
+        self.assertGreaterEqual(recall, 0.9, f"IVF recall@10 vs exact: {recall:.3f}")
+
+    def test_exact_fallback_for_small_tables(self):
+        """Below the threshold the IVF index answers exactly."""
+        index = IVFMemoryIndex()
+        index.add(np.arange(100), self.vectors[:100])
+        self.assertIsNone(index.centroids)
+        self.assertEqual(index.search(self.vectors[5], 1)[0][1], 5)
+
+    def test_incremental_add_after_training(self):
+        """Rows added after training are assigned to a list and found."""
+        index = self.build()
+        index.add([10 ** 6], [self.vectors[3]])
+        self.assertIn(10 ** 6, [row_id for _, row_id in index.search(self.vectors[3], 2)])
+
+    def test_lists_follow_removes_and_retraining(self):
+        """Each list holds exactly the rows assigned to it after removes, adds and a retrain."""
+        index = self.build()
+        removed = np.arange(0, len(self.vectors), 3)
+        index.remove(removed)
+        index.add([10 ** 6], [self.vectors[0]])
+        for retrain in (False, True):
+            if retrain:
+                index.train()
+            positions = np.concatenate([index._list_rows([lst]) for lst in range(len(index.centroids))])
+            self.assertEqual(sorted(positions), list(range(len(index))))
+            for lst in range(len(index.centroids)):
+                self.assertTrue((index._assign[index._list_rows([lst])] == lst).all())
+            found = [row_id for _, row_id in index.search(self.vectors[0], 1)]
+            self.assertEqual(found, [10 ** 6])
+            self.assertNotIn(3, [row_id for _, row_id in index.search(self.vectors[3], 5)])
+
+    def test_persistence(self):
+        """Centroids saved next to the database are restored on load."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "memory.ivf.npz")
+            trained = self.build(path=path)
+            trained.save(path)
+            restored = IVFMemoryIndex()
+            self.assertTrue(restored.restore(path))
+            np.testing.assert_array_equal(restored.centroids, trained.centroids)
+
+class TestQuantizedStorage(unittest.TestCase):
+    """Test cases for float16 and int8 embedding storage."""
+
+    def setUp(self):
+        """Set up MiniLM-sized random embeddings."""
+        rng = np.random.default_rng(3)
+        self.vectors = rng.standard_normal((300, 384)).astype(np.float32)
+        self.queries = self.vectors[:40] + 0.3 * rng.standard_normal((40, 384)).astype(np.float32)
+
+    def test_round_trip(self):
+        """Quantized BLOBs decode to nearly the same direction and are smaller."""
+        for fmt, size in (("float16", 768), ("int8", 388)):
+            blob = encode_embedding(self.vectors[0], fmt)
+            self.assertEqual(len(blob), size)
+            decoded = decode_embeddings([blob], fmt)[0]
+            cosine = float(normalize(decoded) @ normalize(self.vectors[0]))
+            self.assertGreater(cosine, 0.999)
+
+    def test_top1_agreement(self):
+        """Quantized indexes return the same best match as float32."""
+        exact = MemoryIndex()
+        exact.add(np.arange(300), self.vectors)
+        for fmt in ("float16", "int8"):
+            index = MemoryIndex(storage=fmt)
+            index.add(np.arange(300), self.vectors)
+            agree = sum(exact.search(q, 1)[0][1] == index.search(q, 1)[0][1] for q in self.queries)
+            self.assertEqual(agree, len(self.queries), fmt)
+
+    def test_migration(self):
+        """Existing float32 rows are rewritten in place and still load."""
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE TABLE memory (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT, "
+                     "command TEXT, response TEXT, embedding BLOB, embedding_format TEXT, "
+                     "session_id TEXT, turn INTEGER)")
+        conn.executemany("INSERT INTO memory (command, response, embedding) VALUES (?, ?, ?)",
+                         [(f"c{i}", "Noted.", v.tobytes()) for i, v in enumerate(self.vectors[:50])])
+        self.assertEqual(migrate_embeddings(conn, "int8", batch_size=16), 50)
+        self.assertEqual(migrate_embeddings(conn, "int8"), 0)
+        index = load_index(conn, "exact", storage="int8")
+        self.assertEqual(index.search(self.vectors[9], 1)[0][1], 10)
+
+class TestLexicalSearch(unittest.TestCase):
+    """Test cases for the FTS5 keyword mirror of the memory table."""
+
+    def setUp(self):
+        """Create a memory table with a few rows, then its FTS mirror."""
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.execute("CREATE TABLE memory (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT, "
+                          "command TEXT, response TEXT, embedding BLOB, embedding_format TEXT, "
+                          "session_id TEXT, turn INTEGER)")
+        self.conn.executemany("INSERT INTO memory (command, response) VALUES (?, ?)",
+                              [("dentist appointment on friday", "Noted."), ("buy milk", "Noted.")])
+        self.assertTrue(create_fts(self.conn))
+
+    def test_existing_rows_indexed(self):
+        """Rows stored before the FTS table existed are searchable."""
+        self.assertEqual(lexical_candidates(self.conn, "what did I say about the dentist"), [1])
+
+    def test_triggers_keep_mirror_in_sync(self):
+        """Inserts, updates and deletes on memory reach the FTS table."""
+        self.conn.execute("INSERT INTO memory (command, response) VALUES ('call the dentist', 'Noted.')")
+        self.assertEqual(sorted(lexical_candidates(self.conn, "dentist")), [1, 3])
+        self.conn.execute("UPDATE memory SET command = 'call mom' WHERE id = 3")
+        self.assertEqual(lexical_candidates(self.conn, "dentist"), [1])
+        self.conn.execute("DELETE FROM memory WHERE id = 1")
+        self.assertEqual(lexical_candidates(self.conn, "dentist"), [])
+
+    def test_query_building(self):
+        """Stopwords and punctuation never reach the FTS query."""
+        self.assertEqual(fts_query("What did I say about the dentist?"), '"dentist"')
+        self.assertEqual(fts_query("what did i"), "")
+
+    def test_rerank_candidates(self):
+        """search_ids only scores the given candidates."""
+        vectors = np.array([[1, 0], [0.9, 0.1], [0, 1], [0.5, 0.5]], dtype=np.float32)
+        index = MemoryIndex()
+        index.add([1, 2, 3, 4], vectors)
+        self.assertEqual(index.search_ids(vectors[0], [3, 4], 1)[0][1], 4)
+        self.assertEqual(index.search_ids(vectors[0], [99], 1), [])
+
+class TestCompaction(unittest.TestCase):
+    """Test cases for memory retention and compaction."""
+
+    def setUp(self):
+        """Create a file-backed memory database with rows of different ages."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.conn = sqlite3.connect(os.path.join(self.tmp.name, "memory.db"))
+        self.conn.execute("CREATE TABLE memory (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT, "
+                          "command TEXT, response TEXT, embedding BLOB, embedding_format TEXT, "
+                          "session_id TEXT, turn INTEGER)")
+        self.conn.commit()
+        memory_compaction.enable_incremental_vacuum(self.conn)
+        memory_compaction.create_archive(self.conn)
+        rows = [("2020-01-01 10:00", "ancient"), ("2024-01-01 10:00", "old"), ("2099-01-01 10:00", "recent")]
+        self.conn.executemany("INSERT INTO memory (timestamp, command, response, embedding) VALUES (?, ?, 'Noted.', ?)",
+                              [(ts, cmd, np.zeros(4, dtype=np.float32).tobytes()) for ts, cmd in rows])
+        self.conn.commit()
+
+    def tearDown(self):
+        self.conn.close()
+        self.tmp.cleanup()
+
+    def test_archive_and_expire(self):
+        """Old rows move to the archive and expired rows are deleted from it."""
+        self.assertEqual(memory_compaction.archive_rows(self.conn, "2050-01-01 00:00"), [1, 2])
+        self.assertEqual([r for r, in self.conn.execute("SELECT id FROM memory")], [3])
+        self.assertEqual(memory_compaction.expire_rows(self.conn, "2022-01-01 00:00"), [1])
+        self.assertEqual([r for r, in self.conn.execute("SELECT id FROM memory_archive")], [2])
+
+    def test_incremental_vacuum_mode(self):
+        """The database is switched to incremental auto-vacuum."""
+        self.assertEqual(self.conn.execute("PRAGMA auto_vacuum").fetchone()[0], 2)
+        memory_compaction.incremental_vacuum(self.conn)
+
+    def test_existing_database_converted_once(self):
+        """An existing database is rebuilt into incremental mode once, and later calls do nothing."""
+        conn = sqlite3.connect(os.path.join(self.tmp.name, "existing.db"))
+        conn.execute("CREATE TABLE memory (id INTEGER PRIMARY KEY, command TEXT)")
+        conn.commit()
+        self.assertEqual(conn.execute("PRAGMA auto_vacuum").fetchone()[0], 0)
+        self.assertIsNotNone(memory_compaction.enable_incremental_vacuum(conn))
+        self.assertEqual(conn.execute("PRAGMA auto_vacuum").fetchone()[0], 2)
+        self.assertIsNone(memory_compaction.enable_incremental_vacuum(conn))
+        conn.close()
+
+    def test_forget_turn(self):
+        """Rows of one turn are found by session and deleted from table and index; untagged rows are kept."""
+        self.conn.executemany("INSERT INTO memory (command, session_id, turn, embedding) VALUES (?, ?, ?, ?)",
+                              [("first", "s1", 1, np.ones(4, dtype=np.float32).tobytes()),
+                               ("second", "s1", 2, np.ones(4, dtype=np.float32).tobytes()),
+                               ("other", "s2", 2, np.ones(4, dtype=np.float32).tobytes()),
+                               # Stored outside any turn, e.g. by a scheduled job
+                               ("scheduled", "s1", None, np.ones(4, dtype=np.float32).tobytes())])
+        self.conn.commit()
+        index = load_index(self.conn, "exact")
+        ids = memory_compaction.turn_ids(self.conn, "s1", [2])
+        self.assertEqual(ids, [5])
+        memory_compaction.delete_rows(self.conn, ids)
+        index.remove(ids)
+        self.assertNotIn(5, index)
+        self.assertEqual(len(index), 6)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM memory WHERE session_id = 's1'").fetchone()[0], 2)
+
+    def test_index_remove(self):
+        """Removing rows keeps the rest of the index searchable."""
+        vectors = np.eye(6, dtype=np.float32)
+        index = MemoryIndex()
+        index.add(np.arange(6), vectors)
+        self.assertEqual(index.remove([1, 5, 42]), 2)
+        self.assertEqual(len(index), 4)
+        self.assertNotIn(1, index)
+        for row_id in (0, 2, 3, 4):
+            self.assertEqual(index.search(vectors[row_id], 1)[0][1], row_id)
+
+    def test_near_duplicates(self):
+        """Rows added since the last compaction are paired with the older rows they nearly repeat."""
+        rng = np.random.default_rng(5)
+        base = rng.standard_normal((50, 32)).astype(np.float32)
+        vectors = np.concatenate([base, base[:10] + 0.01 * rng.standard_normal((10, 32)).astype(np.float32)])
+        for index in (MemoryIndex(), IVFMemoryIndex(exact_threshold=10 ** 9)):
+            index.add(np.arange(60), vectors)
+            if isinstance(index, IVFMemoryIndex):
+                index.exact_threshold = 0
+                index.train()
+            self.assertEqual(sorted(index.near_duplicates(49, 0.97)), [(i, 50 + i) for i in range(10)])
+            # Nothing added since the newest row, so nothing to check
+            self.assertEqual(index.near_duplicates(59, 0.97), [])
+
+    def test_only_identical_text_is_merged(self):
+        """Similar memories are deleted only when command and response are identical, and only once."""
+        self.conn.executemany("INSERT INTO memory (timestamp, command, response) VALUES ('2099-01-02 10:00', ?, 'Noted.')",
+                              [("remind me to call mom at 5",), ("remind me to call mom at 6",),
+                               ("remind me to call mom at 5",)])
+        self.conn.commit()
+        memory_compaction.create_compaction_state(self.conn)
+        # The three rows from setUp predate the state table and count as checked
+        self.assertEqual(memory_compaction.compacted_through(self.conn), 6)
+        self.assertEqual(memory_compaction.exact_duplicates(self.conn, [(4, 5), (4, 6), (5, 6)]), [4])
+        memory_compaction.mark_compacted(self.conn, 6)
+        memory_compaction.create_compaction_state(self.conn)
+        self.assertEqual(memory_compaction.compacted_through(self.conn), 6)
+
+class CountingEncoder:
+    """Stand-in for SentenceTransformer that counts forward passes."""
+
+    def __init__(self):
+        self.calls = 0
+        self.texts = 0
+
+    def encode(self, texts):
+        self.calls += 1
+        self.texts += len(texts)
+        return np.array([[len(t), t.count(" "), 1.0] for t in texts], dtype=np.float32)
+
+class TestEmbeddingCache(unittest.TestCase):
+    """Test cases for the embedding cache."""
+
+    def test_repeated_text_skips_model(self):
+        """A repeated command is served from RAM without a forward pass."""
+        encoder = CountingEncoder()
+        cache = EmbeddingCache(encoder, "test", path=None)
+        first = cache.encode("What's the weather")
+        second = cache.encode("  what's the   WEATHER ")
+        np.testing.assert_array_equal(first, second)
+        self.assertEqual(encoder.calls, 1)
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_batch_encodes_misses_once(self):
+        """Only unique misses in a batch reach the model, in one call."""
+        encoder = CountingEncoder()
+        cache = EmbeddingCache(encoder, "test", path=None)
+        cache.encode("show my notes")
+        vectors = cache.encode_many(["show my notes", "take a note", "take a note"])
+        self.assertEqual(vectors.shape, (3, 3))
+        self.assertEqual(encoder.calls, 2)
+        self.assertEqual(encoder.texts, 2)
+
+    def test_disk_tier(self):
+        """Vectors survive a restart through the on-disk tier."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache.db")
+            cache = EmbeddingCache(CountingEncoder(), "test", path=path)
+            cache.encode("remember the dentist")
+            cache.close()
+            encoder = CountingEncoder()
+            reopened = EmbeddingCache(encoder, "test", path=path)
+            reopened.encode("remember the dentist")
+            reopened.close()
+            self.assertEqual(encoder.calls, 0)
+            self.assertEqual(reopened.stats()["disk_hits"], 1)
+
+class TestMemoryWriter(unittest.TestCase):
+    """Test cases for the background memory writer."""
+
+    def setUp(self):
+        """Create a memory table in a temporary database."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "memory.db")
+        conn = sqlite3.connect(self.path)
+        conn.execute("CREATE TABLE memory (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT, "
+                     "command TEXT, response TEXT, embedding BLOB, embedding_format TEXT, "
+                     "session_id TEXT, turn INTEGER)")
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_batched_writes(self):
+        """Queued memories are committed in batches and reported with their ids."""
+        encoder = CountingEncoder()
+        inserted = []
+        writer = MemoryWriter(self.path, EmbeddingCache(encoder, "test", path=None),
+                              on_insert=lambda ids, vectors: inserted.extend(ids), batch_size=16)
+        for i in range(50):
+            writer.submit(f"command {i}", "Noted.")
+        writer.close()
+        conn = sqlite3.connect(self.path)
+        rows = conn.execute("SELECT id, command FROM memory ORDER BY id").fetchall()
+        self.assertEqual(len(rows), 50)
+        self.assertEqual(inserted, [row_id for row_id, _ in rows])
+        self.assertLessEqual(encoder.calls, writer.batches)
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        conn.close()
+
+    def test_ids_ignore_other_inserts(self):
+        """Reported ids are those of the writer's own rows, even when other rows are inserted meanwhile."""
+        conn = sqlite3.connect(self.path)
+        # Stands in for another connection inserting while a batch is written
+        conn.execute("CREATE TRIGGER echo AFTER INSERT ON memory WHEN NEW.command LIKE 'command%' "
+                     "BEGIN INSERT INTO memory (command) VALUES ('other'); END")
+        conn.commit()
+        inserted = []
+        writer = MemoryWriter(self.path, EmbeddingCache(CountingEncoder(), "test", path=None),
+                              on_insert=lambda ids, vectors: inserted.extend(ids), batch_size=8)
+        for i in range(20):
+            writer.submit(f"command {i}", "Noted.")
+        writer.close()
+        own = [row_id for row_id, in conn.execute("SELECT id FROM memory WHERE command LIKE 'command%' ORDER BY id")]
+        conn.close()
+        self.assertEqual(len(own), 20)
+        self.assertEqual(inserted, own)
+
+    def test_new_database_uses_incremental_vacuum(self):
+        """A database created through connect() starts in incremental auto-vacuum mode."""
+        conn = connect(os.path.join(self.tmp.name, "new.db"))
+        conn.execute("CREATE TABLE memory (id INTEGER PRIMARY KEY, command TEXT)")
+        conn.commit()
+        self.assertEqual(conn.execute("PRAGMA auto_vacuum").fetchone()[0], 2)
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        self.assertIsNone(memory_compaction.enable_incremental_vacuum(conn))
+        conn.close()
+
+if __name__ == '__main__':
+    unittest.main()
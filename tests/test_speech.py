@@ -28,6 +28,393 @@ class TestSpeech(unittest.TestCase):
             self.assertTrue(True)
         except Exception as e:
             self.fail(f"Failed to initialize TTS: {e}")
-            
+
+    def test_split_sentences(self):
+        """Test that replies are split into sentence chunks for streaming playback."""
+        from grokvis.tts_manager import split_sentences
+        self.assertEqual(split_sentences("CPU at 12%. Memory at 40%!  Disk fine?"),
+                         ["CPU at 12%.", "Memory at 40%!", "Disk fine?"])
+        self.assertEqual(split_sentences("No punctuation here"), ["No punctuation here"])
+        self.assertEqual(split_sentences("   "), [])
+
+
+class TestAudioRingBuffer(unittest.TestCase):
+    """Test cases for the shared microphone ring buffer."""
+
+    def test_readers_continue_where_they_left_off(self):
+        """Test that a reader gets consecutive frames across the wrap-around point."""
+        import numpy as np
+        from grokvis.audio_capture import AudioRingBuffer
+        buffer = AudioRingBuffer(8)
+        buffer.write(np.arange(6, dtype=np.int16))
+        samples, position = buffer.read(0, 4)
+        self.assertEqual(samples.tolist(), [0, 1, 2, 3])
+        buffer.write(np.arange(6, 10, dtype=np.int16))
+        samples, position = buffer.read(position, 6)
+        self.assertEqual(samples.tolist(), [4, 5, 6, 7, 8, 9])
+        self.assertEqual(position, 10)
+
+    def test_slow_reader_skips_overwritten_samples(self):
+        """Test that a reader that fell behind resumes at the oldest sample still held."""
+        import numpy as np
+        from grokvis.audio_capture import AudioRingBuffer
+        buffer = AudioRingBuffer(4)
+        buffer.write(np.arange(10, dtype=np.int16))
+        samples, position = buffer.read(0, 2)
+        self.assertEqual(samples.tolist(), [6, 7])
+        self.assertEqual(position, 8)
+        self.assertEqual(buffer.dropped, 6)
+
+    def test_reader_detects_write_in_progress(self):
+        """Test that a copy overlapping samples the writer is still overwriting is discarded."""
+        import numpy as np
+        from grokvis.audio_capture import AudioRingBuffer
+        buffer = AudioRingBuffer(8)
+        buffer.write(np.arange(8, dtype=np.int16))
+        reads = []
+
+        class Ring(np.ndarray):
+            """Runs a reader right after the writer's first store, before the write is published."""
+            def __setitem__(self, key, value):
+                super().__setitem__(key, value)
+                if not reads:
+                    reads.append(buffer.read(0, 4))
+
+        buffer._data = buffer._data.view(Ring)
+        buffer.write(np.array([100, 101], dtype=np.int16))
+        samples, position = reads[0]
+        self.assertEqual(samples.tolist(), [2, 3, 4, 5])
+        self.assertEqual(position, 6)
+        self.assertEqual(buffer.dropped, 2)
+
+    def test_read_times_out_and_close_releases(self):
+        """Test that reads past the newest sample wait, time out, and return None once closed."""
+        import numpy as np
+        from grokvis.audio_capture import AudioRingBuffer
+        buffer = AudioRingBuffer(4)
+        buffer.write(np.arange(2, dtype=np.int16))
+        self.assertEqual(buffer.read(0, 3, timeout=0.01), (None, 0))
+        buffer.close()
+        self.assertEqual(buffer.read(0, 3), (None, 0))
+
+    def test_blocked_reader_wakes_on_write(self):
+        """Test that a reader waiting on the callback thread's writes receives them."""
+        import threading
+        import numpy as np
+        from grokvis.audio_capture import AudioRingBuffer
+        buffer = AudioRingBuffer(16)
+        writer = threading.Timer(0.05, buffer.write, args=(np.arange(4, dtype=np.int16),))
+        writer.start()
+        samples, position = buffer.read(0, 4, timeout=2)
+        writer.join()
+        self.assertEqual(samples.tolist(), [0, 1, 2, 3])
+        self.assertEqual(position, 4)
+
+    def test_frame_path_allocation_free(self):
+        """Test that writing and reading wake word frames allocates nothing in steady state."""
+        import tracemalloc
+        import numpy as np
+        from grokvis.audio_capture import AudioRingBuffer
+        buffer = AudioRingBuffer(16000)
+        indata = np.ones((512, 1), dtype=np.int16)
+        pcm = np.empty(512, dtype=np.int16)
+        position = 0
+        for _ in range(100):
+            buffer.write(indata[:, 0])
+            position = buffer.read_into(pcm, position)
+
+        tracemalloc.start()
+        try:
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            for _ in range(1000):
+                buffer.write(indata[:, 0])
+                position = buffer.read_into(pcm, position)
+            after, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        # No growth across frames, and nothing frame-sized allocated even transiently
+        self.assertLess(after - before, 256)
+        self.assertLess(peak - before, pcm.nbytes)
+
+
+
+class TestMFCCExtractor(unittest.TestCase):
+    """Test cases for the in-memory speaker verification features."""
+
+    def test_matches_librosa(self):
+        """Test that cached-transform MFCCs match librosa.feature.mfcc with default settings."""
+        import numpy as np
+        import librosa
+        from grokvis.voice_features import MFCCExtractor
+        extractor = MFCCExtractor(sample_rate=16000)
+        y = (0.1 * np.random.default_rng(0).standard_normal(16000 * 2)).astype(np.float32)
+        expected = librosa.feature.mfcc(y=y, sr=16000, n_mfcc=13)
+        np.testing.assert_allclose(extractor.mfcc(y), expected, atol=1e-3)
+
+    def test_features_from_pcm(self):
+        """Test that int16 PCM bytes give the same features as the equivalent float signal."""
+        import numpy as np
+        from grokvis.voice_features import MFCCExtractor
+        extractor = MFCCExtractor(sample_rate=16000)
+        pcm = (np.random.default_rng(1).integers(-3000, 3000, 8000)).astype(np.int16)
+        np.testing.assert_allclose(extractor.features_from_pcm(pcm.tobytes()),
+                                   extractor.features(pcm / 32768.0), atol=1e-4)
+        self.assertEqual(extractor.features_from_pcm(pcm).shape, (13,))
+
+
+class TestEnrollmentSet(unittest.TestCase):
+    """Test cases for the cached, versioned enrollment features."""
+
+    @staticmethod
+    def write_clip(path, seed):
+        """Write one second of 16 kHz noise as a WAV file."""
+        import wave
+        import numpy as np
+        pcm = np.random.default_rng(seed).integers(-3000, 3000, 16000).astype(np.int16)
+        with wave.open(path, "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(16000)
+            f.writeframes(pcm.tobytes())
+
+    def test_only_new_clips_decoded(self):
+        """Test that updates decode only new clips and bump the version when the set changes."""
+        import tempfile
+        from grokvis.voice_features import EnrollmentSet
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = os.path.join(tmp, "enrollment.json")
+            for i in range(3):
+                self.write_clip(os.path.join(tmp, f"sample_{i}.wav"), i)
+            enrollment = EnrollmentSet(tmp, path=cache)
+            self.assertEqual(enrollment.update(), 3)
+            version = enrollment.version
+            self.assertEqual(enrollment.features().shape, (3, 13))
+
+            # A fresh instance reads the cache and has nothing to decode
+            enrollment = EnrollmentSet(tmp, path=cache)
+            self.assertEqual(enrollment.update(), 0)
+            self.assertEqual(enrollment.version, version)
+
+            self.write_clip(os.path.join(tmp, "sample_3.wav"), 3)
+            self.assertEqual(enrollment.update(), 1)
+            self.assertEqual(enrollment.version, version + 1)
+            self.assertEqual(len(enrollment), 4)
+
+            os.remove(os.path.join(tmp, "sample_0.wav"))
+            self.assertEqual(enrollment.update(), 0)
+            self.assertEqual(enrollment.version, version + 2)
+            self.assertEqual(len(enrollment), 3)
+
+    def test_corrupt_clip_not_retried(self):
+        """Test that a clip that fails to decode is skipped, not retried, until the file changes."""
+        import tempfile
+        from grokvis.voice_features import EnrollmentSet
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = os.path.join(tmp, "enrollment.json")
+            for i in range(2):
+                self.write_clip(os.path.join(tmp, f"sample_{i}.wav"), i)
+            corrupt = os.path.join(tmp, "sample_2.wav")
+            with open(corrupt, "wb") as f:
+                f.write(b"not a wav file")
+            enrollment = EnrollmentSet(tmp, path=cache)
+            self.assertEqual(enrollment.update(), 3)
+            version = enrollment.version
+            self.assertEqual(len(enrollment), 2)
+            self.assertEqual(enrollment.features().shape, (2, 13))
+
+            self.assertEqual(enrollment.update(), 0)
+            self.assertEqual(enrollment.version, version)
+            # Also after a restart, which reads the failure back from the cache
+            enrollment = EnrollmentSet(tmp, path=cache)
+            self.assertEqual(enrollment.update(), 0)
+            self.assertEqual(enrollment.version, version)
+
+            # Fixing the clip changes its stamp, so it is decoded again
+            self.write_clip(corrupt, 2)
+            self.assertEqual(enrollment.update(), 1)
+            self.assertEqual(enrollment.version, version + 1)
+            self.assertEqual(len(enrollment), 3)
+
+
+class TestRecognizer(unittest.TestCase):
+    """Test cases for the pluggable speech recognition layer."""
+
+    def test_tap_forwards_reads(self):
+        """Test that blocks read from a tapped source also reach the callback."""
+        from grokvis.recognizer import tap
+
+        class Stream:
+            def read(self, size):
+                return b"\x01" * size
+
+        class Source:
+            stream = Stream()
+
+        source = Source()
+        original = source.stream
+        blocks = []
+        with tap(source, blocks.append):
+            self.assertEqual(source.stream.read(4), b"\x01" * 4)
+            source.stream.read(2)
+        self.assertEqual(blocks, [b"\x01" * 4, b"\x01" * 2])
+        self.assertIs(source.stream, original)
+
+    def test_incomplete_engine_rejected(self):
+        """Test that an engine or session missing a required method fails when it is created."""
+        from grokvis.recognizer import SpeechRecognizer, RecognitionSession
+
+        class NoStart(SpeechRecognizer):
+            name = "incomplete"
+
+        class NoResult(RecognitionSession):
+            pass
+
+        self.assertRaises(TypeError, NoStart)
+        self.assertRaises(TypeError, NoResult)
+
+    def test_streaming_session_partials(self):
+        """Test partial transcript reporting and final assembly with a scripted Kaldi recognizer."""
+        import json
+        import speech_recognition as sr
+        from grokvis.recognizer import _VoskSession
+
+        class Kaldi:
+            """Finalizes 'set a timer' at the second block, then hears 'for five'."""
+            def __init__(self):
+                self.blocks = 0
+            def AcceptWaveform(self, data):
+                self.blocks += 1
+                return self.blocks == 2
+            def Result(self):
+                return json.dumps({"text": "set a timer"})
+            def PartialResult(self):
+                return json.dumps({"partial": {1: "set a", 3: "for", 4: "for"}.get(self.blocks, "")})
+            def FinalResult(self):
+                return json.dumps({"text": "for five"})
+
+        partials = []
+        session = _VoskSession(Kaldi(), partials.append)
+        for _ in range(4):
+            session.accept(b"\x00\x00")
+        self.assertEqual(partials, ["set a", "set a timer", "set a timer for"])
+        self.assertEqual(session.result(None), "set a timer for five")
+
+        empty = _VoskSession(type("Silent", (Kaldi,), {"FinalResult": lambda self: "{}",
+                                                       "Result": lambda self: "{}",
+                                                       "PartialResult": lambda self: "{}"})(), None)
+        empty.accept(b"\x00\x00")
+        with self.assertRaises(sr.UnknownValueError):
+            empty.result(None)
+
+
+class TestEndpointer(unittest.TestCase):
+    """Test cases for VAD endpointing."""
+
+    RATE = 16000
+
+    def signal(self, pattern, noise=0.002):
+        """int16 audio from (seconds, tone amplitude) pairs over constant background noise."""
+        import numpy as np
+        rng = np.random.default_rng(0)
+        parts = []
+        for seconds, amplitude in pattern:
+            t = np.arange(int(seconds * self.RATE)) / self.RATE
+            parts.append(amplitude * np.sin(2 * np.pi * 200 * t) + noise * rng.standard_normal(len(t)))
+        return (np.concatenate(parts) * 32767).astype(np.int16)
+
+    def source(self, samples):
+        """An entered audio source reading the samples, then returning empty reads."""
+        import io
+
+        class Stream:
+            def __init__(self):
+                self.data = io.BytesIO(samples.astype("<i2").tobytes())
+            def read(self, size):
+                return self.data.read(size * 2)
+
+        class Source:
+            SAMPLE_RATE = self.RATE
+            SAMPLE_WIDTH = 2
+            stream = Stream()
+        return Source()
+
+    def test_hangover_ends_utterance(self):
+        """Test that capture stops one hangover after speech, keeping the preroll."""
+        from grokvis.vad import Endpointer, record_utterance
+        for hangover_ms in (200, 400):
+            endpointer = Endpointer(self.RATE, hangover_ms=hangover_ms, preroll_ms=300)
+            source = self.source(self.signal([(1.0, 0.0), (1.0, 0.3), (2.0, 0.0)]))
+            audio = record_utterance(source, endpointer)
+            seconds = len(audio.frame_data) / (2 * self.RATE)
+            # About 0.3 s of preroll, 1 s of speech and the hangover
+            self.assertAlmostEqual(seconds, 1.3 + hangover_ms / 1000, delta=0.1)
+
+    def test_noise_floor_persists(self):
+        """Test that the learned noise floor survives reset() and short pauses do not end speech."""
+        from grokvis.vad import Endpointer, record_utterance
+        endpointer = Endpointer(self.RATE, hangover_ms=300)
+        record_utterance(self.source(self.signal([(1.0, 0.0), (0.5, 0.3), (1.0, 0.0)])), endpointer)
+        floor = endpointer.detector.floor_db
+        endpointer.reset()
+        self.assertEqual(endpointer.detector.floor_db, floor)
+        # A 100 ms pause inside the command is shorter than the hangover
+        audio = record_utterance(self.source(self.signal([(0.5, 0.0), (0.5, 0.3), (0.1, 0.0), (0.5, 0.3), (1.0, 0.0)])),
+                                 endpointer)
+        self.assertGreater(len(audio.frame_data) / (2 * self.RATE), 1.1)
+
+    def test_timeout_without_speech(self):
+        """Test that waiting for speech raises sr.WaitTimeoutError after the timeout."""
+        import speech_recognition as sr
+        from grokvis.vad import Endpointer, record_utterance
+        with self.assertRaises(sr.WaitTimeoutError):
+            record_utterance(self.source(self.signal([(2.0, 0.0)])), Endpointer(self.RATE), timeout=1.0)
+
+
+class TestSpeculativeDispatcher(unittest.TestCase):
+    """Test cases for speculative command dispatch on partial transcripts."""
+
+    def dispatcher(self):
+        from grokvis.speculation import SpeculativeDispatcher, SpeculationRule
+        rule = SpeculationRule("weather", r"what's the weather in (?P<arg>.+)$", lambda city: city.title())
+        return SpeculativeDispatcher([rule])
+
+    def test_committed_on_match(self):
+        """Test that the speculation matching the final transcript is committed and handed to the handler."""
+        dispatcher = self.dispatcher()
+        dispatcher.begin()
+        for partial in ("what's", "what's the weather in", "what's the weather in new", "what's the weather in new york"):
+            dispatcher.on_partial(partial)
+        dispatcher.resolve("what's the weather in new york")
+        stats = dispatcher.stats()
+        self.assertEqual((stats["speculations"], stats["hits"], stats["misses"]), (2, 1, 1))
+        self.assertIsNone(dispatcher.take("weather", "boston"))
+        self.assertEqual(dispatcher.take("weather", "New York ").result(timeout=5), "New York")
+        self.assertIsNone(dispatcher.take("weather", "new york"))
+
+    def test_cancelled_on_mismatch(self):
+        """Test that speculations are cancelled when the final transcript differs or is rejected."""
+        dispatcher = self.dispatcher()
+        dispatcher.begin()
+        dispatcher.on_partial("what's the weather in paris")
+        dispatcher.resolve("what's the time")
+        dispatcher.begin()
+        dispatcher.on_partial("what's the weather in rome")
+        dispatcher.resolve(None)
+        self.assertEqual(dispatcher.stats()["misses"], 2)
+        self.assertIsNone(dispatcher.take("weather"))
+
+    def test_rules_match_commands(self):
+        """Test that the built-in rules recognize their commands and not look-alikes."""
+        from grokvis.speculation import RULES
+        rules = {rule.intent: rule for rule in RULES}
+        self.assertEqual(rules["weather"].match("What's the weather in London"), "london")
+        self.assertIsNone(rules["weather"].match("what's the weather in london forecast"))
+        self.assertEqual(rules["timer"].match("start a timer for 5 minutes"), "5 minutes")
+        self.assertIsNone(rules["timer"].match("start a timer for 5"))
+        self.assertEqual(rules["show_notes"].match("show my notes"), "")
+        self.assertIsNone(rules["take_note"].match("please take a note"))
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,239 @@
+"""
+Tests for the text-to-speech helpers of Grok-VIS.
+"""
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import numpy as np
+
+# Add the parent directory to the path so we can import the grokvis package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from grokvis.tts_cache import AudioCache
+from grokvis.speech_queue import SpeechQueue, PRIORITY_URGENT, PRIORITY_NORMAL, PRIORITY_CHATTER
+
+
+class TestAudioCache(unittest.TestCase):
+    """Test cases for the content-addressed TTS audio cache."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_key_normalizes_text(self):
+        """Test that trivial text variations share a key but models and personas do not."""
+        key = AudioCache.key("model-a", "Alfred", "Stopwatch started.")
+        self.assertEqual(key, AudioCache.key("model-a", "Alfred", "  stopwatch   STARTED. "))
+        self.assertNotEqual(key, AudioCache.key("model-b", "Alfred", "Stopwatch started."))
+        self.assertNotEqual(key, AudioCache.key("model-a", "Beatrice", "Stopwatch started."))
+
+    def test_round_trip_and_persistence(self):
+        """Test that clips are served from RAM, then from disk after a restart."""
+        cache = AudioCache(self.directory)
+        key = cache.key("model", "Default", "Hello.")
+        audio = np.linspace(-1, 1, 1000, dtype=np.float32)
+        self.assertIsNone(cache.get(key))
+        cache.put(key, audio, 22050)
+        clip, rate = cache.get(key)
+        np.testing.assert_array_equal(clip, audio)
+        self.assertEqual(rate, 22050)
+
+        reopened = AudioCache(self.directory)
+        clip, rate = reopened.get(key)
+        np.testing.assert_array_equal(clip, audio)
+        self.assertEqual(rate, 22050)
+        self.assertEqual(reopened.stats()["disk_hits"], 1)
+
+    def test_lru_eviction(self):
+        """Test that the least recently used clips are evicted past the disk budget."""
+        clip = np.zeros(1000, dtype=np.float32)
+        cache = AudioCache(self.directory, max_bytes=clip.nbytes * 2, max_memory_bytes=clip.nbytes)
+        keys = [cache.key("model", "Default", f"phrase {i}") for i in range(3)]
+        cache.put(keys[0], clip, 16000)
+        cache.put(keys[1], clip, 16000)
+        cache.get(keys[0])
+        cache.put(keys[2], clip, 16000)
+        self.assertIn(keys[0], cache)
+        self.assertNotIn(keys[1], cache)
+        self.assertIn(keys[2], cache)
+        self.assertEqual(len(os.listdir(self.directory)), 2)
+        self.assertLessEqual(cache.stats()["memory_bytes"], clip.nbytes)
+
+
+class TestSpeechQueue(unittest.TestCase):
+    """Test cases for the prioritized speech output queue."""
+
+    def setUp(self):
+        self.batches = []
+        self.gate = threading.Event()
+        self.started = threading.Event()
+
+    def play(self, chunks, persona, stop):
+        """Record each batch; the first one blocks on the gate until released or stopped."""
+        self.batches.append(list(chunks))
+        if len(self.batches) == 1:
+            self.started.set()
+            while not self.gate.wait(0.01):
+                if stop.is_set():
+                    return 0
+        return len(chunks)
+
+    def test_merges_chatter_and_preempts_with_urgent(self):
+        """Test that queued chatter is batched and urgent lines jump ahead of it."""
+        speech = SpeechQueue(self.play)
+        speech.submit("Busy.", PRIORITY_NORMAL)
+        self.assertTrue(self.started.wait(1))
+        speech.submit("Item one.", PRIORITY_CHATTER)
+        speech.submit("Item two.", PRIORITY_CHATTER)
+        speech.submit("Reminder: stretch now.", PRIORITY_URGENT)
+        self.gate.set()
+        self.assertTrue(speech.wait(1))
+        self.assertEqual(self.batches, [["Busy."], ["Reminder: stretch now."], ["Item one.", "Item two."]])
+        speech.close()
+
+    def test_urgent_interrupts_playing_chatter(self):
+        """Test that an urgent line stops chatter mid-batch and the unheard lines resume afterwards."""
+        speech = SpeechQueue(self.play)
+        speech.submit("Item one.", PRIORITY_CHATTER)
+        self.assertTrue(self.started.wait(1))
+        speech.submit("Reminder: call home now.", PRIORITY_URGENT)
+        self.assertTrue(speech.wait(1))
+        self.assertEqual(self.batches, [["Item one."], ["Reminder: call home now."], ["Item one."]])
+        self.assertEqual(speech.stats()["preempted"], 1)
+        speech.close()
+
+    def test_submit_many_uses_batch_player(self):
+        """Test that lines queued together are kept whole and handed to the batch player."""
+        batched = []
+        speech = SpeechQueue(self.play, split=lambda text: text.split(". "),
+                             play_batch=lambda chunks, persona, stop: batched.append(list(chunks)) or len(chunks))
+        speech.submit_many(["Here are your notes:", "1. Buy milk.", "2. Call home."])
+        self.gate.set()
+        self.assertTrue(speech.wait(1))
+        self.assertEqual(batched, [["Here are your notes:", "1. Buy milk.", "2. Call home."]])
+        self.assertEqual(self.batches, [])
+        speech.close()
+
+    def test_cancel_drops_everything(self):
+        """Test that barge-in stops the current line and empties the queue."""
+        speech = SpeechQueue(self.play)
+        speech.submit("Long answer.", PRIORITY_NORMAL)
+        self.assertTrue(self.started.wait(1))
+        speech.submit("Item one.", PRIORITY_CHATTER)
+        speech.cancel()
+        self.assertTrue(speech.wait(1))
+        self.assertEqual(self.batches, [["Long answer."]])
+        self.assertEqual(speech.pending(), 0)
+        speech.close()
+
+    def test_cancel_stops_synchronous_speak(self):
+        """Test that barge-in also stops speak(), which plays without going through the queue."""
+        from unittest import mock
+        import grokvis.tts_manager as tts_manager
+
+        def play(chunks, persona="Default", stop=None):
+            """Play until stopped; without a stop event only the gate (never set here) ends it."""
+            self.started.set()
+            return 0 if (stop or self.gate).wait(1) else len(chunks)
+
+        with mock.patch.object(tts_manager, "play_chunks", play):
+            speaker = threading.Thread(target=tts_manager.speak, args=("A long answer. With two sentences.",))
+            speaker.start()
+            self.assertTrue(self.started.wait(1))
+            tts_manager.cancel_speech()
+            speaker.join(0.5)
+            self.assertFalse(speaker.is_alive())
+        self.assertEqual(tts_manager._direct_stops, set())
+
+    def test_speak_waits_for_queued_speech(self):
+        """Test that speak() plays only after the chatter already queued has been spoken."""
+        from unittest import mock
+        import grokvis.tts_manager as tts_manager
+        direct = []
+        speech = SpeechQueue(self.play)
+        speech.submit("Headline one.", PRIORITY_CHATTER)
+        self.assertTrue(self.started.wait(1))
+        with mock.patch.object(tts_manager, "_speech_queue", speech), \
+                mock.patch.object(tts_manager, "play_chunks",
+                                  lambda chunks, persona="Default", stop=None: direct.append(list(chunks))):
+            speaker = threading.Thread(target=tts_manager.speak, args=("Which city?",))
+            speaker.start()
+            speaker.join(0.2)
+            self.assertEqual(direct, [])
+            self.gate.set()
+            speaker.join(1)
+        self.assertEqual(direct, [["Which city?"]])
+        self.assertEqual(self.batches, [["Headline one."]])
+        speech.close()
+
+
+
+class FakeTTS:
+    """Stand-in TTS engine; every call returns one second of audio after a configurable delay."""
+
+    sample_rate = 1000
+    delays = {}
+
+    def __init__(self, model_name, **kwargs):
+        self.model_name = model_name
+
+    def tts(self, text):
+        import time
+        time.sleep(self.delays[self.model_name])
+        return np.zeros(self.sample_rate, dtype=np.float32)
+
+
+class TestTTSTiers(unittest.TestCase):
+    """Test cases for moving between TTS engine tiers by real-time factor."""
+
+    def setUp(self):
+        from unittest import mock
+        import grokvis.tts_manager as tts_manager
+        self.tts_manager = tts_manager
+        tiers = [("quality", {"model_name": "quality"}), ("fast", {"model_name": "fast"})]
+        self.patches = [
+            mock.patch.object(tts_manager, "TTS", FakeTTS),
+            mock.patch.object(tts_manager, "_tiers", tiers),
+            mock.patch.object(tts_manager, "PINNED_TIER", None),
+            mock.patch.object(tts_manager, "RTF_RECOVERY_SAMPLES", 3),
+        ]
+        for patch in self.patches:
+            patch.start()
+        tts_manager._tier_index = 1
+        tts_manager._tts_instance = FakeTTS("fast")
+        tts_manager._rtf.update(average=None, samples=0)
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+        self.tts_manager._tier_index = 0
+        self.tts_manager._tts_instance = None
+        self.tts_manager._tts_model_name = None
+
+    def reprobe_after_fast_samples(self):
+        """Record enough fast-tier measurements to trigger a re-probe and wait for it."""
+        for _ in range(self.tts_manager.RTF_RECOVERY_SAMPLES):
+            self.tts_manager._record_rtf(0.1, np.zeros(1000, dtype=np.float32), 1000)
+        self.tts_manager._reprobe_thread.join(5)
+
+    def test_returns_to_quality_tier(self):
+        """Test that the quality tier is taken back once a re-probe shows it keeping up again."""
+        FakeTTS.delays = {"quality": 0.0, "fast": 0.0}
+        self.reprobe_after_fast_samples()
+        self.assertEqual(self.tts_manager.get_tts_tier(), "quality")
+        self.assertEqual(self.tts_manager.get_tts_model_name(), "quality")
+
+    def test_stays_on_fast_tier_while_quality_is_slow(self):
+        """Test that a quality tier still slower than RTF_RECOVERY_LIMIT is not taken back."""
+        FakeTTS.delays = {"quality": 0.9, "fast": 0.0}
+        self.reprobe_after_fast_samples()
+        self.assertEqual(self.tts_manager.get_tts_tier(), "fast")
+
+
+if __name__ == '__main__':
+    unittest.main()